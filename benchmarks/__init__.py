@@ -0,0 +1 @@
+# Parser and pipeline benchmarks
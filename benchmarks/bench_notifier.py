@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+LINE通知のスループットのベンチマーク
+
+LINE Messaging API のモック（benchmarks/line_mock.py）に対して、通知の送り方ごとに
+送信にかかる時間・リクエスト数・1リクエストあたりの所要時間（p50/p95）を計測します。
+
+- per-message: メッセージごとに ApiClient を作成して1件ずつプッシュする（従来の送り方）
+- batched:     LineNotifier で1つの ApiClient を使い回し、5件ずつまとめてプッシュする
+- outbox:      送信待ちテーブルに書き込み、OutboxWorker で送信する（429・失敗は再送する）
+- per-user:    購読者ごとにプッシュする
+- multicast:   fan_out で購読者を500人ずつまとめてマルチキャストする
+
+使用方法:
+    python benchmarks/bench_notifier.py [--messages 100] [--subscribers 200] [--latency 0.02]
+                                        [--rate-limit-ratio 0.0] [--failure-ratio 0.0]
+                                        [--scenarios per-message batched outbox per-user multicast]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートをPythonパスに追加
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from linebot.v3.messaging import ApiClient, MessagingApi, TextMessage
+
+from benchmarks.bench_parser import percentile
+from benchmarks.line_mock import MockLineServer
+from src.core.notifier import LineNotifier
+from src.core.outbox import OutboxWorker, build_notifications, fan_out
+from src.utils.db import ReportDatabase
+
+DEFAULT_SCENARIOS = ['per-message', 'batched', 'outbox', 'per-user', 'multicast']
+
+
+def _messages(count):
+    return [f"📊 変更報告書\n\n🏢 テスト株式会社 ({1000 + index})\n👤 テスト保有者\n📈 変更後: 5.20%"
+            for index in range(count)]
+
+
+def _request_latencies(mock, started):
+    """モックが受け付けた順に、リクエストごとの所要時間（ミリ秒）を求める"""
+    times = [started] + [request['received_at'] for request in mock.requests]
+    return [(after - before) * 1000 for before, after in zip(times, times[1:])]
+
+
+def bench_per_message(mock, messages, user_id):
+    for message in messages:
+        with ApiClient(mock.configuration()) as api_client:
+            try:
+                MessagingApi(api_client).push_message(
+                    {"to": user_id, "messages": [TextMessage(text=message)]}
+                )
+            except Exception:
+                pass
+
+
+def bench_batched(mock, messages, user_id):
+    with LineNotifier(user_id=user_id, api_configuration=mock.configuration()) as notifier:
+        for message in messages:
+            notifier.add(message)
+
+
+def bench_outbox(mock, messages, user_id, tmp_dir):
+    db = ReportDatabase(str(Path(tmp_dir) / 'outbox.db'))
+    try:
+        with db.transaction():
+            db._write_outbox(build_notifications(messages, recipient=user_id))
+            db._commit()
+        with LineNotifier(user_id=user_id, api_configuration=mock.configuration()) as notifier:
+            worker = OutboxWorker(db=db, notifier=notifier, base_delay=0.05, max_delay=1)
+            # 再送待ちの通知がなくなるまで送信
+            while db.get_outbox_counts().get('pending'):
+                worker.drain()
+                time.sleep(0.01)
+    finally:
+        db.close()
+
+
+def bench_per_user(mock, messages, subscribers):
+    with LineNotifier(api_configuration=mock.configuration()) as notifier:
+        for subscriber in subscribers:
+            for start in range(0, len(messages), 5):
+                try:
+                    notifier.send(messages[start:start + 5], to=subscriber['user_id'])
+                except Exception:
+                    pass
+
+
+def bench_multicast(mock, messages, subscribers):
+    reports = [{'security_code': str(1000 + index), 'holder_name': 'テスト保有者'} for index in range(len(messages))]
+    notifications = fan_out(messages, reports, subscribers, [1] * len(messages))
+    with LineNotifier(api_configuration=mock.configuration()) as notifier:
+        for notification in notifications:
+            try:
+                notifier.multicast(notification['messages'], notification['recipients'])
+            except Exception:
+                pass
+
+
+def run_scenario(name, mock, args, messages, subscribers, tmp_dir):
+    """
+    1つの送り方で送信し、計測結果を返す
+    Returns:
+        dict: 所要時間・リクエスト数・届いたメッセージ数・1リクエストあたりの所要時間
+    """
+    mock.reset()
+    started = time.time()
+    if name == 'per-message':
+        bench_per_message(mock, messages, 'U-owner')
+    elif name == 'batched':
+        bench_batched(mock, messages, 'U-owner')
+    elif name == 'outbox':
+        bench_outbox(mock, messages, 'U-owner', tmp_dir)
+    elif name == 'per-user':
+        bench_per_user(mock, messages, subscribers)
+    elif name == 'multicast':
+        bench_multicast(mock, messages, subscribers)
+    elapsed = time.time() - started
+
+    delivered = sum(
+        len(call['body']['messages']) * (len(call['body']['to']) if isinstance(call['body']['to'], list) else 1)
+        for call in mock.calls()
+    )
+    latencies = _request_latencies(mock, started)
+    return {
+        'elapsed': elapsed,
+        'requests': len(mock.requests),
+        'rejected': sum(1 for request in mock.requests if request['status'] != 200),
+        'delivered': delivered,
+        'p50_ms': percentile(latencies, 50) if latencies else 0.0,
+        'p95_ms': percentile(latencies, 95) if latencies else 0.0,
+    }
+
+
+def print_results(results, args):
+    print(f"\n📊 メッセージ {args.messages}件, 購読者 {args.subscribers}人, 応答時間 {args.latency * 1000:.0f}ms, "
+          f"429 {args.rate_limit_ratio:.0%}, 失敗 {args.failure_ratio:.0%}")
+    print(f"{'scenario':<12} {'elapsed':>9} {'requests':>9} {'rejected':>9} {'delivered':>10} "
+          f"{'msg/s':>9} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for name, result in results.items():
+        rate = result['delivered'] / result['elapsed'] if result['elapsed'] else 0.0
+        print(f"{name:<12} {result['elapsed']:>8.2f}s {result['requests']:>9} {result['rejected']:>9} "
+              f"{result['delivered']:>10} {rate:>9.0f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LINE通知のスループットのベンチマーク')
+    parser.add_argument('--messages', type=int, default=100, help='送信するメッセージ数')
+    parser.add_argument('--subscribers', type=int, default=200, help='per-user・multicast の購読者数')
+    parser.add_argument('--latency', type=float, default=0.02, help='モックの応答時間（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='モックの応答時間の揺らぎ（秒）')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='モックが429を返す割合')
+    parser.add_argument('--failure-ratio', type=float, default=0.0, help='モックが500を返す割合')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--scenarios', nargs='+', default=DEFAULT_SCENARIOS, choices=DEFAULT_SCENARIOS,
+                        help='計測する送り方')
+    args = parser.parse_args()
+
+    # 送信ごとのログ・出力を抑制
+    logging.disable(logging.WARNING)
+
+    messages = _messages(args.messages)
+    subscribers = [
+        {'user_id': f"U{index:05d}", 'security_codes': [], 'holder_keywords': [], 'min_importance': 1}
+        for index in range(args.subscribers)
+    ]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            MockLineServer(latency=args.latency, jitter=args.jitter, rate_limit_ratio=args.rate_limit_ratio,
+                           retry_after=0, failure_ratio=args.failure_ratio, seed=args.seed) as mock:
+        for name in args.scenarios:
+            print(f"🧪 {name} を計測中...")
+            with open(os.devnull, 'w') as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    results[name] = run_scenario(name, mock, args, messages, subscribers, tmp_dir)
+                finally:
+                    sys.stdout = stdout
+
+    print_results(results, args)
+
+
+if __name__ == "__main__":
+    main()
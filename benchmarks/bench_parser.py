@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+EdinetParser のマイクロベンチマーク
+
+合成コーパスを生成し、パーサーの各段階をBeautifulSoupのバックエンドごとに計測します。
+p50/p95 のレイテンシとピークRSSを出力し、ベースラインと比較して
+閾値を超える劣化があった場合は終了コード1で終了します。
+
+使用方法:
+    python benchmarks/bench_parser.py [--count 200] [--size 5]
+                                      [--backends html.parser lxml]
+                                      [--baseline benchmarks/baseline.json] [--threshold 0.2]
+                                      [--save-baseline benchmarks/baseline.json]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+# プロジェクトルートをPythonパスに追加
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+from bs4.builder import builder_registry
+
+from benchmarks.corpus import generate_corpus
+from src.core.parser import EdinetParser
+from src.utils.db import ReportDatabase
+
+DEFAULT_BACKENDS = ['html.parser', 'lxml']
+
+
+def percentile(samples, pct):
+    """サンプルのパーセンタイル値を取得（最近傍法）"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """プロセスのピークRSSをMB単位で取得（プロセスの開始からの最大値）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS は バイト単位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _timed(samples, stage, func, *args):
+    """関数の実行時間をミリ秒単位で記録して結果を返す"""
+    start = time.perf_counter()
+    result = func(*args)
+    samples.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def bench_backend(parser, pairs, repeat):
+    """
+    1つのバックエンドで各段階を計測
+    Args:
+        parser: EdinetParser インスタンス
+        pairs: (ヘッダーファイル, 本文ファイル) のリスト
+        repeat: 繰り返し回数
+    Returns:
+        dict: 段階名と計測値（ミリ秒）のリストの辞書
+    """
+    samples = {}
+    for _ in range(repeat):
+        for header_file, honbun_file in pairs:
+            header_html = header_file.read_text(encoding='utf-8')
+            honbun_html = honbun_file.read_text(encoding='utf-8')
+
+            header_soup = _timed(samples, 'header_soup', BeautifulSoup, header_html, parser.features)
+            _timed(samples, '_get_report_type', parser._get_report_type, header_soup)
+            _timed(samples, '_get_filer_info', parser._get_filer_info, header_soup)
+            honbun_soup = _timed(samples, 'honbun_soup', BeautifulSoup, honbun_html, parser.features)
+            _timed(samples, '_extract_fields', parser._extract_fields, honbun_soup)
+            _timed(samples, 'parse_files', parser.parse_files, header_file, honbun_file)
+    return samples
+
+
+def run_backend(backend, corpus_dir, pairs, db_path, repeat):
+    """
+    1つのバックエンドを計測（bench_backend を子プロセスで実行し、バックエンドごとのピークRSSを得る）
+    Args:
+        backend: BeautifulSoupのバックエンド名
+        corpus_dir: 合成コーパスのディレクトリ
+        pairs: (ヘッダーファイル, 本文ファイル) のリスト
+        db_path: 計測に使うSQLiteデータベースのパス
+        repeat: 繰り返し回数
+    Returns:
+        tuple: (段階ごとの p50/p95, ピークRSS（MB）)
+    """
+    logging.disable(logging.INFO)
+    warnings.filterwarnings('ignore', category=XMLParsedAsHTMLWarning)
+
+    db = ReportDatabase(db_path)
+    try:
+        edinet_parser = EdinetParser(corpus_dir, db=db, features=backend)
+        samples = bench_backend(edinet_parser, pairs, repeat)
+    finally:
+        db.close()
+    return summarize(samples), round(peak_rss_mb(), 1)
+
+
+def summarize(samples):
+    """計測値を p50/p95 に集約"""
+    return {
+        stage: {
+            'p50_ms': round(percentile(values, 50), 4),
+            'p95_ms': round(percentile(values, 95), 4),
+            'n': len(values),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    ベースラインと比較して劣化した段階を抽出
+    Args:
+        results: 今回の計測結果
+        baseline: ベースラインの計測結果
+        threshold: 許容する劣化率（0.2 = 20%）
+    Returns:
+        list: 劣化を説明する文字列のリスト
+    """
+    regressions = []
+    for backend, stages in results['backends'].items():
+        for stage, stats in stages.items():
+            base = baseline.get('backends', {}).get(backend, {}).get(stage)
+            if not base or not base.get('p95_ms'):
+                continue
+            ratio = stats['p95_ms'] / base['p95_ms']
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{backend} / {stage}: p95 {base['p95_ms']:.3f}ms -> {stats['p95_ms']:.3f}ms ({ratio - 1:+.0%})"
+                )
+    return regressions
+
+
+def print_results(results):
+    """計測結果を表形式で表示"""
+    for backend, stages in results['backends'].items():
+        print(f"\n📊 {backend}")
+        print(f"   {'stage':<20} {'p50 (ms)':>10} {'p95 (ms)':>10} {'n':>6}")
+        for stage, stats in stages.items():
+            print(f"   {stage:<20} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['n']:>6}")
+        print(f"   ピークRSS: {results['peak_rss_mb'][backend]:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EdinetParser のマイクロベンチマーク')
+    parser.add_argument('--count', type=int, default=200, help='生成する報告書の件数')
+    parser.add_argument('--size', type=int, default=5, help='1件あたりの文書の大きさ（共同保有者数）')
+    parser.add_argument('--repeat', type=int, default=1, help='コーパス全体の繰り返し回数')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--backends', nargs='+', default=DEFAULT_BACKENDS,
+                        help='計測するBeautifulSoupのバックエンド')
+    parser.add_argument('--baseline', help='比較対象のベースラインJSON')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='p95の劣化をエラーとみなす割合（0.2 = 20%%）')
+    parser.add_argument('--save-baseline', help='計測結果をベースラインとして保存するパス')
+    args = parser.parse_args()
+
+    # 計測中の大量のINFOログと、XML宣言付きHTMLに対する警告を抑制
+    logging.disable(logging.INFO)
+    warnings.filterwarnings('ignore', category=XMLParsedAsHTMLWarning)
+
+    results = {
+        'params': {'count': args.count, 'size': args.size, 'repeat': args.repeat, 'seed': args.seed},
+        'backends': {},
+        'peak_rss_mb': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = Path(tmp_dir) / 'downloads'
+        print(f"🧪 合成コーパスを生成中: {args.count}件 (size={args.size})")
+        pairs = generate_corpus(corpus_dir, args.count, args.size, args.seed)
+
+        # ru_maxrss はプロセスの開始からの最大値のため、バックエンドごとに新しいプロセスで計測する
+        context = multiprocessing.get_context('spawn')
+        for backend in args.backends:
+            if builder_registry.lookup(backend) is None:
+                print(f"⚠️  バックエンド {backend} は利用できないためスキップします")
+                continue
+            with context.Pool(1) as pool:
+                summary, peak = pool.apply(
+                    run_backend, (backend, corpus_dir, pairs, Path(tmp_dir) / 'bench.db', args.repeat)
+                )
+            results['backends'][backend] = summary
+            results['peak_rss_mb'][backend] = peak
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 ベースラインを保存しました: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ 閾値 {args.threshold:.0%} を超える劣化が見つかりました:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"\n✅ ベースラインからの劣化はありません（閾値 {args.threshold:.0%}）")
+
+
+if __name__ == "__main__":
+    main()
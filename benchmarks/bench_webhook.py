@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+LINE Webhook の応答時間のベンチマーク
+
+Webhookサーバーを起動し、署名付きのイベントを並列に送信して、Webhookの応答時間（p50/p95/最大）と
+返信（reply）がLINE Messaging API のモック（benchmarks/line_mock.py）に届くまでの時間を計測します。
+返信の送信にかかる時間はモックの --latency で変えられます。
+
+使用方法:
+    python benchmarks/bench_webhook.py [--server flask asgi] [--requests 200] [--concurrency 20]
+                                       [--latency 0.1] [--text 今日の株みくじをする！]
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# プロジェクトルートをPythonパスに追加
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import requests
+
+from benchmarks.bench_parser import percentile
+from benchmarks.line_mock import MockLineServer
+
+BENCH_CHANNEL_SECRET = 'bench-channel-secret'
+
+
+def build_event_body(text, user_id='U-bench'):
+    """テキストメッセージのイベント1件を含むWebhookの本文を作成"""
+    return json.dumps({
+        'destination': 'U-bot',
+        'events': [{
+            'type': 'message',
+            'mode': 'active',
+            'timestamp': int(time.time() * 1000),
+            'source': {'type': 'user', 'userId': user_id},
+            'webhookEventId': uuid.uuid4().hex,
+            'deliveryContext': {'isRedelivery': False},
+            'replyToken': uuid.uuid4().hex,
+            'message': {'id': str(uuid.uuid4().int)[:18], 'type': 'text', 'quoteToken': uuid.uuid4().hex,
+                        'text': text},
+        }],
+    }, ensure_ascii=False)
+
+
+def sign(body, secret=BENCH_CHANNEL_SECRET):
+    """X-Line-Signature ヘッダーの値を計算"""
+    digest = hmac.new(secret.encode('utf-8'), body.encode('utf-8'), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('utf-8')
+
+
+def start_flask_server():
+    """
+    Flask版のWebhookサーバーを別スレッドで起動
+    Returns:
+        tuple: (WebhookのURL, 停止する関数)
+    """
+    from werkzeug.serving import make_server
+    from src.webhook.webhook_server import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        thread.join()
+
+    return f"http://127.0.0.1:{server.server_port}/callback", stop
+
+
+def start_asgi_server():
+    """
+    ASGI（FastAPI）版のWebhookサーバーを別スレッドで起動
+    Returns:
+        tuple: (WebhookのURL, 停止する関数)
+    """
+    import uvicorn
+    from src.webhook.asgi_server import app
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join()
+
+    return f"http://127.0.0.1:{port}/callback", stop
+
+
+SERVERS = {'flask': start_flask_server, 'asgi': start_asgi_server}
+
+
+def wait_for_replies(mock, expected, timeout):
+    """モックに expected 件の返信が届くまで待つ"""
+    deadline = time.time() + timeout
+    while time.time() < deadline and len(mock.calls('reply')) < expected:
+        time.sleep(0.01)
+    return mock.calls('reply')
+
+
+def run(url, mock, args):
+    """
+    Webhookにイベントを並列に送信して計測
+    Returns:
+        dict: 応答時間・返信が届くまでの時間（ミリ秒）・スループット
+    """
+    local = threading.local()
+
+    def send(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        body = build_event_body(args.text)
+        started = time.perf_counter()
+        response = local.session.post(url, data=body.encode('utf-8'), headers={
+            'Content-Type': 'application/json',
+            'X-Line-Signature': sign(body),
+        })
+        return (time.perf_counter() - started) * 1000, response.status_code
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        responses = list(executor.map(send, range(args.requests)))
+    acked = time.time()
+    replies = wait_for_replies(mock, args.requests, args.reply_timeout)
+    finished = max([reply['received_at'] for reply in replies], default=acked)
+
+    latencies = [latency for latency, _ in responses]
+    return {
+        'ok': sum(1 for _, status in responses if status == 200),
+        'replies': len(replies),
+        'ack_p50_ms': percentile(latencies, 50),
+        'ack_p95_ms': percentile(latencies, 95),
+        'ack_max_ms': max(latencies),
+        'ack_elapsed': acked - started,
+        'reply_elapsed': finished - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LINE Webhook の応答時間のベンチマーク')
+    parser.add_argument('--server', nargs='+', default=list(SERVERS), choices=list(SERVERS),
+                        help='計測するWebhookサーバー')
+    parser.add_argument('--requests', type=int, default=200, help='送信するWebhookのリクエスト数')
+    parser.add_argument('--concurrency', type=int, default=20, help='同時に送信するリクエスト数')
+    parser.add_argument('--latency', type=float, default=0.1, help='モックの reply の応答時間（秒）')
+    parser.add_argument('--text', default='今日の株みくじをする！', help='送信するメッセージのテキスト')
+    parser.add_argument('--reply-timeout', type=float, default=60, help='返信が届くのを待つ最大秒数')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    with MockLineServer(latency=args.latency) as mock:
+        # Webhookサーバーの読み込み前に、モックに返信する設定にする
+        os.environ['LINE_API_ENDPOINT'] = mock.url
+        os.environ['LINE_CHANNEL_SECRET'] = BENCH_CHANNEL_SECRET
+        os.environ.setdefault('LINE_CHANNEL_ACCESS_TOKEN', 'bench-token')
+
+        results = {}
+        for name in args.server:
+            mock.reset()
+            url, stop = SERVERS[name]()
+            try:
+                print(f"🧪 {name}: Webhook に {args.requests}件を同時に{args.concurrency}件ずつ送信中...")
+                results[name] = run(url, mock, args)
+            finally:
+                stop()
+
+    print(f"\n📊 reply の応答時間 {args.latency * 1000:.0f}ms, 同時送信数 {args.concurrency}")
+    for name, result in results.items():
+        print(f"[{name}]")
+        print(f"  - 200 OK: {result['ok']}/{args.requests}件, 返信: {result['replies']}件")
+        print(f"  - Webhookの応答時間: p50 {result['ack_p50_ms']:.1f}ms, p95 {result['ack_p95_ms']:.1f}ms, "
+              f"最大 {result['ack_max_ms']:.1f}ms")
+        print(f"  - 全件の応答まで {result['ack_elapsed']:.2f}秒 "
+              f"({args.requests / result['ack_elapsed']:.0f} req/s), 全件の返信まで {result['reply_elapsed']:.2f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の合成EDINET報告書コーパスを生成するスクリプト
+
+EDINETからダウンロード・解凍した後と同じ構成
+（<書類ID>/XBRL/PublicDoc/*header*.htm, *honbun*.htm）でファイルを作成します。
+
+使用方法:
+    python benchmarks/corpus.py OUTPUT_DIR [--count 100] [--size 5] [--seed 0]
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+COMPANIES = [
+    ("ナラサキ産業株式会社", "8085"),
+    ("株式会社山善", "8051"),
+    ("トレンダーズ株式会社", "6069"),
+    ("株式会社ビジネスブレイン太田昭和", "9658"),
+    ("株式会社アイ・エス・ビー", "9702"),
+    ("株式会社タカショー", "7590"),
+]
+
+HOLDERS = [
+    "光通信株式会社",
+    "株式会社UH Partners 2",
+    "株式会社UH Partners 3",
+    "株式会社エスアイエル",
+    "株式会社光通信KK投資事業組合",
+]
+
+PURPOSES = [
+    "純投資",
+    "純投資及び状況に応じて経営陣への助言、重要提案行為等を行うこと",
+    "投資及び安定株主として長期保有",
+]
+
+HEADER_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
+<head><title>{report_type}</title></head>
+<body>
+<table>
+<tr><td>【表紙】</td><td></td></tr>
+<tr><td>【提出書類】</td><td>{document_type}</td></tr>
+<tr><td>【根拠条文】</td><td>法第27条の{article}</td></tr>
+<tr><td>【提出先】</td><td>関東財務局長</td></tr>
+<tr><td>【氏名又は名称】</td><td>{holder}</td></tr>
+<tr><td>【住所又は本店所在地】</td><td>東京都豊島区西池袋一丁目4番10号</td></tr>
+<tr><td>【報告義務発生日】</td><td>{report_date}</td></tr>
+<tr><td>【提出日】</td><td>{submission_date}</td></tr>
+<tr><td>【提出者及び共同保有者の総数（名）】</td><td>{holder_count}</td></tr>
+<tr><td>【提出形態】</td><td>その他</td></tr>
+{padding_rows}
+</table>
+</body>
+</html>
+"""
+
+HONBUN_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
+<head><title>{report_type}</title></head>
+<body>
+<h1>第1【発行者に関する事項】</h1>
+<table>
+<tr><td>発行者の名称</td><td><ix:nonNumeric name="jplvh_cor:NameOfIssuer" contextRef="FilingDateInstant">{company}</ix:nonNumeric></td></tr>
+<tr><td>証券コード</td><td><ix:nonNumeric name="jplvh_cor:SecurityCodeOfIssuer" contextRef="FilingDateInstant">{code}</ix:nonNumeric></td></tr>
+<tr><td>上場・店頭の別</td><td><ix:nonNumeric name="jplvh_cor:StockListing" contextRef="FilingDateInstant">上場</ix:nonNumeric></td></tr>
+</table>
+<h1>第2【提出者に関する事項】</h1>
+{holder_sections}
+</body>
+</html>
+"""
+
+HOLDER_SECTION_TEMPLATE = """<h2>{index}【提出者（大量保有者）/{index}】</h2>
+<table>
+<tr><td>氏名又は名称</td><td><ix:nonNumeric name="jplvh_cor:Name" contextRef="{context}">{holder}</ix:nonNumeric></td></tr>
+<tr><td>保有目的</td><td><ix:nonNumeric name="jplvh_cor:PurposeOfHolding" contextRef="{context}">{purpose}</ix:nonNumeric></td></tr>
+<tr><td>保有株券等の数（総数）</td><td><ix:nonFraction name="jplvh_cor:TotalNumberOfStocksEtcHeld" contextRef="{context}" unitRef="shares" decimals="0" format="ixt:numdotdecimal">{shares:,}</ix:nonFraction></td></tr>
+<tr><td>上記提出者の株券等保有割合（％）</td><td><ix:nonFraction name="jplvh_cor:HoldingRatioOfShareCertificatesEtc" contextRef="{context}" unitRef="pure" decimals="2" scale="-2">{ratio:.2f}</ix:nonFraction></td></tr>
+<tr><td>直前の報告書に記載された株券等保有割合（％）</td><td><ix:nonFraction name="jplvh_cor:HoldingRatioOfShareCertificatesEtcPerLastReport" contextRef="{context}" unitRef="pure" decimals="2" scale="-2">{ratio_before:.2f}</ix:nonFraction></td></tr>
+</table>
+<p>{notes}</p>
+"""
+
+
+def _wareki(year, month, day):
+    """西暦から令和表記の日付文字列を作成"""
+    return f"令和{year - 2018}年{month}月{day}日"
+
+
+def generate_document_pair(rng, size):
+    """
+    ヘッダーファイルと本文ファイルの内容を1組生成
+    Args:
+        rng: random.Random インスタンス
+        size: 文書の大きさ（共同保有者の数と注記の段落数）
+    Returns:
+        tuple: (ヘッダーのHTML, 本文のHTML)
+    """
+    company, code = rng.choice(COMPANIES)
+    is_change = rng.random() < 0.7
+    report_type = "変更報告書" if is_change else "大量保有報告書"
+    year, month = rng.randint(2020, 2025), rng.randint(1, 12)
+    day = rng.randint(1, 20)
+    holder_count = max(1, size)
+
+    sections = []
+    for index in range(1, holder_count + 1):
+        context = ("FilingDateInstant_FilerLargeVolumeHolder1Member" if index == 1
+                   else f"FilingDateInstant_JointHolder{index - 1}Member")
+        ratio = rng.uniform(0.5, 15.0)
+        sections.append(HOLDER_SECTION_TEMPLATE.format(
+            index=index,
+            context=context,
+            holder=rng.choice(HOLDERS),
+            purpose=rng.choice(PURPOSES),
+            shares=rng.randint(10_000, 5_000_000),
+            ratio=ratio,
+            ratio_before=max(0.0, ratio - rng.uniform(-2.0, 2.0)),
+            notes="当該株券等に関する担保契約等重要な契約はありません。" * size,
+        ))
+
+    padding_rows = "\n".join(
+        f"<tr><td>【備考{i}】</td><td>該当事項はありません。</td></tr>" for i in range(size)
+    )
+    header = HEADER_TEMPLATE.format(
+        report_type=report_type,
+        document_type=f"{report_type}（特例対象株券等）" if is_change else "大量保有報告書",
+        article="26第1項" if is_change else "23第1項",
+        holder=rng.choice(HOLDERS),
+        report_date=_wareki(year, month, day),
+        submission_date=_wareki(year, month, day + 5),
+        holder_count=holder_count,
+        padding_rows=padding_rows,
+    )
+    honbun = HONBUN_TEMPLATE.format(
+        report_type=report_type,
+        company=company,
+        code=code,
+        holder_sections="\n".join(sections),
+    )
+    return header, honbun
+
+
+def generate_corpus(output_dir, count=100, size=5, seed=0):
+    """
+    合成コーパスを生成
+    Args:
+        output_dir: 出力先ディレクトリ
+        count: 生成する報告書の件数
+        size: 1件あたりの文書の大きさ
+        seed: 乱数シード
+    Returns:
+        list: (ヘッダーファイル, 本文ファイル) のパスのリスト
+    """
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    pairs = []
+
+    for i in range(count):
+        doc_id = f"S1{i:06d}"
+        public_doc = output_dir / doc_id / "XBRL" / "PublicDoc"
+        public_doc.mkdir(parents=True, exist_ok=True)
+
+        header, honbun = generate_document_pair(rng, size)
+        header_file = public_doc / f"0000000_header_jplvh070000-lvh-001_{doc_id}.htm"
+        honbun_file = public_doc / f"0101010_honbun_jplvh070000-lvh-001_{doc_id}.htm"
+        header_file.write_text(header, encoding='utf-8')
+        honbun_file.write_text(honbun, encoding='utf-8')
+        pairs.append((header_file, honbun_file))
+
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ベンチマーク用の合成報告書コーパスを生成')
+    parser.add_argument('output_dir', help='出力先ディレクトリ')
+    parser.add_argument('--count', type=int, default=100, help='生成する報告書の件数')
+    parser.add_argument('--size', type=int, default=5, help='1件あたりの文書の大きさ（共同保有者数）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    args = parser.parse_args()
+
+    pairs = generate_corpus(args.output_dir, args.count, args.size, args.seed)
+    print(f"✅ {len(pairs)}件の報告書を生成しました: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+LINE Messaging API のローカルモック
+
+push・multicast・reply の3つのエンドポイントを、指定した応答時間・429（レート制限）・
+失敗の注入付きで再現します。LINE_API_ENDPOINT にモックのURLを指定すると、
+通知・Webhookを本物のLINEに送らずに負荷試験ができます。テストでは pytest のフィクスチャとして使います。
+
+使用方法:
+    python benchmarks/line_mock.py [--port 8081] [--latency 0.05] [--jitter 0.02]
+                                   [--rate-limit-ratio 0.05] [--failure-ratio 0.01]
+
+    LINE_API_ENDPOINT=http://127.0.0.1:8081 python run_scraper.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENDPOINTS = {
+    '/v2/bot/message/push': 'push',
+    '/v2/bot/message/multicast': 'multicast',
+    '/v2/bot/message/reply': 'reply',
+}
+
+
+class MockLineServer:
+    """
+    LINE Messaging API のモックサーバー（別スレッドで動作する）
+    受け付けたリクエストは requests に記録し、同じ再試行キーの再送には本物と同じく409を返す
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 rate_limit_ratio=0.0, retry_after=1, failure_ratio=0.0, seed=None):
+        """
+        初期化
+        Args:
+            host: 待ち受けるアドレス
+            port: 待ち受けるポート（0の場合は空いているポートを使う）
+            latency: 応答までの待ち時間（秒）
+            jitter: 待ち時間に加える揺らぎの最大値（秒）
+            rate_limit_ratio: 429を返す割合（0〜1）
+            retry_after: 429の応答の Retry-After（秒）
+            failure_ratio: 500を返す割合（0〜1）
+            seed: 429・500・揺らぎの乱数のシード
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.failure_ratio = failure_ratio
+        self.requests = []
+        self._random = random.Random(seed)
+        self._failures = []
+        self._accepted_keys = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def url(self):
+        """モックのURL（LINE_API_ENDPOINT・Configuration の host に指定する）"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """別スレッドでリクエストの受け付けを開始"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """リクエストの受け付けを終了"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def configuration(self, access_token='mock-token'):
+        """
+        モックに送信する linebot の Configuration を作成
+        Returns:
+            Configuration: host にモックのURLを指定した設定
+        """
+        from linebot.v3.messaging import Configuration
+
+        return Configuration(host=self.url, access_token=access_token)
+
+    def fail_next(self, count=1, status=500, retry_after=None):
+        """
+        次の count 件のリクエストに指定したステータスを返す（送信失敗の注入）
+        Args:
+            count: 失敗させるリクエスト数
+            status: 返すHTTPステータス
+            retry_after: 応答に付ける Retry-After（秒）
+        """
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def reset(self):
+        """記録したリクエスト・受付済みの再試行キー・注入した失敗を消去"""
+        with self._lock:
+            self.requests.clear()
+            self._failures.clear()
+            self._accepted_keys.clear()
+
+    def calls(self, endpoint=None):
+        """
+        受け付けた（2xxを返した）リクエストを取得
+        Args:
+            endpoint: 'push'・'multicast'・'reply' のいずれか（省略時は全て）
+        Returns:
+            list: endpoint, body, retry_key, status, received_at を持つ辞書のリスト
+        """
+        with self._lock:
+            return [
+                request for request in self.requests
+                if request['status'] == 200 and (endpoint is None or request['endpoint'] == endpoint)
+            ]
+
+    def _respond(self, endpoint, body, retry_key):
+        """リクエストへの応答（ステータス・ヘッダー・本文）を決める"""
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            if self._failures:
+                status, retry_after = self._failures.pop(0)
+            elif self._random.random() < self.rate_limit_ratio:
+                status, retry_after = 429, self.retry_after
+            elif self._random.random() < self.failure_ratio:
+                status, retry_after = 500, None
+            elif retry_key and retry_key in self._accepted_keys:
+                status, retry_after = 409, None
+            else:
+                status, retry_after = 200, None
+
+            request_id = str(uuid.uuid4())
+            headers = {'x-line-request-id': request_id}
+            if status == 200 and retry_key:
+                self._accepted_keys[retry_key] = request_id
+            if status == 409:
+                headers['x-line-accepted-request-id'] = self._accepted_keys[retry_key]
+            if retry_after is not None:
+                headers['Retry-After'] = str(retry_after)
+            self.requests.append({
+                'endpoint': endpoint,
+                'body': body,
+                'retry_key': retry_key,
+                'status': status,
+                'received_at': time.time(),
+            })
+
+        if status == 200:
+            sent = [{'id': str(uuid.uuid4())} for _ in body.get('messages', [])]
+            payload = {'sentMessages': sent} if endpoint in ('push', 'reply') else {}
+        elif status == 429:
+            payload = {'message': 'The API rate limit has been exceeded. Try again later.'}
+        elif status == 409:
+            payload = {'message': 'The retry key is already accepted'}
+        else:
+            payload = {'message': 'Injected failure'}
+        return status, headers, payload
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # ヘッダーと本文を別々に書き込むため、Nagleアルゴリズムによる遅延（40ms程度）を避ける
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                endpoint = ENDPOINTS.get(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if endpoint is None:
+                    self._send(404, {}, {'message': 'Not found'})
+                    return
+                try:
+                    body = json.loads(raw or b'{}')
+                except ValueError:
+                    self._send(400, {}, {'message': 'The request body has 1 error(s)'})
+                    return
+                status, headers, payload = mock._respond(endpoint, body, self.headers.get('X-Line-Retry-Key'))
+                self._send(status, headers, payload)
+
+            def _send(self, status, headers, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                # 負荷試験中にリクエストごとのログを出さない
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LINE Messaging API のローカルモック')
+    parser.add_argument('--host', default='127.0.0.1', help='待ち受けるアドレス')
+    parser.add_argument('--port', type=int, default=8081, help='待ち受けるポート')
+    parser.add_argument('--latency', type=float, default=0.05, help='応答までの待ち時間（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='待ち時間に加える揺らぎの最大値（秒）')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='429を返す割合（0〜1）')
+    parser.add_argument('--retry-after', type=int, default=1, help='429の応答の Retry-After（秒）')
+    parser.add_argument('--failure-ratio', type=float, default=0.0, help='500を返す割合（0〜1）')
+    args = parser.parse_args()
+
+    mock = MockLineServer(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                          rate_limit_ratio=args.rate_limit_ratio, retry_after=args.retry_after,
+                          failure_ratio=args.failure_ratio)
+    mock.start()
+    print(f"🧪 LINE Messaging API のモックを起動しました: {mock.url}")
+    print(f"   LINE_API_ENDPOINT={mock.url} を指定して実行してください（Ctrl+C で終了）")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.stop()
+        counts = {}
+        for request in mock.requests:
+            key = (request['endpoint'], request['status'])
+            counts[key] = counts.get(key, 0) + 1
+        for (endpoint, status), count in sorted(counts.items()):
+            print(f"  - {endpoint} {status}: {count}件")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,7 @@ DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", "data/downloads")
 # LINE API関連
 LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
 LINE_USER_ID = os.getenv("LINE_USER_ID")
+LINE_API_ENDPOINT = os.getenv("LINE_API_ENDPOINT")  # 送信先を切り替える場合に指定（例: benchmarks/line_mock.py のURL）
 
 # アーカイブポリシー設定
 ARCHIVE_POLICIES = {
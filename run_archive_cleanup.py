@@ -4,11 +4,11 @@
 
 このスクリプトは以下の処理を実行します:
 1. 古いファイルのアーカイブ
-2. ストレージ使用量の最適化
+2. ストレージ使用量の最適化（データベースの空きページの解放・統計情報の更新）
 3. 統計情報の出力
 
 使用方法:
-    python run_archive_cleanup.py [--dry-run] [--retention-days 90]
+    python run_archive_cleanup.py [--dry-run] [--retention-days 90] [--vacuum-pages 25000] [--full-vacuum]
 """
 
 import sys
@@ -20,7 +20,7 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from src.utils.archive_manager import ArchiveManager
-from src.utils.db import ReportDatabase
+from src.utils.db import ReportDatabase, INCREMENTAL_VACUUM_MAX_PAGES
 from src.core.notifier import send_message
 from config.config import ARCHIVE_POLICIES, DOWNLOAD_DIR
 
@@ -33,6 +33,10 @@ def main():
                        help='基本保持期間（日数）')
     parser.add_argument('--notify', action='store_true',
                        help='処理結果をLINEに通知')
+    parser.add_argument('--vacuum-pages', type=int, default=INCREMENTAL_VACUUM_MAX_PAGES,
+                       help='データベースの空きページを解放する上限（ページ数）')
+    parser.add_argument('--full-vacuum', action='store_true',
+                       help='VACUUMでデータベースファイル全体を作り直す（auto_vacuumの切り替えにも使用）')
     
     args = parser.parse_args()
     
@@ -70,14 +74,20 @@ def main():
             after_stats = archive_manager.get_archive_statistics()
             print_statistics(after_stats)
             
+            # データベースファイルの整理
+            print("\n🧹 データベースファイルを整理します")
+            storage_report = maintain_database(args.vacuum_pages, args.full_vacuum)
+            print_storage_report(storage_report)
+            
             # LINE通知の送信
             if args.notify:
-                send_cleanup_notification(archive_stats, before_stats, after_stats)
+                send_cleanup_notification(archive_stats, before_stats, after_stats, storage_report)
         
         else:
             # ドライラン: アーカイブ対象を表示
             print("\n🔍 アーカイブ対象の確認（ドライラン）")
             show_archive_candidates(archive_manager, args.retention_days)
+            show_storage_stats()
     
     except Exception as e:
         error_msg = f"❌ アーカイブ処理中にエラーが発生しました: {e}"
@@ -103,6 +113,43 @@ def print_statistics(stats):
     print(f"   💾 総アーカイブサイズ: {stats.get('total_archive_size_mb', 0):.2f} MB")
     print(f"   📦 アーカイブファイル数: {stats.get('archive_file_count', 0)}個")
 
+def maintain_database(vacuum_pages, full_vacuum=False):
+    """データベースの空きページを解放し、統計情報を更新する"""
+    db = ReportDatabase()
+    try:
+        return db.maintain_storage(max_pages=vacuum_pages, full_vacuum=full_vacuum)
+    finally:
+        db.close()
+
+def print_storage_report(report):
+    """データベースファイルの整理前後のページ数を表示"""
+    before, after = report['before'], report['after']
+    if not before or not after:
+        print("   ストレージ情報を取得できませんでした")
+        return
+    
+    print(f"   📄 ページ数: {before['page_count']} → {after['page_count']}（ページサイズ {after['page_size']} バイト）")
+    print(f"   🕳️  空きページ: {before['freelist_count']} → {after['freelist_count']}")
+    print(f"   💾 ファイルサイズ: {before['size_mb']:.2f} MB → {after['size_mb']:.2f} MB")
+    print(f"   ♻️  解放したページ: {report['released_pages']}{'（VACUUM）' if report['vacuumed'] else ''}")
+    if after['auto_vacuum'] != 'incremental':
+        print("   ⚠️  auto_vacuum が INCREMENTAL ではありません。--full-vacuum で一度だけ切り替えてください")
+
+def show_storage_stats():
+    """データベースファイルのページ数を表示（ドライラン用）"""
+    db = ReportDatabase(read_only=True)
+    try:
+        stats = db.get_storage_stats()
+    finally:
+        db.close()
+    if not stats:
+        print("   ストレージ情報を取得できませんでした")
+        return
+    
+    print("\n🧹 データベースファイルの状況:")
+    print(f"   📄 ページ数: {stats['page_count']}（空きページ {stats['freelist_count']}, auto_vacuum={stats['auto_vacuum']}）")
+    print(f"   💾 ファイルサイズ: {stats['size_mb']:.2f} MB（解放可能 {stats['free_mb']:.2f} MB）")
+
 def show_archive_candidates(archive_manager, retention_days):
     """アーカイブ対象のファイルを表示（ドライラン用）"""
     try:
@@ -145,7 +192,7 @@ def show_archive_candidates(archive_manager, retention_days):
     except Exception as e:
         print(f"   ❌ アーカイブ対象の確認中にエラー: {e}")
 
-def send_cleanup_notification(archive_stats, before_stats, after_stats):
+def send_cleanup_notification(archive_stats, before_stats, after_stats, storage_report=None):
     """クリーンアップ結果をLINEに通知"""
     try:
         message = "🗂️ アーカイブクリーンアップ完了\n\n"
@@ -165,6 +212,10 @@ def send_cleanup_notification(archive_stats, before_stats, after_stats):
         message += f"   アーカイブ: {archived_count}件\n"
         message += f"   総容量: {after_stats.get('total_archive_size_mb', 0):.1f} MB"
         
+        if storage_report and storage_report['before'] and storage_report['after']:
+            message += f"\n\n🧹 データベース: {storage_report['before']['size_mb']:.1f} MB → {storage_report['after']['size_mb']:.1f} MB"
+            message += f"（{storage_report['released_pages']}ページ解放）"
+        
         send_message(message)
         print("📱 LINE通知を送信しました")
         
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+処理済み報告書のエクスポートジョブ
+
+データベースの processed_reports を少しずつ読み出しながらファイルに書き出すため、
+件数が多くてもメモリ使用量は一定です。
+
+使用方法:
+    python run_export.py OUTPUT [--format ndjson|csv|json|parquet] [--gzip] [--batch-size 1000]
+
+    形式を省略した場合は拡張子（.ndjson / .jsonl / .csv / .json、末尾の .gz で圧縮）から判定します。
+    parquet の場合、OUTPUT は年・報告書種類で分割したデータセットのディレクトリになります。
+"""
+
+import sys
+import os
+import argparse
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from src.utils.db import get_database
+from src.utils.exporters import WRITERS
+
+def main():
+    parser = argparse.ArgumentParser(description='処理済み報告書のエクスポート')
+    parser.add_argument('output', help='エクスポート先のファイルパス')
+    parser.add_argument('--format', choices=sorted(WRITERS) + ['parquet'], default=None,
+                       help='エクスポート形式（省略時は拡張子から判定）')
+    parser.add_argument('--gzip', action='store_true', default=None,
+                       help='gzip圧縮して書き出す')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                       help='1回のクエリで取得する件数')
+
+    args = parser.parse_args()
+
+    print(f"📤 処理済み報告書をエクスポートします: {args.output}")
+
+    db = get_database()
+    try:
+        if args.format == 'parquet':
+            succeeded = db.export_parquet(args.output, batch_size=args.batch_size)
+        else:
+            succeeded = db.export_reports(args.output, fmt=args.format, compress=args.gzip, batch_size=args.batch_size)
+        
+        if not succeeded:
+            print("❌ エクスポートに失敗しました")
+            sys.exit(1)
+    finally:
+        db.close()
+
+    print("✅ エクスポートが完了しました")
+
+if __name__ == "__main__":
+    main()
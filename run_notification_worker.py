@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+LINE通知の送信ワーカー
+
+このスクリプトは以下の処理を実行します:
+1. 送信待ちテーブル（notification_outbox）から送信時刻になった通知を取り出す
+2. LINEに送信し、失敗した通知は指数バックオフで再送する
+3. 送信結果の集計を出力
+
+使用方法:
+    python run_notification_worker.py [--once] [--timeout 300] [--poll-interval 10]
+"""
+
+import sys
+import os
+import argparse
+import signal
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from src.core.outbox import OutboxWorker, OUTBOX_POLL_INTERVAL, OUTBOX_MAX_ATTEMPTS
+
+def main():
+    parser = argparse.ArgumentParser(description='LINE通知の送信ワーカー')
+    parser.add_argument('--once', action='store_true',
+                       help='送信時刻になった通知を送信したら終了する（cron向け）')
+    parser.add_argument('--timeout', type=float, default=None,
+                       help='--once の場合に送信を続ける最大秒数')
+    parser.add_argument('--poll-interval', type=float, default=OUTBOX_POLL_INTERVAL,
+                       help='送信待ちの通知がない場合に次に確認するまでの秒数')
+    parser.add_argument('--max-attempts', type=int, default=OUTBOX_MAX_ATTEMPTS,
+                       help='送信をあきらめるまでの試行回数')
+
+    args = parser.parse_args()
+
+    print("📨 LINE通知の送信ワーカーを開始します")
+
+    with OutboxWorker(max_attempts=args.max_attempts) as worker:
+        # Ctrl+C・SIGTERM で処理中の通知を送り終えてから終了する
+        def handle_signal(signum, frame):
+            print("\n⏹️ 終了シグナルを受け取りました。処理中の通知を送信して終了します")
+            worker.stop()
+
+        signal.signal(signal.SIGINT, handle_signal)
+        signal.signal(signal.SIGTERM, handle_signal)
+
+        if args.once:
+            stats = worker.drain(timeout=args.timeout)
+        else:
+            worker.run_forever(poll_interval=args.poll_interval)
+            stats = dict(worker.stats)
+
+        counts = worker.db.get_outbox_counts()
+
+    print(f"✅ 送信 {stats['sent']}件, 再送予定 {stats['retried']}件, 送信をあきらめた通知 {stats['failed']}件")
+    print(f"📊 送信待ち {counts.get('pending', 0)}件, 送信済み {counts.get('sent', 0)}件, "
+          f"失敗 {counts.get('failed', 0)}件")
+
+if __name__ == "__main__":
+    main()
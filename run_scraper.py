@@ -17,8 +17,10 @@ def main():
     
     # モジュールのインポート
     from src.core.hikariget import fetch_reports
-    from src.core.parser import parse_and_filter_reports
-    from src.core.notifier import send_line_message
+    from src.core.parser import iter_line_messages
+    from src.core.notifier import LineNotifier
+    from src.core.outbox import OutboxWorker, OUTBOX_DRAIN_TIMEOUT
+    from src.core.digest import get_digest_renderer
     from src.utils.db import ReportDatabase
     from config.config import DOWNLOAD_DIR
     
@@ -65,13 +67,32 @@ def main():
         fetch_reports(target_date)
 
     # 2. 解凍・パース・メッセージ整形（再通知除外もここで実施）
-    print("🗂️ [main] ファイル解析中...")
-    messages = parse_and_filter_reports(DOWNLOAD_DIR)
-
-    # 3. 通知処理
-    print("📡 [main] LINE通知を開始...")
-    for message in messages:
-        send_line_message(message)
+    # 3. 通知の登録（報告書を処理済みにするのと同じトランザクションで送信待ちテーブルに書き込む。
+    #    データベースを使えない場合のみメッセージが返るため、その場で送信する）
+    print("🗂️ [main] ファイル解析と通知の登録を開始...")
+    with LineNotifier() as notifier:
+        for message in iter_line_messages(DOWNLOAD_DIR, outbox=True, digest=get_digest_renderer()):
+            notifier.add(message)
+        notifier.flush()
+        
+        # 4. 送信待ちの通知を送信（1つの接続を使い回し、送信できなかった通知は後で再送する）
+        print("📨 [main] 送信待ちの通知を送信します...")
+        with OutboxWorker(notifier=notifier) as worker:
+            outbox_stats = worker.drain(timeout=OUTBOX_DRAIN_TIMEOUT)
+            remaining = worker.db.get_outbox_counts().get('pending', 0)
+    
+    stats = notifier.stats()
+    if stats['batches']:
+        print(
+            f"📨 [main] {stats['messages']}件を{stats['batches']}回のプッシュで送信しました"
+            f"（失敗 {stats['failed_messages']}件, p50 {stats['latency_p50'] * 1000:.0f}ms,"
+            f" p95 {stats['latency_p95'] * 1000:.0f}ms, 合計 {stats['total_time']:.1f}秒）"
+        )
+    if outbox_stats['retried'] or outbox_stats['failed'] or remaining:
+        print(
+            f"⏳ [main] 再送待ち {remaining}件, 送信をあきらめた通知 {outbox_stats['failed']}件"
+            f"（再送は run_notification_worker.py で行います）"
+        )
 
     print("✅ [main] 全ての処理が完了しました。")
 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+LINE通知の購読者とウォッチリストの管理
+
+このスクリプトは以下の処理を実行します:
+1. 購読者の登録・ウォッチリスト（証券コード・保有者名・最低の重要度）の更新
+2. 購読の停止
+3. 購読者の一覧表示
+
+使用方法:
+    python run_subscribers.py list [--all]
+    python run_subscribers.py add <ユーザーID> [--codes 7203 9984] [--holders 光通信] [--min-importance 2]
+    python run_subscribers.py remove <ユーザーID>
+"""
+
+import sys
+import os
+import argparse
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from src.utils.db import get_database
+
+def main():
+    parser = argparse.ArgumentParser(description='LINE通知の購読者の管理')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help='購読者の一覧を表示')
+    list_parser.add_argument('--all', action='store_true', help='購読を停止した購読者も表示')
+
+    add_parser = subparsers.add_parser('add', help='購読者を登録・ウォッチリストを更新')
+    add_parser.add_argument('user_id', help='LINEのユーザーID')
+    add_parser.add_argument('--name', help='表示名')
+    add_parser.add_argument('--codes', nargs='*', help='通知する証券コード（指定なしで解除）')
+    add_parser.add_argument('--holders', nargs='*', help='通知する保有者名（部分一致。指定なしで解除）')
+    add_parser.add_argument('--min-importance', type=int, choices=[1, 2, 3],
+                           help='通知する最低の重要度レベル')
+
+    remove_parser = subparsers.add_parser('remove', help='購読を停止')
+    remove_parser.add_argument('user_id', help='LINEのユーザーID')
+
+    args = parser.parse_args()
+
+    db = get_database()
+    try:
+        if args.command == 'add':
+            if not db.upsert_subscriber(args.user_id, display_name=args.name, security_codes=args.codes,
+                                        holder_keywords=args.holders, min_importance=args.min_importance):
+                print("❌ 購読者の登録に失敗しました")
+                sys.exit(1)
+            print(f"✅ 購読者を登録しました: {args.user_id}")
+        elif args.command == 'remove':
+            if db.remove_subscriber(args.user_id):
+                print(f"✅ 購読を停止しました: {args.user_id}")
+            else:
+                print(f"⚠️ 購読中の購読者が見つかりません: {args.user_id}")
+        else:
+            subscribers = db.get_subscribers(active_only=not args.all)
+            print(f"👥 購読者: {len(subscribers)}人")
+            for subscriber in subscribers:
+                codes = ', '.join(subscriber['security_codes']) or '全銘柄'
+                holders = ', '.join(subscriber['holder_keywords']) or '全保有者'
+                status = '' if subscriber['active'] else '（停止中）'
+                print(f"  - {subscriber['user_id']} {subscriber['display_name'] or ''}{status}: "
+                      f"{codes} / {holders} / 重要度{subscriber['min_importance']}以上")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,38 @@
 #!/usr/bin/env python3
 """
 LINE Bot Webhook サーバー実行スクリプト
+
+使用方法:
+    python run_webhook.py [--server asgi|flask] [--port 5000]
+
+asgi（既定）は署名を確認してすぐに応答し、イベントをワーカーで処理するFastAPI版、
+flask はイベントを処理してから応答する従来のFlask版を起動します。
 """
 
 import sys
 import os
+import argparse
 
 # プロジェクトルートをパスに追加
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
-from src.webhook.webhook_server import app
+def main():
+    parser = argparse.ArgumentParser(description='LINE Bot Webhook サーバー')
+    parser.add_argument('--server', choices=['asgi', 'flask'], default=os.environ.get('WEBHOOK_SERVER', 'asgi'),
+                        help='起動するサーバー（asgi: FastAPI + uvicorn, flask: 従来のFlask）')
+    parser.add_argument('--host', default='0.0.0.0', help='待ち受けるアドレス')
+    parser.add_argument('--port', type=int, default=int(os.environ.get("PORT", 5000)), help='待ち受けるポート')
+    args = parser.parse_args()
+
+    if args.server == 'flask':
+        from src.webhook.webhook_server import app
+        app.run(host=args.host, port=args.port)
+        return
+
+    import uvicorn
+    from src.webhook.asgi_server import app
+    uvicorn.run(app, host=args.host, port=args.port)
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port)
+    main()
@@ -0,0 +1,219 @@
+import logging
+import os
+import re
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+logger = logging.getLogger('edinet_digest')
+
+# まとめる単位（'company': 対象企業ごと, 'holder': 保有者ごと, 'off': まとめずに1件ずつ送信）
+DIGEST_MODE = os.getenv('DIGEST_MODE', 'company')
+
+# まとめたメッセージの形式（'flex': Flexメッセージのカルーセル, 'text': ページに分けたテキスト）
+DIGEST_FORMAT = os.getenv('DIGEST_FORMAT', 'flex')
+
+# この件数以上の報告書がある場合にまとめる（少ない日は従来どおり1件ずつ送信する）
+DIGEST_MIN_FILINGS = int(os.getenv('DIGEST_MIN_FILINGS', 5))
+
+# まとめずに個別に送信する重要度レベル（この値以上の報告書は個別のメッセージにする）
+DIGEST_INDIVIDUAL_IMPORTANCE = int(os.getenv('DIGEST_INDIVIDUAL_IMPORTANCE', 3))
+
+# 1つのまとめに含める報告書の最大件数と、まとめるまでに待つ最大秒数（どちらかに達したらまとめて送信する）
+DIGEST_MAX_FILINGS = int(os.getenv('DIGEST_MAX_FILINGS', 200))
+DIGEST_WINDOW_SECONDS = float(os.getenv('DIGEST_WINDOW_SECONDS', 300))
+
+# Flexメッセージの1つのバブルに載せる報告書の件数（残りは「他N件」と表示）
+DIGEST_ROWS_PER_BUBBLE = int(os.getenv('DIGEST_ROWS_PER_BUBBLE', 8))
+
+# テキスト形式の1ページに載せる報告書の件数
+DIGEST_TEXT_PAGE_SIZE = int(os.getenv('DIGEST_TEXT_PAGE_SIZE', 20))
+
+# 1つのカルーセルに載せられるバブルの最大数（LINE Messaging API の上限）
+FLEX_CAROUSEL_MAX_BUBBLES = 12
+
+# 代替テキストの最大文字数（LINE Messaging API の上限）
+FLEX_ALT_TEXT_MAX_LENGTH = 400
+
+_RATIO_PATTERN = re.compile(r'(\d+\.\d+|\d+)')
+
+
+def _parse_ratio(ratio_str):
+    """保有割合の文字列から数値を抽出"""
+    if ratio_str is None:
+        return None
+    match = _RATIO_PATTERN.search(str(ratio_str))
+    return float(match.group(1)) if match else None
+
+
+def _ratio_text(report):
+    """報告書の保有割合（変更報告書は変更前→変更後と増減）を1行のテキストにする"""
+    after = _parse_ratio(report.get('holding_ratio_after') or report.get('holding_ratio'))
+    before = _parse_ratio(report.get('holding_ratio_before'))
+    if after is None:
+        return '保有割合 不明'
+    if before is None:
+        return f"{after:.2f}%"
+    return f"{before:.2f}% → {after:.2f}% ({after - before:+.2f}%)"
+
+
+class DigestRenderer:
+    """
+    多数の新規報告書を対象企業または保有者ごとにまとめ、Flexメッセージのカルーセルまたは
+    ページに分けたテキストにする（高重要度の報告書は従来どおり個別のメッセージにする）
+    """
+
+    def __init__(self, group_by=DIGEST_MODE, fmt=DIGEST_FORMAT, min_filings=DIGEST_MIN_FILINGS,
+                 individual_importance=DIGEST_INDIVIDUAL_IMPORTANCE, max_filings=DIGEST_MAX_FILINGS,
+                 window_seconds=DIGEST_WINDOW_SECONDS, rows_per_bubble=DIGEST_ROWS_PER_BUBBLE,
+                 text_page_size=DIGEST_TEXT_PAGE_SIZE):
+        """
+        初期化
+        Args:
+            group_by: まとめる単位（'company' または 'holder'）
+            fmt: メッセージの形式（'flex' または 'text'）
+            min_filings: まとめる報告書の最少件数（これより少ない場合は1件ずつのメッセージにする）
+            individual_importance: 個別のメッセージにする重要度レベル
+            max_filings: 1つのまとめに含める報告書の最大件数
+            window_seconds: 報告書をまとめるまでに待つ最大秒数
+            rows_per_bubble: Flexメッセージの1つのバブルに載せる報告書の件数
+            text_page_size: テキスト形式の1ページに載せる報告書の件数
+        """
+        if group_by not in ('company', 'holder'):
+            raise ValueError(f"まとめる単位は 'company' か 'holder' を指定してください: {group_by}")
+        if fmt not in ('flex', 'text'):
+            raise ValueError(f"メッセージの形式は 'flex' か 'text' を指定してください: {fmt}")
+        self.group_by = group_by
+        self.fmt = fmt
+        self.min_filings = max(1, min_filings)
+        self.individual_importance = individual_importance
+        self.max_filings = max(1, max_filings)
+        self.window_seconds = window_seconds
+        self.rows_per_bubble = max(1, rows_per_bubble)
+        self.text_page_size = max(1, text_page_size)
+
+    def _group_key(self, report):
+        """まとめる単位の見出し"""
+        if self.group_by == 'holder':
+            return report.get('holder_name') or '不明'
+        return f"{report.get('target_company') or '不明'} ({report.get('security_code') or '不明'})"
+
+    def _row_label(self, report):
+        """まとめの中の1行の見出し（対象企業ごとなら保有者、保有者ごとなら対象企業）"""
+        if self.group_by == 'holder':
+            return f"{report.get('target_company') or '不明'} ({report.get('security_code') or '不明'})"
+        return report.get('holder_name') or '不明'
+
+    def render(self, reports, messages, importance_levels):
+        """
+        報告書のメッセージをまとめる
+        Args:
+            reports: 新規報告書の解析結果のリスト
+            messages: reports と同じ順の1件ずつのメッセージ（テキスト）のリスト
+            importance_levels: reports と同じ順の重要度レベルのリスト
+        Returns:
+            list: 高重要度の報告書の個別のメッセージの後に、まとめたメッセージを並べたリスト
+                  （Flex形式のまとめは Messaging API のメッセージオブジェクトの辞書）
+        """
+        individual = []
+        grouped = {}
+        digest_count = 0
+        for report, message, importance_level in zip(reports, messages, importance_levels):
+            if importance_level >= self.individual_importance:
+                individual.append(message)
+                continue
+            grouped.setdefault(self._group_key(report), []).append(report)
+            digest_count += 1
+
+        if digest_count < self.min_filings:
+            return list(messages)
+
+        if self.fmt == 'flex':
+            digest = self._render_flex(grouped, digest_count)
+        else:
+            digest = self._render_text(grouped, digest_count)
+        logger.info(f"{digest_count}件の報告書を{len(digest)}件のメッセージにまとめました（個別 {len(individual)}件）")
+        return individual + digest
+
+    def _title(self, digest_count, group_count):
+        unit = '社' if self.group_by == 'company' else '者'
+        return f"📊 大量保有報告書 {digest_count}件（{group_count}{unit}）"
+
+    def _render_text(self, grouped, digest_count):
+        """ページに分けたテキストのまとめを作成（ページが変わった場合は見出しを繰り返す）"""
+        icon = '🏢' if self.group_by == 'company' else '👤'
+        pages = []
+        lines = []
+        rows = 0
+        current_key = None
+        for key, group in grouped.items():
+            for report in group:
+                if rows >= self.text_page_size:
+                    pages.append(lines)
+                    lines, rows, current_key = [], 0, None
+                if key != current_key:
+                    lines.append(f"{icon} {key}")
+                    current_key = key
+                lines.append(f"・{self._row_label(report)} {_ratio_text(report)}")
+                rows += 1
+        if lines:
+            pages.append(lines)
+
+        title = self._title(digest_count, len(grouped))
+        if len(pages) == 1:
+            return [f"{title}\n\n" + '\n'.join(pages[0])]
+        return [f"{title}（{index}/{len(pages)}）\n\n" + '\n'.join(page) for index, page in enumerate(pages, 1)]
+
+    def _bubble(self, key, group):
+        """1つのまとめ単位のバブルを作成"""
+        rows = [
+            {
+                'type': 'box',
+                'layout': 'horizontal',
+                'contents': [
+                    {'type': 'text', 'text': self._row_label(report), 'size': 'sm', 'flex': 3, 'wrap': True},
+                    {'type': 'text', 'text': _ratio_text(report), 'size': 'sm', 'flex': 4, 'align': 'end', 'wrap': True},
+                ],
+            }
+            for report in group[:self.rows_per_bubble]
+        ]
+        if len(group) > self.rows_per_bubble:
+            rows.append({
+                'type': 'text', 'text': f"他{len(group) - self.rows_per_bubble}件", 'size': 'xs', 'color': '#888888'
+            })
+        return {
+            'type': 'bubble',
+            'size': 'kilo',
+            'header': {
+                'type': 'box',
+                'layout': 'vertical',
+                'contents': [
+                    {'type': 'text', 'text': key, 'weight': 'bold', 'wrap': True},
+                    {'type': 'text', 'text': f"{len(group)}件", 'size': 'xs', 'color': '#888888'},
+                ],
+            },
+            'body': {'type': 'box', 'layout': 'vertical', 'spacing': 'sm', 'contents': rows},
+        }
+
+    def _render_flex(self, grouped, digest_count):
+        """まとめ単位ごとのバブルを12個ずつのカルーセルにしたFlexメッセージを作成"""
+        bubbles = [self._bubble(key, group) for key, group in grouped.items()]
+        title = self._title(digest_count, len(grouped))
+        carousels = []
+        for start in range(0, len(bubbles), FLEX_CAROUSEL_MAX_BUBBLES):
+            carousels.append({
+                'type': 'flex',
+                'altText': title[:FLEX_ALT_TEXT_MAX_LENGTH],
+                'contents': {'type': 'carousel', 'contents': bubbles[start:start + FLEX_CAROUSEL_MAX_BUBBLES]},
+            })
+        return carousels
+
+
+def get_digest_renderer():
+    """
+    環境変数の設定に従って DigestRenderer を作成
+    Returns:
+        DigestRenderer: まとめを作成するクラス（DIGEST_MODE が 'off' の場合は None）
+    """
+    if DIGEST_MODE == 'off':
+        return None
+    return DigestRenderer()
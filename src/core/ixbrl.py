@@ -0,0 +1,97 @@
+import re
+
+# インラインXBRLのタグ（html.parser / lxml ともにタグ名は小文字化される）
+_IX_TAG_PATTERN = re.compile(r'^ix:non(numeric|fraction)$')
+
+# jplvh_cor（大量保有報告書タクソノミ）の要素名と解析結果のフィールドの対応表
+JPLVH_FIELD_MAP = {
+    'jplvh_cor:NameOfIssuer': 'target_company',
+    'jplvh_cor:SecurityCodeOfIssuer': 'security_code',
+    'jplvh_cor:Name': 'holder_name',
+    'jplvh_cor:HoldingRatioOfShareCertificatesEtc': 'holding_ratio',
+    'jplvh_cor:HoldingRatioOfShareCertificatesEtcPerLastReport': 'holding_ratio_before',
+    'jplvh_cor:TotalNumberOfStocksEtcHeld': 'shares_held',
+    'jplvh_cor:TotalNumberOfShareCertificatesEtcHeld': 'shares_held',
+    'jplvh_cor:PurposeOfHolding': 'purpose',
+    'jplvh_cor:DateWhenFilingRequirementArose': 'report_date',
+    'jplvh_cor:DateWhenFilingRequirementAroseCoverPage': 'report_date',
+    'jplvh_cor:FilingDateCoverPage': 'submission_date',
+}
+
+# 提出者・共同保有者ごとに値を持つフィールド
+HOLDER_FIELDS = ('holder_name', 'holding_ratio', 'holding_ratio_before', 'shares_held', 'purpose')
+
+# インラインXBRLが埋め込まれていない旧形式の本文で使われるHTMLのID
+LEGACY_ID_MAP = {
+    'T0100000000101': 'target_company',
+    'T0100000000201': 'security_code',
+    'T0201010100401': 'holder_name',
+    'T0201040200201': 'holding_ratio',
+    'T0201040200301': 'holding_ratio_before',
+    'T0201040101401': 'shares_held',
+    'T0201020000101': 'purpose',
+}
+
+
+def extract_ixbrl_facts(soup):
+    """
+    本文のインラインXBRLから事実（fact）を1回の走査で抽出
+    Args:
+        soup: 本文ファイルのBeautifulSoupオブジェクト
+    Returns:
+        dict: 以下のキーを持つ辞書
+            fields: フィールド名と値（各フィールドの最初の出現値）
+            contexts: contextRefごとのフィールド名と値
+            joint_holders: 最初の提出者以外の保有者ごとのフィールド（共同保有者）
+            facts: 対応表にない要素も含む全ての事実のリスト
+    """
+    fields = {}
+    contexts = {}
+    facts = []
+
+    for tag in soup.find_all(_IX_TAG_PATTERN):
+        name = tag.get('name')
+        if not name:
+            continue
+
+        context_ref = tag.get('contextref', '')
+        value = tag.get_text(strip=True)
+        if tag.get('sign') == '-':
+            value = f"-{value}"
+
+        facts.append({'name': name, 'context_ref': context_ref, 'value': value})
+
+        field = JPLVH_FIELD_MAP.get(name)
+        if not field:
+            continue
+
+        fields.setdefault(field, value)
+        contexts.setdefault(context_ref, {}).setdefault(field, value)
+
+    # 保有者名を持つコンテキストを出現順に並べ、2件目以降を共同保有者とする
+    holder_contexts = [values for values in contexts.values() if 'holder_name' in values]
+    joint_holders = [
+        {field: values.get(field) for field in HOLDER_FIELDS}
+        for values in holder_contexts[1:]
+    ]
+
+    return {
+        'fields': fields,
+        'contexts': contexts,
+        'joint_holders': joint_holders,
+        'facts': facts,
+    }
+
+
+def extract_legacy_fields(soup):
+    """
+    インラインXBRLを含まない本文から、HTMLのIDを使ってフィールドを1回の走査で抽出
+    Args:
+        soup: 本文ファイルのBeautifulSoupオブジェクト
+    Returns:
+        dict: フィールド名と値
+    """
+    fields = {}
+    for element in soup.find_all(id=list(LEGACY_ID_MAP)):
+        fields.setdefault(LEGACY_ID_MAP[element['id']], element.text.strip())
+    return fields
@@ -1,42 +1,218 @@
-from linebot.v3.messaging import Configuration, ApiClient, MessagingApi, TextMessage
+from linebot.v3.messaging import Configuration, ApiClient, MessagingApi, Message, TextMessage
 import os
 import sys
+import threading
+import time
+from collections import deque
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-from config.config import LINE_CHANNEL_ACCESS_TOKEN, LINE_USER_ID  # configから設定を使用
+from config.config import LINE_CHANNEL_ACCESS_TOKEN, LINE_USER_ID, LINE_API_ENDPOINT  # configから設定を使用
+
+# 1回のプッシュで送れるメッセージの最大数（LINE Messaging API の上限）
+LINE_MAX_MESSAGES_PER_PUSH = 5
+
+# 1回のマルチキャストで送れる送信先の最大数（LINE Messaging API の上限）
+LINE_MAX_MULTICAST_RECIPIENTS = 500
+
+# 集計のために保持するバッチごとの送信結果の件数
+NOTIFIER_BATCH_HISTORY = 1000
 
 # Botの初期化
-configuration = Configuration(access_token=LINE_CHANNEL_ACCESS_TOKEN)
+configuration = Configuration(access_token=LINE_CHANNEL_ACCESS_TOKEN, host=LINE_API_ENDPOINT)
+
+
+def _to_message(message):
+    """テキストはテキストメッセージに、辞書（Flexメッセージなど）は Messaging API のメッセージに変換"""
+    if isinstance(message, dict):
+        return Message.from_dict(message)
+    return TextMessage(text=message)
+
+
+def _percentile(values, ratio):
+    """昇順に並べた値から指定した割合の位置の値を取得"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class LineNotifier:
+    """
+    1つの ApiClient（接続プール）を使い回し、メッセージを5件ずつまとめてプッシュする通知クラス
+    バッチごとの所要時間と失敗件数を記録する
+    """
+
+    def __init__(self, user_id=LINE_USER_ID, batch_size=LINE_MAX_MESSAGES_PER_PUSH, messaging_api=None,
+                 api_configuration=None):
+        """
+        初期化
+        Args:
+            user_id: 送信先のユーザーID
+            batch_size: 1回のプッシュにまとめるメッセージ数（最大5）
+            messaging_api: 送信に使う MessagingApi（省略時は ApiClient を作成して使い回す）
+            api_configuration: ApiClient の作成に使う Configuration（省略時はモジュールの configuration）
+        """
+        self.user_id = user_id
+        self.batch_size = max(1, min(batch_size, LINE_MAX_MESSAGES_PER_PUSH))
+        self._api_client = None
+        if messaging_api is None:
+            self._api_client = ApiClient(api_configuration or configuration)
+            messaging_api = MessagingApi(self._api_client)
+        self.line_bot_api = messaging_api
+        self._pending = []
+        self._lock = threading.Lock()
+        self.batches = deque(maxlen=NOTIFIER_BATCH_HISTORY)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, message):
+        """
+        メッセージを送信待ちに追加（5件たまったらまとめて送信）
+        Args:
+            message: 送信するメッセージ（テキストまたはFlexメッセージの辞書）
+        """
+        with self._lock:
+            self._pending.append(message)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self.push(batch)
+
+    def flush(self):
+        """送信待ちのメッセージを全て送信"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self.push(batch)
+
+    def send(self, messages, to=None, retry_key=None):
+        """
+        メッセージ（5件まで）を1回のプッシュで送信し、所要時間と結果を記録（失敗した場合は例外を送出）
+        Args:
+            messages: 送信するメッセージ（テキストまたはFlexメッセージの辞書）のリスト（5件まで）
+            to: 送信先のユーザーID（省略時は user_id）
+            retry_key: LINEの再試行キー（同じキーでの再送はLINE側で重複として扱われる）
+        """
+        self._record(len(messages), lambda: self.line_bot_api.push_message(
+            {
+                "to": to or self.user_id,
+                "messages": [_to_message(message) for message in messages]
+            },
+            x_line_retry_key=retry_key
+        ))
+
+    def multicast(self, messages, recipients, retry_key=None):
+        """
+        メッセージ（5件まで）を複数のユーザー（500人まで）に1回のマルチキャストで送信し、
+        所要時間と結果を記録（失敗した場合は例外を送出）
+        Args:
+            messages: 送信するメッセージ（テキストまたはFlexメッセージの辞書）のリスト（5件まで）
+            recipients: 送信先のユーザーIDのリスト（500人まで）
+            retry_key: LINEの再試行キー（同じキーでの再送はLINE側で重複として扱われる）
+        """
+        self._record(len(messages), lambda: self.line_bot_api.multicast(
+            {
+                "to": list(recipients),
+                "messages": [_to_message(message) for message in messages]
+            },
+            x_line_retry_key=retry_key
+        ))
+
+    def _record(self, size, call):
+        """送信を実行し、所要時間と結果をバッチの履歴に記録"""
+        started = time.perf_counter()
+        error = None
+        try:
+            call()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            self.batches.append({'size': size, 'latency': latency, 'error': str(error) if error else None})
+
+    def push(self, messages):
+        """
+        メッセージを1回のプッシュで送信（5件を超える場合は5件ずつ）
+        Args:
+            messages: 送信するメッセージのリスト
+        Returns:
+            bool: 全て送信できたかどうか
+        """
+        succeeded = True
+        for start in range(0, len(messages), LINE_MAX_MESSAGES_PER_PUSH):
+            batch = messages[start:start + LINE_MAX_MESSAGES_PER_PUSH]
+            try:
+                self.send(batch)
+                print(f"✅ LINEメッセージを{len(batch)}件送信しました（{self.batches[-1]['latency'] * 1000:.0f}ms）")
+            except Exception as e:
+                succeeded = False
+                print(f"❌ メッセージ送信に失敗しました（{len(batch)}件, {self.batches[-1]['latency'] * 1000:.0f}ms）: {e}")
+        return succeeded
+
+    def stats(self):
+        """
+        送信結果の集計を取得
+        Returns:
+            dict: バッチ数・送信件数・失敗件数・バッチごとの所要時間（p50/p95/最大, 秒）
+                  （直近 NOTIFIER_BATCH_HISTORY バッチ分）
+        """
+        latencies = sorted(batch['latency'] for batch in self.batches)
+        failed = [batch for batch in self.batches if batch['error']]
+        return {
+            'batches': len(self.batches),
+            'messages': sum(batch['size'] for batch in self.batches),
+            'failed_batches': len(failed),
+            'failed_messages': sum(batch['size'] for batch in failed),
+            'latency_p50': _percentile(latencies, 0.5),
+            'latency_p95': _percentile(latencies, 0.95),
+            'latency_max': latencies[-1] if latencies else 0.0,
+            'total_time': sum(latencies),
+        }
+
+    def close(self):
+        """送信待ちのメッセージを送信し、ApiClient を閉じる"""
+        self.flush()
+        if self._api_client is not None:
+            self._api_client.close()
+            self._api_client = None
+
+
+_default_notifier = None
+_default_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    """
+    プロセスで共有する LineNotifier を取得（ApiClient の接続を使い回す）
+    Returns:
+        LineNotifier: 通知クラス
+    """
+    global _default_notifier
+    with _default_notifier_lock:
+        if _default_notifier is None:
+            _default_notifier = LineNotifier()
+        return _default_notifier
+
 
 def send_message(message: str, user_id: str = LINE_USER_ID):
     """
     指定ユーザーにメッセージを送信
     """
-    try:
-        with ApiClient(configuration) as api_client:
-            line_bot_api = MessagingApi(api_client)
-            line_bot_api.push_message({
-                "to": user_id,
-                "messages": [TextMessage(text=message)]
-            })
-        print("✅ メッセージを送信しました")
-    except Exception as e:
-        print(f"❌ メッセージ送信に失敗しました: {e}")
+    notifier = get_notifier()
+    if user_id == notifier.user_id:
+        notifier.push([message])
+    else:
+        LineNotifier(user_id=user_id, messaging_api=notifier.line_bot_api).push([message])
 
 # ユーザーの提供したコードと互換性を保つためのエイリアス
 def send_line_message(message: str):
     """
     指定したLINEユーザーにメッセージを送信する
     """
-    try:
-        with ApiClient(configuration) as api_client:
-            line_bot_api = MessagingApi(api_client)
-            line_bot_api.push_message({
-                "to": LINE_USER_ID,
-                "messages": [TextMessage(text=message)]
-            })
-        print("✅ LINEメッセージを送信しました。")
-    except Exception as e:
-        print(f"❌ メッセージ送信に失敗しました: {e}")
+    get_notifier().push([message])
 
 # テスト用エントリーポイント（ターミナルから実行可）
 if __name__ == "__main__":
@@ -0,0 +1,279 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from linebot.v3.messaging import ApiException
+
+from src.core.notifier import LineNotifier, LINE_MAX_MESSAGES_PER_PUSH, LINE_MAX_MULTICAST_RECIPIENTS
+from src.utils.db import get_database
+from config.config import LINE_USER_ID
+
+logger = logging.getLogger('edinet_outbox')
+
+# 送信をあきらめるまでの試行回数
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+
+# 再送までの待ち時間（秒）。失敗するたびに2倍にし、OUTBOX_MAX_DELAY を上限とする
+OUTBOX_BASE_DELAY = float(os.getenv('OUTBOX_BASE_DELAY', 30))
+OUTBOX_MAX_DELAY = float(os.getenv('OUTBOX_MAX_DELAY', 3600))
+
+# 送信待ちの通知がない場合に次に確認するまでの秒数
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', 10))
+
+# 取り込みの後に送信を続ける最大秒数（残りは run_notification_worker.py が送信する）
+OUTBOX_DRAIN_TIMEOUT = float(os.getenv('OUTBOX_DRAIN_TIMEOUT', 60))
+
+# 再送しても結果が変わらないため、すぐに 'failed' にするHTTPステータス（429 は再送する）
+_PERMANENT_FAILURE_STATUSES = {400, 401, 403, 404}
+
+
+def build_notifications(messages, recipient=LINE_USER_ID, report_ids=None):
+    """
+    メッセージを1回のプッシュで送れる5件ずつにまとめ、送信待ちテーブルに書き込む通知にする
+    Args:
+        messages: 送信するメッセージ（テキストまたはFlexメッセージの辞書）のリスト
+        recipient: 送信先のユーザーID
+        report_ids: メッセージの元になった報告書IDのリスト（記録用）
+    Returns:
+        list: mark_many_as_processed の notifications に渡す辞書のリスト（送信先が未設定の場合は空）
+    """
+    if not recipient:
+        logger.warning("LINE_USER_ID が設定されていないため、通知を送信待ちに登録しません")
+        return []
+    return [
+        {
+            'recipient': recipient,
+            'messages': messages[start:start + LINE_MAX_MESSAGES_PER_PUSH],
+            'report_ids': list(report_ids or []),
+        }
+        for start in range(0, len(messages), LINE_MAX_MESSAGES_PER_PUSH)
+    ]
+
+
+def subscriber_matches(subscriber, report, importance_level):
+    """
+    報告書が購読者のウォッチリストに該当するかを判定
+    Args:
+        subscriber: get_subscribers が返す購読者の辞書
+        report: 報告書の解析結果
+        importance_level: 報告書の重要度レベル
+    Returns:
+        bool: 通知するかどうか（証券コード・保有者名のどちらも指定がない購読者には全て通知する）
+    """
+    if importance_level < (subscriber.get('min_importance') or 1):
+        return False
+    codes = subscriber.get('security_codes') or []
+    keywords = subscriber.get('holder_keywords') or []
+    if not codes and not keywords:
+        return True
+    if str(report.get('security_code')) in codes:
+        return True
+    holder_name = report.get('holder_name') or ''
+    return any(keyword in holder_name for keyword in keywords)
+
+
+def fan_out(messages, reports, subscribers, importance_levels, report_ids=None, render=None):
+    """
+    報告書ごとに通知する購読者を求め、同じ購読者に届く報告書のメッセージをまとめて送信待ちの通知にする
+    購読者が複数の場合は500人ずつのマルチキャストにするため、購読者が増えても送信回数はほとんど増えない
+    Args:
+        messages: 送信するテキストのリスト
+        reports: messages と同じ順の報告書の解析結果のリスト
+        subscribers: get_subscribers が返す購読者のリスト
+        importance_levels: reports と同じ順の重要度レベルのリスト
+        report_ids: reports と同じ順の報告書IDのリスト（記録用）
+        render: 同じ購読者に届く報告書のメッセージをまとめる関数（DigestRenderer.render。省略時はそのまま送る）
+    Returns:
+        list: mark_many_as_processed の notifications に渡す辞書のリスト
+    """
+    groups = {}
+    for index, report in enumerate(reports):
+        recipients = tuple(
+            subscriber['user_id'] for subscriber in subscribers
+            if subscriber_matches(subscriber, report, importance_levels[index])
+        )
+        if recipients:
+            groups.setdefault(recipients, []).append(index)
+
+    notifications = []
+    for recipients, indexes in groups.items():
+        group_messages = [messages[index] for index in indexes]
+        if render is not None:
+            group_messages = render(
+                [reports[index] for index in indexes], group_messages, [importance_levels[index] for index in indexes]
+            )
+        group_report_ids = [report_ids[index] for index in indexes] if report_ids else []
+        if len(recipients) == 1:
+            notifications.extend(build_notifications(group_messages, recipient=recipients[0], report_ids=group_report_ids))
+            continue
+        for start in range(0, len(recipients), LINE_MAX_MULTICAST_RECIPIENTS):
+            chunk = list(recipients[start:start + LINE_MAX_MULTICAST_RECIPIENTS])
+            for notification in build_notifications(group_messages, recipient=f'multicast:{len(chunk)}',
+                                                    report_ids=group_report_ids):
+                notification['recipients'] = chunk
+                notifications.append(notification)
+    return notifications
+
+
+def backoff_delay(attempts, base_delay=OUTBOX_BASE_DELAY, max_delay=OUTBOX_MAX_DELAY):
+    """
+    attempts 回目の失敗の後に再送するまでの秒数（指数バックオフ。同時に再送が集中しないよう揺らぎを加える）
+    Args:
+        attempts: これまでの試行回数
+        base_delay: 1回目の失敗の後の待ち時間
+        max_delay: 待ち時間の上限
+    Returns:
+        float: 待ち時間（秒）
+    """
+    delay = min(max_delay, base_delay * (2 ** max(0, attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _retry_after(error):
+    """429 の応答に Retry-After があればその秒数を返す"""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After') or headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class OutboxWorker:
+    """
+    notification_outbox の通知を取り出してLINEに送信するワーカー
+    失敗した通知は指数バックオフで再送し、再送時は同じ再試行キー（X-Line-Retry-Key）を使うため、
+    前回の送信がLINEに届いていた場合も重複して配信されない（少なくとも1回の配信）
+    """
+
+    def __init__(self, db=None, notifier=None, max_attempts=OUTBOX_MAX_ATTEMPTS,
+                 base_delay=OUTBOX_BASE_DELAY, max_delay=OUTBOX_MAX_DELAY):
+        """
+        初期化
+        Args:
+            db: ReportDatabase または MySQLReportDatabase（省略時は get_database）
+            notifier: 送信に使う LineNotifier（省略時は作成して使い回す）
+            max_attempts: 送信をあきらめるまでの試行回数
+            base_delay: 1回目の失敗の後に再送するまでの秒数
+            max_delay: 再送までの待ち時間の上限
+        """
+        self._owns_db = db is None
+        self._owns_notifier = notifier is None
+        self.db = db or get_database()
+        self.notifier = notifier or LineNotifier()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {'sent': 0, 'retried': 0, 'failed': 0}
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _deliver(self, notification):
+        """通知を1件送信し、結果を送信待ちテーブルに記録"""
+        outbox_id = notification['outbox_id']
+        try:
+            if notification.get('recipients'):
+                self.notifier.multicast(
+                    notification['messages'],
+                    notification['recipients'],
+                    retry_key=notification['retry_key']
+                )
+            else:
+                self.notifier.send(
+                    notification['messages'],
+                    to=notification['recipient'],
+                    retry_key=notification['retry_key']
+                )
+        except ApiException as e:
+            if e.status == 409:
+                # 同じ再試行キーの送信はすでに受け付けられている（前回の送信が届いていた）
+                logger.info(f"通知 {outbox_id} は送信済みでした（再試行キーが受付済み）")
+                self.db.complete_notification(outbox_id)
+                self.stats['sent'] += 1
+                return
+            if e.status in _PERMANENT_FAILURE_STATUSES:
+                self._give_up(notification, f"HTTP {e.status}: {e.reason}")
+                return
+            self._retry(notification, f"HTTP {e.status}: {e.reason}", _retry_after(e))
+            return
+        except Exception as e:
+            self._retry(notification, e)
+            return
+
+        self.db.complete_notification(outbox_id)
+        self.stats['sent'] += 1
+
+    def _retry(self, notification, error, retry_after=None):
+        """試行回数が上限に達していなければ、待ち時間の後に再送する"""
+        if notification['attempts'] >= self.max_attempts:
+            self._give_up(notification, error)
+            return
+        delay = backoff_delay(notification['attempts'], self.base_delay, self.max_delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        logger.warning(
+            f"通知 {notification['outbox_id']} の送信に失敗しました（{notification['attempts']}回目）。"
+            f"{delay:.0f}秒後に再送します: {error}"
+        )
+        self.db.fail_notification(notification['outbox_id'], error, retry_at=time.time() + delay)
+        self.stats['retried'] += 1
+
+    def _give_up(self, notification, error):
+        logger.error(f"通知 {notification['outbox_id']} の送信をあきらめました（{notification['attempts']}回試行）: {error}")
+        self.db.fail_notification(notification['outbox_id'], error)
+        self.stats['failed'] += 1
+
+    def drain_once(self):
+        """
+        送信時刻になった通知を1回分取り出して送信
+        Returns:
+            int: 取り出した件数
+        """
+        notifications = self.db.claim_notifications()
+        for notification in notifications:
+            self._deliver(notification)
+        return len(notifications)
+
+    def drain(self, timeout=None):
+        """
+        送信時刻になった通知がなくなるまで送信（再送待ちの通知は次回以降に送信する）
+        Args:
+            timeout: 送信を続ける最大秒数（None の場合は制限なし）
+        Returns:
+            dict: sent・retried・failed の件数（このワーカーの累計）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            if not self.drain_once():
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return dict(self.stats)
+
+    def run_forever(self, poll_interval=OUTBOX_POLL_INTERVAL):
+        """stop() が呼ばれるまで、送信待ちの通知を送信し続ける"""
+        logger.info("通知の送信ワーカーを開始します")
+        while not self._stop.is_set():
+            self.drain()
+            self._stop.wait(poll_interval)
+        logger.info(f"通知の送信ワーカーを終了します: {self.stats}")
+
+    def stop(self):
+        """run_forever・drain を終了させる"""
+        self._stop.set()
+
+    def close(self):
+        """ワーカーを止め、このワーカーが作成した送信クライアントとデータベース接続を閉じる"""
+        self.stop()
+        if self._owns_notifier:
+            self.notifier.close()
+        if self._owns_db:
+            self.db.close()
@@ -1,11 +1,17 @@
 import os
+import sys
 import zipfile
 import logging
 from pathlib import Path
 from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-import json
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.dates import date_key, legacy_date_key
+from src.utils.journal import ProcessedReportJournal
+from src.core.ixbrl import extract_ixbrl_facts, extract_legacy_fields
+from src.utils.names import normalize_holder_name
 
 # ロギングの設定
 logging.basicConfig(
@@ -24,33 +30,60 @@ def parse_and_filter_reports(download_dir):
     Returns:
         list: LINE通知用メッセージのリスト
     """
+    return list(iter_line_messages(download_dir))
+
+def iter_line_messages(download_dir, batch_size=50, outbox=False, digest=None):
+    """
+    ダウンロードしたデータを1件ずつ解析し、新規報告書のLINE通知用メッセージを順に返す
+    全件をリストに溜めないため、大量のバックフィルでもメモリ使用量が一定に保たれる
+    Args:
+        download_dir: ダウンロードディレクトリのパス
+        batch_size: 過去の保有割合をまとめて取得する報告書の件数
+        outbox: True の場合、データベース使用時はメッセージを返さずに報告書と同じトランザクションで
+                送信待ちテーブル（notification_outbox）に書き込む（送信は OutboxWorker が行う）
+        digest: DigestRenderer を指定すると、新規報告書が多い場合に対象企業・保有者ごとにまとめたメッセージにする
+                （digest.max_filings 件たまるか、digest.window_seconds 秒経つごとにまとめる）
+    Yields:
+        str または dict: LINE通知用メッセージ（まとめたFlexメッセージは辞書）
+    """
     # パス解決
     target_dir = Path(download_dir)
     if not target_dir.exists():
         logger.error(f"指定されたディレクトリが存在しません: {target_dir}")
-        return []
+        return
     
     # パーサーの初期化
-    parser = EdinetParser(target_dir)
-    
-    # ディレクトリ内のデータを解析
-    all_results, new_results = parser.parse_directory()
+    parser = EdinetParser(target_dir, digest=digest)
+    if digest is not None:
+        batch_size = digest.max_filings
     
-    # 通知用メッセージのリストを生成
-    messages = []
+    message_count = 0
+    batch = {}
+    batch_started = time.monotonic()
+    try:
+        # 新規の報告書のみ、一定件数ごとにまとめてメッセージ化（処理済みのマークもここで行う）
+        for result, is_new in parser.iter_directory(mark_processed=False):
+            if not is_new:
+                continue
+            # 同じ報告書が複数のディレクトリにある場合は1件にまとめる
+            if not batch:
+                batch_started = time.monotonic()
+            batch.setdefault(parser._generate_report_id(result), result)
+            window_elapsed = digest is not None and time.monotonic() - batch_started >= digest.window_seconds
+            if len(batch) >= batch_size or window_elapsed:
+                yield from parser.render_line_messages(list(batch.values()), enqueue=outbox)
+                message_count += len(batch)
+                batch = {}
+        
+        if batch:
+            yield from parser.render_line_messages(list(batch.values()), enqueue=outbox)
+            message_count += len(batch)
+    finally:
+        parser.close()
     
-    # 新規の報告書のみ処理
-    if new_results:
-        logger.info(f"{len(new_results)}件の新規報告書をメッセージ化します")
-        for result in new_results:
-            # LINE用のメッセージを生成
-            line_message = parser.get_line_message(result)
-            messages.append(line_message)
-    else:
+    if message_count == 0:
         logger.info("新規の報告書はありませんでした")
-    
-    logger.info(f"合計{len(messages)}件のメッセージを生成しました")
-    return messages
+    logger.info(f"合計{message_count}件のメッセージを生成しました")
 
 class EdinetUnzipper:
     def __init__(self, target_dir=None):
@@ -127,28 +160,43 @@ class EdinetUnzipper:
         return success_count, failure_count
 
 class EdinetParser:
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, db=None, features='html.parser', digest=None):
         """
         初期化
         Args:
             base_dir (str): 解凍されたファイルが格納されているベースディレクトリ
+            db (ReportDatabase, optional): 使用するデータベース。指定がない場合はデフォルトのSQLiteを使用
+            features (str): BeautifulSoupのパーサー（'html.parser' または 'lxml'）
+            digest (DigestRenderer, optional): 多数の報告書のメッセージをまとめるクラス（データベース使用時のみ）
         """
         self.base_dir = Path(base_dir)
+        self.features = features
+        self.digest = digest
         self.setup_logging()
         
+        if db is not None:
+            self.db = db
+            return
+        
         # SQLiteデータベースを使用
         try:
-            import sys
-            import os
-            sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
             from src.utils.db import ReportDatabase
             self.db = ReportDatabase()
             self.logger.info("SQLiteデータベースに接続しました")
         except ImportError:
             self.logger.warning("db モジュールをインポートできません。JSONファイルを使用します。")
             self.processed_reports_file = Path(base_dir).parent / "processed_reports.json"
+            self.journal = ProcessedReportJournal(self.processed_reports_file)
             self.processed_reports = self.load_processed_reports()
 
+    def close(self):
+        """データベース接続を閉じる（JSON方式の場合はジャーナルをスナップショットに統合する）"""
+        if hasattr(self, 'db'):
+            self.logger.info("処理完了後、データベース接続を閉じます")
+            self.db.close()
+        elif hasattr(self, 'journal'):
+            self.journal.close()
+
     def setup_logging(self):
         """ロギングの設定"""
         self.logger = logging.getLogger('edinet_parser')
@@ -160,24 +208,13 @@ class EdinetParser:
             self.logger.addHandler(handler)
 
     def load_processed_reports(self):
-        """処理済み報告書の情報を読み込む"""
-        if self.processed_reports_file.exists():
-            try:
-                with open(self.processed_reports_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                self.logger.error(f"処理済み報告書ファイルの読み込みエラー: {self.processed_reports_file}")
-                return {}
-        else:
-            self.logger.info(f"処理済み報告書ファイルが見つかりません。新規作成します: {self.processed_reports_file}")
-            return {}
+        """処理済み報告書の情報を読み込む（スナップショットにジャーナルの追記分を適用）"""
+        return self.journal.load()
 
     def save_processed_reports(self):
-        """処理済み報告書の情報を保存する"""
+        """処理済み報告書の情報をスナップショットに保存する"""
         try:
-            with open(self.processed_reports_file, 'w', encoding='utf-8') as f:
-                json.dump(self.processed_reports, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"処理済み報告書情報を保存しました: {self.processed_reports_file}")
+            self.journal.compact()
         except Exception as e:
             self.logger.error(f"処理済み報告書情報の保存中にエラー: {str(e)}")
 
@@ -189,24 +226,29 @@ class EdinetParser:
         Returns:
             bool: 処理済みかどうか
         """
-        # 報告書を一意に識別するキーを生成
-        report_id = self._generate_report_id(report_info)
+        # 報告書を一意に識別するキーを生成（旧形式のIDで記録済みのものも確認）
+        report_ids = [
+            self._generate_report_id(report_info),
+            self._generate_report_id(report_info, legacy=True)
+        ]
         
         # SQLiteデータベースが使用可能な場合はそれを使用
         if hasattr(self, 'db'):
-            return self.db.is_already_processed(report_id)
+            return any(self.db.is_already_processed(report_id) for report_id in report_ids)
         else:
             # 従来のJSON方式
-            if report_id in self.processed_reports:
-                self.logger.info(f"この報告書は既に処理済みです: {report_id}")
-                return True
+            for report_id in report_ids:
+                if report_id in self.processed_reports:
+                    self.logger.info(f"この報告書は既に処理済みです: {report_id}")
+                    return True
             return False
 
-    def _generate_report_id(self, report_info):
+    def _generate_report_id(self, report_info, legacy=False):
         """
         報告書の一意識別子を生成
         Args:
             report_info (dict): 報告書情報
+            legacy (bool): 日付の数字のみを連結した旧形式のIDを生成するかどうか
         Returns:
             str: 報告書ID
         """
@@ -217,9 +259,10 @@ class EdinetParser:
         report_type = report_info.get('report_type', '')
         holder_name = report_info.get('holder_name', '')
         
-        # 日本語の日付から数字のみを抽出
-        submission_numbers = re.sub(r'[^0-9]', '', submission_date)
-        report_numbers = re.sub(r'[^0-9]', '', report_date)  # 報告義務発生日の数字を抽出
+        # 和暦の日付を YYYYMMDD 形式に変換（旧形式は数字のみを抽出）
+        to_key = legacy_date_key if legacy else date_key
+        submission_numbers = to_key(submission_date)
+        report_numbers = to_key(report_date)  # 報告義務発生日
         
         return f"{security_code}_{submission_numbers}_{report_numbers}_{report_type}_{holder_name}"
 
@@ -238,8 +281,8 @@ class EdinetParser:
             # 従来のJSON方式
             report_id = self._generate_report_id(report_info)
             
-            # 処理日時を含めて保存
-            self.processed_reports[report_id] = {
+            # 処理日時を含めてジャーナルに追記
+            self.journal.append(report_id, {
                 'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'target_company': report_info.get('target_company', '不明'),
                 'security_code': report_info.get('security_code', '不明'),
@@ -247,10 +290,23 @@ class EdinetParser:
                 'holder_name': report_info.get('holder_name', '不明'),
                 'report_date': report_info.get('report_date', '不明'),  # 報告義務発生日を追加
                 'submission_date': report_info.get('submission_date', '不明')  # 提出日も保存
-            }
-            
-            # 変更を保存
-            self.save_processed_reports()
+            })
+
+    def mark_many_as_processed(self, report_infos, notifications=None):
+        """
+        複数の報告書をまとめて処理済みとしてマーク
+        （データベース使用時は1トランザクションで書き込む）
+        Args:
+            report_infos (list): 報告書情報のリスト
+            notifications (list, optional): 同じトランザクションで送信待ちテーブルに書き込む通知（データベース使用時のみ）
+        """
+        if hasattr(self, 'db'):
+            for report_info in report_infos:
+                report_info['report_id'] = self._generate_report_id(report_info)
+            self.db.mark_many_as_processed(report_infos, notifications=notifications)
+        else:
+            for report_info in report_infos:
+                self.mark_as_processed(report_info)
 
     def find_latest_directories(self):
         """
@@ -284,77 +340,100 @@ class EdinetParser:
         Args:
             specific_dir (str, optional): 特定のディレクトリを指定する場合のパス
         Returns:
-            list: 処理結果のリスト
+            tuple: (全ての処理結果のリスト, 新規報告書のリスト)
         """
+        results = []
+        new_results = []  # 新規の報告書のみを格納
+        
         try:
-            results = []
-            new_results = []  # 新規の報告書のみを格納
-            
-            if specific_dir:
-                # 特定のディレクトリが指定された場合
-                target_dir = Path(self.base_dir) / specific_dir if not Path(specific_dir).is_absolute() else Path(specific_dir)
-                if target_dir.exists():
-                    self.logger.info(f"指定されたディレクトリを処理中: {target_dir}")
-                    dirs_to_process = [target_dir]
-                else:
-                    self.logger.error(f"指定されたディレクトリが存在しません: {target_dir}")
-                    return results, new_results
-            else:
-                # 指定がない場合は最新のディレクトリを処理
-                dirs_to_process = self.find_latest_directories()
+            for result, is_new in self.iter_directory(specific_dir):
+                # すべての結果を全体リストに追加（統計用）
+                results.append(result)
+                if is_new:
+                    new_results.append(result)
+        finally:
+            # 結果を返す前に（エラー時も）データベース接続を閉じる
+            self.close()
+        
+        return results, new_results
+
+    def iter_directory(self, specific_dir=None, mark_processed=True):
+        """
+        ディレクトリ内のXBRLファイルを1件ずつ解析して返すジェネレーター
+        結果をリストに溜めないため、大量のバックフィルでもメモリ使用量が一定に保たれる
+        Args:
+            specific_dir (str, optional): 特定のディレクトリを指定する場合のパス
+            mark_processed (bool): 新規報告書をその場で処理済みとしてマークするかどうか
+        Yields:
+            tuple: (解析結果, 新規報告書かどうか)
+        """
+        total_count = 0
+        new_count = 0
+        
+        try:
+            for public_doc in self._iter_public_docs(specific_dir):
+                self.logger.info(f"PublicDocディレクトリを処理中: {public_doc}")
                 
-                if not dirs_to_process:
-                    self.logger.warning("処理対象のディレクトリが見つかりませんでした")
-                    return results, new_results
-            
-            # 各ディレクトリ内のPublicDocディレクトリを検索
-            for dir_path in dirs_to_process:
-                self.logger.info(f"ディレクトリを処理中: {dir_path.name}")
+                # ヘッダーファイルと本文ファイルを探す（各ファイルの最初のものを使用）
+                header_file = next(public_doc.glob('*header*.htm*'), None)
+                honbun_file = next(public_doc.glob('*honbun*.htm*'), None)
+                if not header_file or not honbun_file:
+                    continue
                 
-                # PublicDocディレクトリを検索
-                for public_doc in dir_path.glob('**/PublicDoc'):
-                    self.logger.info(f"PublicDocディレクトリを処理中: {public_doc}")
-                    
-                    # ヘッダーファイルと本文ファイルを探す
-                    header_files = list(public_doc.glob('*header*.htm*'))
-                    honbun_files = list(public_doc.glob('*honbun*.htm*'))
-                    
-                    if header_files and honbun_files:
-                        self.logger.info(f"ヘッダーファイル: {header_files[0].name}")
-                        self.logger.info(f"本文ファイル: {honbun_files[0].name}")
-                        
-                        # 各ファイルの最初のものを使用
-                        result = self.parse_files(header_files[0], honbun_files[0])
-                        if result:
-                            # 処理済みかどうかをチェック
-                            if not self.is_already_processed(result):
-                                # 未処理の報告書を新規リストに追加
-                                new_results.append(result)
-                                # 処理済みとしてマーク
-                                self.mark_as_processed(result)
-                            
-                            # すべての結果を全体リストに追加（統計用）
-                            results.append(result)
-                            self.logger.info(f"報告書を処理しました: {result['report_type']} - {result.get('target_company', '不明')}")
-            
-            self.logger.info(f"合計{len(results)}件の報告書を処理し、うち{len(new_results)}件が新規報告書です")
-            
-            # 結果を返す前にデータベース接続を閉じる
-            if hasattr(self, 'db') and hasattr(self, 'logger'):
-                self.logger.info("処理完了後、データベース接続を閉じます")
-                self.db.close()
+                self.logger.info(f"ヘッダーファイル: {header_file.name}")
+                self.logger.info(f"本文ファイル: {honbun_file.name}")
+                
+                result = self.parse_files(header_file, honbun_file)
+                if not result:
+                    continue
+                
+                # 処理済みかどうかをチェックし、未処理なら処理済みとしてマーク
+                is_new = not self.is_already_processed(result)
+                if is_new:
+                    if mark_processed:
+                        self.mark_as_processed(result)
+                    new_count += 1
+                total_count += 1
+                
+                self.logger.info(f"報告書を処理しました: {result['report_type']} - {result.get('target_company', '不明')}")
+                yield result, is_new
             
-            return results, new_results
+            self.logger.info(f"合計{total_count}件の報告書を処理し、うち{new_count}件が新規報告書です")
         except Exception as e:
             self.logger.error(f"ディレクトリ処理中にエラー: {str(e)}")
-            # エラー時もデータベース接続を閉じる
-            if hasattr(self, 'db'):
-                self.db.close()
-            return [], []
+
+    def _iter_public_docs(self, specific_dir=None):
+        """
+        処理対象のPublicDocディレクトリを順に返すジェネレーター
+        Args:
+            specific_dir (str, optional): 特定のディレクトリを指定する場合のパス
+        Yields:
+            Path: PublicDocディレクトリのパス
+        """
+        if specific_dir:
+            # 特定のディレクトリが指定された場合
+            target_dir = Path(self.base_dir) / specific_dir if not Path(specific_dir).is_absolute() else Path(specific_dir)
+            if not target_dir.exists():
+                self.logger.error(f"指定されたディレクトリが存在しません: {target_dir}")
+                return
+            self.logger.info(f"指定されたディレクトリを処理中: {target_dir}")
+            dirs_to_process = [target_dir]
+        else:
+            # 指定がない場合は最新のディレクトリを処理
+            dirs_to_process = self.find_latest_directories()
+            if not dirs_to_process:
+                self.logger.warning("処理対象のディレクトリが見つかりませんでした")
+                return
+        
+        # 各ディレクトリ内のPublicDocディレクトリを検索
+        for dir_path in dirs_to_process:
+            self.logger.info(f"ディレクトリを処理中: {dir_path.name}")
+            yield from dir_path.glob('**/PublicDoc')
 
     def parse_files(self, header_file, honbun_file):
         """
         ヘッダーファイルと本文ファイルを解析
+        解析木は必要な値を取り出した直後に破棄し、2つの文書を同時に保持しない
         Args:
             header_file (Path): ヘッダーファイルのパス
             honbun_file (Path): 本文ファイルのパス
@@ -362,23 +441,29 @@ class EdinetParser:
             dict: 解析結果
         """
         try:
-            # ヘッダーファイルを解析して報告書の種類を判定
+            # ヘッダーファイルを解析して報告書の種類と提出者情報を取得
             with open(header_file, 'r', encoding='utf-8') as f:
-                header_soup = BeautifulSoup(f, 'html.parser')
+                header_soup = BeautifulSoup(f, self.features)
+            try:
                 report_type = self._get_report_type(header_soup)
+                filer_info = self._get_filer_info(header_soup)
+            finally:
+                header_soup.decompose()
 
-            # 本文ファイルを解析
-            with open(honbun_file, 'r', encoding='utf-8') as f:
-                honbun_soup = BeautifulSoup(f, 'html.parser')
-
-            if report_type == "大量保有報告書":
-                return self._parse_large_volume_report(header_soup, honbun_soup)
-            elif report_type == "変更報告書":
-                return self._parse_change_report(header_soup, honbun_soup)
-            else:
+            if report_type not in ("大量保有報告書", "変更報告書"):
                 self.logger.warning(f"未対応の報告書タイプ: {report_type}")
                 return None
 
+            # 本文ファイルを解析
+            with open(honbun_file, 'r', encoding='utf-8') as f:
+                honbun_soup = BeautifulSoup(f, self.features)
+            try:
+                if report_type == "大量保有報告書":
+                    return self._parse_large_volume_report(filer_info, honbun_soup)
+                return self._parse_change_report(filer_info, honbun_soup)
+            finally:
+                honbun_soup.decompose()
+
         except Exception as e:
             self.logger.error(f"ファイル解析中にエラーが発生: {str(e)}")
             return None
@@ -418,61 +503,74 @@ class EdinetParser:
             self.logger.error(f"報告書種類の判定中にエラー: {str(e)}")
             return "不明"
 
-    def _parse_large_volume_report(self, header_soup, honbun_soup):
+    def _parse_large_volume_report(self, filer_info, honbun_soup):
         """大量保有報告書の解析"""
         try:
-            # 提出者の情報を取得
-            filer_info = self._get_filer_info(header_soup)
-            
             # 本文から情報を抽出
+            fields, joint_holders = self._extract_fields(honbun_soup)
             data = {
                 "report_type": "大量保有報告書",
-                "target_company": self._get_text_by_id(honbun_soup, "T0100000000101"),
-                "security_code": self._get_text_by_id(honbun_soup, "T0100000000201"),
-                "holder_name": self._get_text_by_id(honbun_soup, "T0201010100401") or filer_info.get("name"),
-                "holding_ratio": self._get_text_by_id(honbun_soup, "T0201040200201"),
-                "report_date": filer_info.get("report_date"),
-                "submission_date": filer_info.get("submission_date"),
-                "shares_held": self._get_text_by_id(honbun_soup, "T0201040101401"),
-                "purpose": self._get_text_by_id(honbun_soup, "T0201020000101")
+                "target_company": fields.get("target_company"),
+                "security_code": fields.get("security_code"),
+                "holder_name": fields.get("holder_name") or filer_info.get("name"),
+                "holding_ratio": fields.get("holding_ratio"),
+                "report_date": filer_info.get("report_date") or fields.get("report_date"),
+                "submission_date": filer_info.get("submission_date") or fields.get("submission_date"),
+                "shares_held": fields.get("shares_held"),
+                "purpose": fields.get("purpose")
             }
             
             # データのクリーニング
             data = self._clean_data(data)
+            data["joint_holders"] = joint_holders
             
             return data
         except Exception as e:
             self.logger.error(f"大量保有報告書の解析中にエラー: {str(e)}")
             return None
 
-    def _parse_change_report(self, header_soup, honbun_soup):
+    def _parse_change_report(self, filer_info, honbun_soup):
         """変更報告書の解析"""
         try:
-            # 提出者の情報を取得
-            filer_info = self._get_filer_info(header_soup)
-            
             # 本文から情報を抽出
+            fields, joint_holders = self._extract_fields(honbun_soup)
             data = {
                 "report_type": "変更報告書",
-                "target_company": self._get_text_by_id(honbun_soup, "T0100000000101"),
-                "security_code": self._get_text_by_id(honbun_soup, "T0100000000201"),
-                "holder_name": self._get_text_by_id(honbun_soup, "T0201010100401") or filer_info.get("name"),
-                "holding_ratio_before": self._get_text_by_id(honbun_soup, "T0201040200301"),
-                "holding_ratio_after": self._get_text_by_id(honbun_soup, "T0201040200201"),
-                "report_date": filer_info.get("report_date"),
-                "submission_date": filer_info.get("submission_date"),
-                "shares_held": self._get_text_by_id(honbun_soup, "T0201040101401"),
-                "purpose": self._get_text_by_id(honbun_soup, "T0201020000101")
+                "target_company": fields.get("target_company"),
+                "security_code": fields.get("security_code"),
+                "holder_name": fields.get("holder_name") or filer_info.get("name"),
+                "holding_ratio_before": fields.get("holding_ratio_before"),
+                "holding_ratio_after": fields.get("holding_ratio"),
+                "report_date": filer_info.get("report_date") or fields.get("report_date"),
+                "submission_date": filer_info.get("submission_date") or fields.get("submission_date"),
+                "shares_held": fields.get("shares_held"),
+                "purpose": fields.get("purpose")
             }
             
             # データのクリーニング
             data = self._clean_data(data)
+            data["joint_holders"] = joint_holders
             
             return data
         except Exception as e:
             self.logger.error(f"変更報告書の解析中にエラー: {str(e)}")
             return None
 
+    def _extract_fields(self, honbun_soup):
+        """
+        本文からフィールドを抽出（インラインXBRLを優先し、無ければ旧形式のIDを使用）
+        Args:
+            honbun_soup: 本文ファイルのBeautifulSoupオブジェクト
+        Returns:
+            tuple: (フィールドの辞書, 共同保有者のリスト)
+        """
+        facts = extract_ixbrl_facts(honbun_soup)
+        if facts['fields']:
+            return facts['fields'], facts['joint_holders']
+        
+        self.logger.info("インラインXBRLが見つからないため、HTMLのIDから抽出します")
+        return extract_legacy_fields(honbun_soup), []
+
     def _get_filer_info(self, header_soup):
         """ヘッダーから提出者情報を取得"""
         info = {}
@@ -497,11 +595,6 @@ class EdinetParser:
         
         return info
 
-    def _get_text_by_id(self, soup, id_value):
-        """指定されたIDを持つ要素のテキストを取得"""
-        element = soup.find(id=id_value)
-        return element.text.strip() if element else None
-
     def _clean_data(self, data):
         """データの整形と数値の抽出"""
         cleaned_data = {}
@@ -551,11 +644,83 @@ class EdinetParser:
             
         return text
 
-    def get_line_message(self, result):
+    def render_line_messages(self, results, enqueue=False):
+        """
+        新規報告書をまとめてLINE用メッセージにし、処理済みとしてマーク
+        過去の保有割合は報告書ごとではなく1回のクエリでまとめて取得する
+        Args:
+            results (list): 新規報告書の解析結果のリスト
+            enqueue (bool): データベース使用時、メッセージを処理済みのマークと同じトランザクションで
+                送信待ちテーブルに書き込むかどうか（書き込んだメッセージは返さない）
+        Returns:
+            list: LINE用のフォーマットされたメッセージのリスト（digest 使用時はまとめたメッセージを含む）
+        """
+        previous_holdings = {}
+        if hasattr(self, 'db'):
+            pairs = [
+                (result.get('security_code'), result.get('holder_name'))
+                for result in results
+                if result.get('report_type') == "大量保有報告書"
+            ]
+            if pairs:
+                # データベースと同じく正規化した保有者名で対応付ける
+                previous_holdings = {
+                    (security_code, normalize_holder_name(holder_name)): holding
+                    for (security_code, holder_name), holding in self.db.get_latest_holdings(pairs).items()
+                }
+        
+        messages = []
+        for result in results:
+            messages.append(self.get_line_message(result, previous_holdings))
+            
+            # 同じバッチ内の後続の報告書からは、この報告書を直前の保有として参照する
+            latest_ratio = self._parse_ratio(result.get('holding_ratio_after') or result.get('holding_ratio'))
+            if latest_ratio is not None:
+                previous_holdings[self._holding_key(result)] = {
+                    'latest_ratio': latest_ratio,
+                    'report_type': result.get('report_type'),
+                    'processed_at': None
+                }
+        
+        # 送信待ちテーブルに書き込む場合は、処理済みの記録と同時にコミットして通知が失われないようにする
+        if enqueue and hasattr(self, 'db'):
+            # 送信待ちテーブルはデータベース使用時のみのため、データベースを使わない場合は読み込まない
+            from src.core.outbox import build_notifications, fan_out
+            
+            report_ids = [self._generate_report_id(result) for result in results]
+            # 購読者が登録されている場合はウォッチリストに該当する購読者に、いない場合は LINE_USER_ID に送る
+            subscribers = self.db.get_subscribers()
+            if subscribers:
+                importance_levels = [self.db.get_importance_level(result) for result in results]
+                notifications = fan_out(messages, results, subscribers, importance_levels, report_ids=report_ids,
+                                        render=self.digest.render if self.digest else None)
+            else:
+                notifications = build_notifications(self._render_digest(results, messages), report_ids=report_ids)
+            self.mark_many_as_processed(results, notifications=notifications)
+            return []
+        
+        # バッチ内の報告書をまとめて処理済みとして記録
+        self.mark_many_as_processed(results)
+        return self._render_digest(results, messages)
+
+    def _holding_key(self, result):
+        """過去の保有情報を参照するキー（証券コード, 正規化した保有者名）"""
+        return (result.get('security_code'), normalize_holder_name(result.get('holder_name')))
+
+    def _render_digest(self, results, messages):
+        """digest が指定されていてデータベースを使用している場合、メッセージを対象企業・保有者ごとにまとめる"""
+        if self.digest is None or not hasattr(self, 'db'):
+            return messages
+        importance_levels = [self.db.get_importance_level(result) for result in results]
+        return self.digest.render(results, messages, importance_levels)
+
+    def get_line_message(self, result, previous_holdings=None):
         """
         LINE用のメッセージを作成（画像のようなフォーマットで）
         Args:
             result (dict): 解析結果
+            previous_holdings (dict, optional): (証券コード, 正規化した保有者名) をキーとした過去の保有情報。
+                指定がない場合はデータベースから1件ずつ取得する
         Returns:
             str: LINE用のフォーマットされたメッセージ
         """
@@ -564,39 +729,33 @@ class EdinetParser:
         
         # 新規報告書の場合
         if result["report_type"] == "大量保有報告書":
-            # データベースから過去の保有履歴をチェック
-            if hasattr(self, 'db'):
+            # 過去の保有履歴をチェック（一括取得済みのものがあればそれを使用）
+            previous_holding = None
+            if previous_holdings is not None:
+                previous_holding = previous_holdings.get(self._holding_key(result))
+            elif hasattr(self, 'db'):
                 previous_holding = self.db.get_latest_holding_by_company_and_holder(
                     result.get('security_code'), 
                     result.get('holder_name')
                 )
+            
+            if previous_holding and previous_holding['latest_ratio']:
+                # 過去に保有履歴がある場合は変更として扱う
+                current_ratio = self._parse_ratio(result.get('holding_ratio'))
+                previous_ratio = previous_holding['latest_ratio']
+                diff = current_ratio - previous_ratio if current_ratio and previous_ratio else 0
+                diff_str = f"({diff:+.2f}%)" if diff != 0 else ""
                 
-                if previous_holding and previous_holding['latest_ratio']:
-                    # 過去に保有履歴がある場合は変更として扱う
-                    current_ratio = self._parse_ratio(result.get('holding_ratio'))
-                    previous_ratio = previous_holding['latest_ratio']
-                    diff = current_ratio - previous_ratio if current_ratio and previous_ratio else 0
-                    diff_str = f"({diff:+.2f}%)" if diff != 0 else ""
-                    
-                    message = f"📊 変更報告書\n\n"
-                    message += f"🏢 {result.get('target_company', '不明')} ({result.get('security_code', '不明')})\n"
-                    message += f"👤 {result.get('holder_name', '不明')}\n"
-                    message += f"📉 変更前: {previous_ratio:.2f}%\n"
-                    message += f"📈 変更後: {current_ratio:.2f}% {diff_str}\n"
-                    message += f"📝 {result.get('shares_held', '不明')}株\n"
-                    message += f"📅 {result.get('report_date', '不明')}\n"
-                    message += f"🔍 目的: {result.get('purpose', '不明')}"
-                else:
-                    # 真の新規報告書
-                    message = f"📊 大量保有報告書\n\n"
-                    message += f"🏢 {result.get('target_company', '不明')} ({result.get('security_code', '不明')})\n"
-                    message += f"👤 {result.get('holder_name', '不明')}\n"
-                    message += f"📈 保有割合: {result.get('holding_ratio', '不明')}%\n"
-                    message += f"📝 {result.get('shares_held', '不明')}株\n"
-                    message += f"📅 {result.get('report_date', '不明')}\n"
-                    message += f"🔍 目的: {result.get('purpose', '不明')}"
+                message = f"📊 変更報告書\n\n"
+                message += f"🏢 {result.get('target_company', '不明')} ({result.get('security_code', '不明')})\n"
+                message += f"👤 {result.get('holder_name', '不明')}\n"
+                message += f"📉 変更前: {previous_ratio:.2f}%\n"
+                message += f"📈 変更後: {current_ratio:.2f}% {diff_str}\n"
+                message += f"📝 {result.get('shares_held', '不明')}株\n"
+                message += f"📅 {result.get('report_date', '不明')}\n"
+                message += f"🔍 目的: {result.get('purpose', '不明')}"
             else:
-                # データベースが利用できない場合
+                # 真の新規報告書（またはデータベースが利用できない場合）
                 message = f"📊 大量保有報告書\n\n"
                 message += f"🏢 {result.get('target_company', '不明')} ({result.get('security_code', '不明')})\n"
                 message += f"👤 {result.get('holder_name', '不明')}\n"
@@ -0,0 +1,339 @@
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+# 集計用のインポート（オプション）
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+from .columnar import _to_float
+from .db import cached_query, get_database
+
+logger = logging.getLogger('edinet_db')
+
+# 大量保有報告の提出義務が生じる保有割合（%）
+REPORTING_THRESHOLD = 5.0
+
+# 履歴の読み込み時に1回のクエリで取得する件数
+ANALYTICS_LOAD_BATCH_SIZE = 5000
+
+
+def _as_of_date(as_of):
+    """基準日を date に変換（省略時は今日）"""
+    if as_of is None:
+        return date.today()
+    if isinstance(as_of, datetime):
+        return as_of.date()
+    if isinstance(as_of, date):
+        return as_of
+    return date.fromisoformat(str(as_of))
+
+
+class HoldingsAnalytics:
+    """
+    保有割合の履歴をpandas/NumPyの配列として一度だけ読み込み、
+    保有者のポートフォリオ・保有割合の増減ランキング・閾値の通過・保有の集中度をベクトル演算で集計する
+    データのバージョンが変わった時点で履歴を読み直し、集計結果はバージョンが変わるまでキャッシュする
+    """
+
+    def __init__(self, db):
+        """
+        初期化
+        Args:
+            db: ReportDatabase または MySQLReportDatabase
+        """
+        if not PANDAS_AVAILABLE:
+            raise ImportError("保有状況の分析には pandas と numpy が必要です")
+        self.db = db
+        # cached_query はデータベースと同じクエリキャッシュ・データのバージョンを使う
+        self.manager = db.manager
+        self._frame = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load_frame(self):
+        """
+        処理済み報告書を読み込み、銘柄・保有者・日付の順に並べたデータフレームを作成
+        直前の報告書からの保有割合の変化と、銘柄・保有者ごとの最新の報告書かどうかもここで計算しておく
+        Returns:
+            pandas.DataFrame: 保有割合の履歴
+        """
+        columns = {name: [] for name in (
+            'report_id', 'security_code', 'target_company', 'holder_name', 'report_type',
+            'submission_date_iso', 'report_date_iso', 'ratio_before', 'ratio_after',
+            'shares_held', 'importance_level',
+        )}
+        for report in self.db.iter_processed_reports(batch_size=ANALYTICS_LOAD_BATCH_SIZE):
+            columns['report_id'].append(report.get('report_id'))
+            columns['security_code'].append(report.get('security_code') or '')
+            columns['target_company'].append(report.get('target_company') or '')
+            columns['holder_name'].append(report.get('holder_name') or '')
+            columns['report_type'].append(report.get('report_type'))
+            columns['submission_date_iso'].append(report.get('submission_date_iso'))
+            columns['report_date_iso'].append(report.get('report_date_iso'))
+            columns['ratio_before'].append(_to_float(report.get('holding_ratio_before')))
+            columns['ratio_after'].append(_to_float(report.get('holding_ratio_after')))
+            columns['shares_held'].append(_to_float(report.get('shares_held')))
+            columns['importance_level'].append(report.get('importance_level'))
+
+        def to_dates(values):
+            return pd.to_datetime(pd.Series(values, dtype=object), format='%Y-%m-%d', errors='coerce')
+
+        def to_numbers(values):
+            return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype('float64')
+
+        frame = pd.DataFrame({
+            'report_id': columns['report_id'],
+            'security_code': pd.Categorical(columns['security_code']),
+            'target_company': pd.Categorical(columns['target_company']),
+            'holder_name': pd.Categorical(columns['holder_name']),
+            'report_type': pd.Categorical(columns['report_type']),
+            # 提出日を優先し、なければ報告義務発生日を使う
+            'date': to_dates(columns['submission_date_iso']).fillna(to_dates(columns['report_date_iso'])),
+            'ratio_before': to_numbers(columns['ratio_before']),
+            'ratio_after': to_numbers(columns['ratio_after']),
+            'shares_held': to_numbers(columns['shares_held']),
+            'importance_level': to_numbers(columns['importance_level']),
+        })
+
+        # 日付のない報告書は同じ銘柄・保有者の中で最も古いものとして扱う（読み込み順は提出順）
+        frame = frame.sort_values(
+            ['security_code', 'holder_name', 'date'], kind='stable', na_position='first'
+        ).reset_index(drop=True)
+
+        code = frame['security_code'].cat.codes.to_numpy()
+        holder = frame['holder_name'].cat.codes.to_numpy()
+        ratio_after = frame['ratio_after'].to_numpy()
+
+        # 直前の行が同じ銘柄・保有者かどうか
+        same_as_previous = np.zeros(len(frame), dtype=bool)
+        same_as_previous[1:] = (code[1:] == code[:-1]) & (holder[1:] == holder[:-1])
+
+        # 直前の報告書の保有割合（最初の報告書は報告書に記載された前回の保有割合）
+        previous_ratio = np.full(len(frame), np.nan)
+        previous_ratio[1:] = ratio_after[:-1]
+        previous_ratio = np.where(same_as_previous, previous_ratio, frame['ratio_before'].to_numpy())
+        frame['previous_ratio'] = previous_ratio
+        frame['change'] = ratio_after - previous_ratio
+
+        is_latest = np.ones(len(frame), dtype=bool)
+        is_latest[:-1] = ~same_as_previous[1:]
+        frame['is_latest'] = is_latest
+        return frame
+
+    def frame(self):
+        """
+        保有割合の履歴を取得（データのバージョンが変わっている場合は読み直す）
+        Returns:
+            pandas.DataFrame: 保有割合の履歴
+        """
+        version = self.manager.data_version()
+        with self._lock:
+            if self._frame is None or version != self._version:
+                started = datetime.now()
+                self._frame = self._load_frame()
+                self._version = version
+                logger.info(
+                    f"保有割合の履歴を読み込みました: {len(self._frame)}件"
+                    f"（{(datetime.now() - started).total_seconds():.2f}秒）"
+                )
+            return self._frame
+
+    def _window(self, frame, as_of, days):
+        """基準日以前 days 日間（基準日を含む）に提出された行のマスク"""
+        end = np.datetime64(as_of, 'ns')
+        start = np.datetime64(as_of - timedelta(days=days), 'ns')
+        dates = frame['date'].to_numpy()
+        return (dates > start) & (dates <= end)
+
+    @staticmethod
+    def _records(frame, columns):
+        """データフレームの行を辞書のリストに変換（日付は YYYY-MM-DD、欠損値は None）"""
+        rows = []
+        for row in frame[columns].itertuples(index=False, name=None):
+            record = {}
+            for name, value in zip(columns, row):
+                if isinstance(value, pd.Timestamp):
+                    value = value.strftime('%Y-%m-%d')
+                elif value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+                    value = None
+                elif isinstance(value, np.generic):
+                    value = value.item()
+                record[name] = value
+            rows.append(record)
+        return rows
+
+    @cached_query
+    def holder_portfolio(self, holder_name, min_ratio=None):
+        """
+        保有者の現在のポートフォリオ（銘柄ごとの最新の報告書）を取得
+        Args:
+            holder_name: 保有者名（部分一致）
+            min_ratio: この保有割合（%）未満の銘柄を除く（提出義務のなくなった銘柄を除く場合は REPORTING_THRESHOLD）
+        Returns:
+            list: 保有割合の大きい順の銘柄のリスト
+        """
+        frame = self.frame()
+        categories = frame['holder_name'].cat.categories
+        matched = np.flatnonzero(categories.str.contains(holder_name, regex=False))
+        mask = frame['is_latest'].to_numpy() & np.isin(frame['holder_name'].cat.codes.to_numpy(), matched)
+        if min_ratio is not None:
+            mask &= frame['ratio_after'].to_numpy() >= min_ratio
+
+        portfolio = frame[mask].sort_values('ratio_after', ascending=False, na_position='last')
+        return self._records(portfolio, [
+            'security_code', 'target_company', 'holder_name', 'ratio_after', 'change',
+            'shares_held', 'date', 'report_id',
+        ])
+
+    def top_movers(self, days=7, limit=10, as_of=None, decreases=False):
+        """
+        期間内に保有割合が大きく増えた（または減った）報告書を取得
+        Args:
+            days: 基準日から遡る日数
+            limit: 取得する件数
+            as_of: 基準日（省略時は今日）
+            decreases: True の場合は減少幅の大きい順
+        Returns:
+            list: 変化幅（%ポイント）の大きい順の報告書のリスト
+        """
+        return self._top_movers(_as_of_date(as_of).isoformat(), days, limit, decreases)
+
+    @cached_query
+    def _top_movers(self, as_of, days, limit, decreases):
+        frame = self.frame()
+        change = frame['change'].to_numpy()
+        mask = self._window(frame, date.fromisoformat(as_of), days) & ~np.isnan(change)
+        if decreases:
+            mask &= change < 0
+        else:
+            mask &= change > 0
+
+        indices = np.flatnonzero(mask)
+        keys = np.abs(change[indices])
+        if len(indices) > limit:
+            # 上位 limit 件だけを部分的に並べ替える
+            top = np.argpartition(-keys, limit - 1)[:limit]
+            indices, keys = indices[top], keys[top]
+        indices = indices[np.argsort(-keys, kind='stable')]
+
+        return self._records(frame.iloc[indices], [
+            'security_code', 'target_company', 'holder_name', 'previous_ratio', 'ratio_after',
+            'change', 'date', 'report_type', 'report_id',
+        ])
+
+    def threshold_crossings(self, threshold=REPORTING_THRESHOLD, days=30, as_of=None):
+        """
+        期間内に保有割合が閾値をまたいだ報告書を取得
+        Args:
+            threshold: 閾値（%）
+            days: 基準日から遡る日数
+            as_of: 基準日（省略時は今日）
+        Returns:
+            list: 新しい順の報告書のリスト（direction は閾値以上になった場合 'up'、下回った場合 'down'）
+        """
+        return self._threshold_crossings(threshold, days, _as_of_date(as_of).isoformat())
+
+    @cached_query
+    def _threshold_crossings(self, threshold, days, as_of):
+        frame = self.frame()
+        previous_ratio = frame['previous_ratio'].to_numpy()
+        ratio_after = frame['ratio_after'].to_numpy()
+        # NaN との比較は常に False になるため、どちらかが欠けている行は含まれない
+        up = (previous_ratio < threshold) & (ratio_after >= threshold)
+        down = (previous_ratio >= threshold) & (ratio_after < threshold)
+        mask = self._window(frame, date.fromisoformat(as_of), days) & (up | down)
+
+        crossings = frame[mask].assign(direction=np.where(up[mask], 'up', 'down'))
+        crossings = crossings.sort_values('date', ascending=False, kind='stable')
+        return self._records(crossings, [
+            'security_code', 'target_company', 'holder_name', 'previous_ratio', 'ratio_after',
+            'direction', 'date', 'report_id',
+        ])
+
+    @cached_query
+    def concentration(self, security_code):
+        """
+        銘柄の大量保有者の集中度を取得（保有者ごとの最新の報告書から計算）
+        Args:
+            security_code: 証券コード
+        Returns:
+            dict: 保有者数・保有割合の合計・HHI（保有割合の2乗和）・保有割合の大きい順の保有者のリスト
+        """
+        frame = self.frame()
+        code = frame['security_code'].cat.categories.get_indexer([security_code])[0]
+        holders = frame[
+            frame['is_latest'].to_numpy()
+            & (frame['security_code'].cat.codes.to_numpy() == code)
+            & (frame['ratio_after'].to_numpy() > 0)
+        ].sort_values('ratio_after', ascending=False)
+
+        ratios = holders['ratio_after'].to_numpy()
+        return {
+            'security_code': security_code,
+            'target_company': holders['target_company'].iloc[0] if len(holders) else None,
+            'holder_count': int(len(ratios)),
+            'total_ratio': float(ratios.sum()),
+            'hhi': float(np.square(ratios).sum()),
+            'holders': self._records(holders, ['holder_name', 'ratio_after', 'shares_held', 'date']),
+        }
+
+    @cached_query
+    def most_concentrated(self, limit=10):
+        """
+        大量保有者の保有割合の合計が大きい銘柄を取得
+        Args:
+            limit: 取得する銘柄数
+        Returns:
+            list: 保有割合の合計の大きい順の銘柄のリスト
+        """
+        frame = self.frame()
+        ratio_after = frame['ratio_after'].to_numpy()
+        mask = frame['is_latest'].to_numpy() & (ratio_after > 0)
+
+        codes = frame['security_code'].cat.codes.to_numpy()[mask]
+        ratios = ratio_after[mask]
+        categories = frame['security_code'].cat.categories
+        holder_count = np.bincount(codes, minlength=len(categories))
+        total_ratio = np.bincount(codes, weights=ratios, minlength=len(categories))
+        hhi = np.bincount(codes, weights=ratios * ratios, minlength=len(categories))
+
+        # 銘柄ごとの対象企業名は、その銘柄の最後の行から取る
+        last_row = np.zeros(len(categories), dtype=np.int64)
+        last_row[codes] = np.flatnonzero(mask)
+        company_codes = frame['target_company'].cat.codes.to_numpy()
+        company_names = frame['target_company'].cat.categories
+
+        order = np.argsort(-total_ratio, kind='stable')[:limit]
+        return [
+            {
+                'security_code': categories[code],
+                'target_company': company_names[company_codes[last_row[code]]],
+                'holder_count': int(holder_count[code]),
+                'total_ratio': float(total_ratio[code]),
+                'hhi': float(hhi[code]),
+            }
+            for code in order
+            if holder_count[code]
+        ]
+
+
+_analytics = None
+_analytics_lock = threading.Lock()
+
+
+def get_analytics():
+    """
+    プロセスで共有する HoldingsAnalytics を取得（初回に読み取り専用のデータベースを開く）
+    Returns:
+        HoldingsAnalytics: 保有状況の分析
+    """
+    global _analytics
+    with _analytics_lock:
+        if _analytics is None:
+            _analytics = HoldingsAnalytics(get_database(read_only=True))
+        return _analytics
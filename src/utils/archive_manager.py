@@ -242,12 +242,13 @@ class ArchiveManager:
             size_saved = original_size - compressed_size
             
             # データベースのfile_locationを更新
-            self.db.cursor.execute("""
-            UPDATE processed_reports 
-            SET file_location = ? 
-            WHERE report_id = ?
-            """, (str(archive_path), record['report_id']))
-            self.db.conn.commit()
+            with self.db.transaction():
+                self.db.cursor.execute("""
+                UPDATE processed_reports 
+                SET file_location = ? 
+                WHERE report_id = ?
+                """, (str(archive_path), record['report_id']))
+                self.db.conn.commit()
             
             logger.info(f"アーカイブ作成完了: {archive_path}")
             logger.info(f"圧縮率: {(size_saved/original_size)*100:.1f}% ({original_size} -> {compressed_size} bytes)")
@@ -311,12 +312,13 @@ class ArchiveManager:
                 tar.extractall(restore_dir)
             
             # データベースのfile_locationを更新
-            cursor.execute("""
-            UPDATE processed_reports 
-            SET file_location = 'active' 
-            WHERE report_id = ?
-            """, (report_id,))
-            self.db.conn.commit()
+            with self.db.transaction():
+                cursor.execute("""
+                UPDATE processed_reports 
+                SET file_location = 'active' 
+                WHERE report_id = ?
+                """, (report_id,))
+                self.db.conn.commit()
             
             logger.info(f"復元完了: {report_id}")
             return True
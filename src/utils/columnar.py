@@ -0,0 +1,218 @@
+import logging
+import re
+from datetime import date, datetime
+
+# Parquet/Arrow 用のインポート（オプション）
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger('edinet_db')
+
+# 分割（パーティション）に使う列
+PARTITION_COLUMNS = ['year', 'report_type']
+
+# 1つのレコードバッチにまとめる行数
+RECORD_BATCH_SIZE = 10000
+
+_NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def _arrow_schema():
+    """processed_reports の列と型の対応（スキーマ）"""
+    return pa.schema([
+        ('report_id', pa.string()),
+        ('processed_at', pa.timestamp('s')),
+        ('target_company', pa.string()),
+        ('security_code', pa.string()),
+        ('holder_name', pa.string()),
+        ('report_date', pa.string()),
+        ('submission_date', pa.string()),
+        ('report_date_iso', pa.date32()),
+        ('submission_date_iso', pa.date32()),
+        ('holding_ratio_before', pa.float64()),
+        ('holding_ratio_after', pa.float64()),
+        ('change_percentage', pa.float64()),
+        ('shares_held', pa.int64()),
+        ('importance_level', pa.int8()),
+        ('purpose', pa.string()),
+        ('file_location', pa.string()),
+        ('year', pa.int16()),
+        ('report_type', pa.string()),
+    ])
+
+
+def _partitioning(schema):
+    """年・報告書種類による hive 形式（year=2024/report_type=...）の分割"""
+    return ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor='hive')
+
+
+def _to_date(value):
+    """YYYY-MM-DD 形式の文字列（またはdate）を date に変換"""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _to_datetime(value):
+    """YYYY-MM-DD HH:MM:SS 形式の文字列（またはdatetime）を datetime に変換"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _to_float(value):
+    """割合などの数値を float に変換（変換できない場合は None）"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        match = _NUMBER_PATTERN.search(str(value).replace(',', ''))
+        return float(match.group()) if match else None
+
+
+def _to_int(value):
+    """保有株数などのカンマ区切りの数値文字列を int に変換（変換できない場合は None）"""
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def to_typed_record(report):
+    """
+    processed_reports の1行を型付きの列に変換
+    Args:
+        report: 処理済み報告書の辞書
+    Returns:
+        dict: スキーマの列名と変換後の値
+    """
+    submission_date = _to_date(report.get('submission_date_iso'))
+    report_date = _to_date(report.get('report_date_iso'))
+    processed_at = _to_datetime(report.get('processed_at'))
+
+    # 年の分割は提出日を優先し、なければ報告義務発生日、処理日時の順に使う
+    base_date = submission_date or report_date or processed_at
+    importance_level = report.get('importance_level')
+
+    return {
+        'report_id': report.get('report_id'),
+        'processed_at': processed_at,
+        'target_company': report.get('target_company'),
+        'security_code': report.get('security_code'),
+        'holder_name': report.get('holder_name'),
+        'report_date': report.get('report_date'),
+        'submission_date': report.get('submission_date'),
+        'report_date_iso': report_date,
+        'submission_date_iso': submission_date,
+        'holding_ratio_before': _to_float(report.get('holding_ratio_before')),
+        'holding_ratio_after': _to_float(report.get('holding_ratio_after')),
+        'change_percentage': _to_float(report.get('change_percentage')),
+        'shares_held': _to_int(report.get('shares_held')),
+        'importance_level': int(importance_level) if importance_level is not None else None,
+        'purpose': report.get('purpose'),
+        'file_location': report.get('file_location'),
+        'year': base_date.year if base_date else None,
+        'report_type': report.get('report_type') or '不明',
+    }
+
+
+def iter_record_batches(rows, batch_size=RECORD_BATCH_SIZE):
+    """
+    報告書のイテレーターを一定行数ずつArrowのレコードバッチに変換
+    Args:
+        rows: 処理済み報告書の辞書のイテレーター
+        batch_size: 1つのレコードバッチにまとめる行数
+    Yields:
+        pyarrow.RecordBatch: 型付きのレコードバッチ
+    """
+    schema = _arrow_schema()
+    chunk = []
+    for report in rows:
+        chunk.append(to_typed_record(report))
+        if len(chunk) >= batch_size:
+            yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+            chunk = []
+    if chunk:
+        yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+
+def export_parquet(rows, output_dir, batch_size=RECORD_BATCH_SIZE):
+    """
+    報告書を年・報告書種類で分割したParquetデータセットとして書き出す
+    （output_dir/year=2024/report_type=変更報告書/*.parquet の形式。既存の同じ分割は置き換える）
+    Args:
+        rows: 処理済み報告書の辞書のイテレーター
+        output_dir: 出力先ディレクトリ
+        batch_size: 1つのレコードバッチにまとめる行数
+    Returns:
+        int: 書き出した件数
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Parquetのエクスポートには pyarrow が必要です")
+
+    count = 0
+
+    def counted_batches():
+        nonlocal count
+        for batch in iter_record_batches(rows, batch_size):
+            count += batch.num_rows
+            yield batch
+
+    schema = _arrow_schema()
+    ds.write_dataset(
+        counted_batches(),
+        str(output_dir),
+        schema=schema,
+        format='parquet',
+        partitioning=_partitioning(schema),
+        existing_data_behavior='delete_matching',
+    )
+    logger.info(f"{count}件のレコードをParquetに書き出しました: {output_dir}")
+    return count
+
+
+def load_parquet(dataset_dir, years=None, report_types=None, columns=None):
+    """
+    export_parquet で書き出したデータセットをDataFrameとして読み込む
+    （年・報告書種類の条件は該当する分割のファイルだけを読む）
+    Args:
+        dataset_dir: データセットのディレクトリ
+        years: 読み込む年のリスト（省略時は全ての年）
+        report_types: 読み込む報告書種類のリスト（省略時は全ての種類）
+        columns: 読み込む列名のリスト（省略時は全ての列）
+    Returns:
+        pandas.DataFrame: 処理済み報告書のデータフレーム
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Parquetの読み込みには pyarrow が必要です")
+
+    schema = _arrow_schema()
+    dataset = ds.dataset(
+        str(dataset_dir),
+        format='parquet',
+        partitioning=_partitioning(schema),
+    )
+
+    expression = None
+    if years:
+        expression = ds.field('year').isin([int(year) for year in years])
+    if report_types:
+        condition = ds.field('report_type').isin(list(report_types))
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    # 日付の列も datetime64 にしてベクトル演算で扱えるようにする
+    return table.to_pandas(date_as_object=False)
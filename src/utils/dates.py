@@ -0,0 +1,71 @@
+import re
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+# 元号ごとの元年（西暦）
+ERA_START_YEARS = {
+    '令和': 2019,
+    '平成': 1989,
+    '昭和': 1926,
+    '大正': 1912,
+    '明治': 1868,
+}
+
+# 正規表現はモジュール読み込み時に一度だけコンパイルする
+_WAREKI_PATTERN = re.compile(
+    r'(' + '|'.join(ERA_START_YEARS) + r')\s*(元|\d{1,2})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日'
+)
+_SEIREKI_PATTERN = re.compile(r'(\d{4})\s*[年/\-.]\s*(\d{1,2})\s*[月/\-.]\s*(\d{1,2})')
+_NON_DIGIT_PATTERN = re.compile(r'[^0-9]')
+
+
+@lru_cache(maxsize=4096)
+def wareki_to_iso(date_str):
+    """
+    和暦（例: 令和5年7月25日）の日付文字列をISO形式に変換
+    西暦表記（2023年7月25日、2023-07-25 など）もそのまま正規化する
+    Args:
+        date_str: 変換対象の日付文字列
+    Returns:
+        str: YYYY-MM-DD 形式の日付。変換できない場合は None
+    """
+    if not date_str or not isinstance(date_str, str):
+        return None
+
+    # 全角数字・全角スペースを半角に揃える
+    text = unicodedata.normalize('NFKC', date_str)
+
+    match = _WAREKI_PATTERN.search(text)
+    if match:
+        era, era_year, month, day = match.groups()
+        year = ERA_START_YEARS[era] + (1 if era_year == '元' else int(era_year)) - 1
+    else:
+        match = _SEIREKI_PATTERN.search(text)
+        if not match:
+            return None
+        year, month, day = match.groups()
+
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def date_key(date_str):
+    """
+    報告書ID用の日付キーを生成
+    Args:
+        date_str: 日付文字列（和暦・西暦）
+    Returns:
+        str: YYYYMMDD 形式の文字列。変換できない場合は数字のみを抽出した文字列
+    """
+    iso_date = wareki_to_iso(date_str)
+    if iso_date:
+        return iso_date.replace('-', '')
+    return _NON_DIGIT_PATTERN.sub('', date_str or '')
+
+
+def legacy_date_key(date_str):
+    """旧形式の報告書ID用に日付文字列から数字のみを抽出（例: 令和5年7月25日 -> 5725）"""
+    return _NON_DIGIT_PATTERN.sub('', date_str or '')
@@ -1,9 +1,25 @@
 import sqlite3
 import json
 import os
+import re
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import wraps
 from pathlib import Path
+from .dates import wareki_to_iso, date_key
+from .names import normalize_holder_name
+from .sqlite_manager import SQLiteConnectionManager, report_key
+from .exporters import export_rows
+from .importers import iter_import_records
+from .columnar import export_parquet
+from .mysql_manager import MySQLPoolManager
+from .migrations import MIGRATION_BATCH_SIZE, Migration, MigrationRunner
 
 # MySQL接続用のインポート（オプション）
 try:
@@ -27,122 +43,1396 @@ logging.basicConfig(
 )
 logger = logging.getLogger('edinet_db')
 
-class ReportDatabase:
-    def __init__(self, db_path=None):
+_RATIO_PATTERN = re.compile(r'(\d+\.\d+|\d+)')
+
+
+def _normalize_mysql_row(row):
+    """MySQLの DATE・DATETIME・DECIMAL 型の値をSQLite版と同じ文字列・浮動小数点数に揃える"""
+    normalized = {}
+    for key, value in row.items():
+        if isinstance(value, datetime):
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        elif isinstance(value, date):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = float(value)
+        normalized[key] = value
+    return normalized
+
+
+# 一括取得で1クエリに含める (証券コード, 保有者名) の組の上限（SQLiteの複合SELECT数・パラメータ数の上限を考慮）
+HOLDING_LOOKUP_CHUNK_SIZE = 400
+
+# MySQL の複数行 INSERT ... ON DUPLICATE KEY UPDATE 1文に含める件数
+MYSQL_UPSERT_BATCH_SIZE = int(os.getenv('MYSQL_UPSERT_BATCH_SIZE', 500))
+
+# JSONインポートで1トランザクションにまとめる件数
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 5000))
+
+# クエリ結果キャッシュの最大件数（0で無効）
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', 256))
+
+# MySQL版のキャッシュの有効期限（秒）。他のプロセスからの書き込みを検知できないため期限を設ける
+MYSQL_QUERY_CACHE_TTL = float(os.getenv('MYSQL_QUERY_CACHE_TTL', 30))
+
+# SQLite版で1回の incremental_vacuum（1トランザクション）で解放するページ数
+INCREMENTAL_VACUUM_STEP_PAGES = int(os.getenv('SQLITE_INCREMENTAL_VACUUM_STEP_PAGES', 1000))
+
+# SQLite版で1回の整理で解放するページ数の上限（残りは次回以降に解放する）
+INCREMENTAL_VACUUM_MAX_PAGES = int(os.getenv('SQLITE_INCREMENTAL_VACUUM_MAX_PAGES', 25000))
+
+# ANALYZE でインデックスごとに調べる行数の上限（0は全件。大きなテーブルでも短時間で終わるようにする）
+SQLITE_ANALYSIS_LIMIT = int(os.getenv('SQLITE_ANALYSIS_LIMIT', 1000))
+
+# 送信待ちの通知（notification_outbox）を1回に取り出す件数
+OUTBOX_CLAIM_SIZE = int(os.getenv('OUTBOX_CLAIM_SIZE', 50))
+
+# 取り出した通知を他のワーカーが取り出さないようにしておく秒数（送信中に終了した場合はこの後に再送される）
+OUTBOX_LEASE_SECONDS = float(os.getenv('OUTBOX_LEASE_SECONDS', 120))
+
+# SQLite版の全文検索インデックス（processed_reports_fts）を filings に追従させるトリガー
+# （対象企業名・保有者名は companies・holders から取得する）
+SEARCH_INDEX_TRIGGERS = {
+    'processed_reports_fts_insert': '''
+    CREATE TRIGGER IF NOT EXISTS processed_reports_fts_insert AFTER INSERT ON filings BEGIN
+        INSERT INTO processed_reports_fts (rowid, target_company, holder_name, purpose)
+        VALUES (
+            new.filing_id,
+            (SELECT name FROM companies WHERE company_id = new.company_id),
+            (SELECT name FROM holders WHERE holder_id = new.holder_id),
+            new.purpose
+        );
+    END;
+    ''',
+    'processed_reports_fts_delete': '''
+    CREATE TRIGGER IF NOT EXISTS processed_reports_fts_delete AFTER DELETE ON filings BEGIN
+        INSERT INTO processed_reports_fts (processed_reports_fts, rowid, target_company, holder_name, purpose)
+        VALUES (
+            'delete', old.filing_id,
+            (SELECT name FROM companies WHERE company_id = old.company_id),
+            (SELECT name FROM holders WHERE holder_id = old.holder_id),
+            old.purpose
+        );
+    END;
+    ''',
+    'processed_reports_fts_update': '''
+    CREATE TRIGGER IF NOT EXISTS processed_reports_fts_update
+    AFTER UPDATE OF company_id, holder_id, purpose ON filings BEGIN
+        INSERT INTO processed_reports_fts (processed_reports_fts, rowid, target_company, holder_name, purpose)
+        VALUES (
+            'delete', old.filing_id,
+            (SELECT name FROM companies WHERE company_id = old.company_id),
+            (SELECT name FROM holders WHERE holder_id = old.holder_id),
+            old.purpose
+        );
+        INSERT INTO processed_reports_fts (rowid, target_company, holder_name, purpose)
+        VALUES (
+            new.filing_id,
+            (SELECT name FROM companies WHERE company_id = new.company_id),
+            (SELECT name FROM holders WHERE holder_id = new.holder_id),
+            new.purpose
+        );
+    END;
+    ''',
+}
+
+# processed_reports のカラム（SQLite版・MySQL版で共通）
+REPORT_COLUMNS = [
+    'report_id', 'processed_at', 'target_company', 'security_code',
+    'report_type', 'holder_name', 'report_date', 'submission_date',
+    'holding_ratio_before', 'holding_ratio_after', 'shares_held', 'purpose',
+    'file_location', 'importance_level', 'change_percentage',
+    'report_date_iso', 'submission_date_iso'
+]
+
+# SQLite版の filings に直接持つカラム（対象企業・保有者は companies・holders を参照する）
+FILING_COLUMNS = [
+    column for column in REPORT_COLUMNS
+    if column not in ('target_company', 'security_code', 'holder_name')
+]
+
+# current_holdings のカラム（SQLite版・MySQL版で共通）
+CURRENT_HOLDING_COLUMNS = [
+    'security_code', 'holder_key', 'holder_name', 'target_company', 'holding_ratio', 'shares_held',
+    'report_type', 'report_date', 'report_date_iso', 'report_id', 'processed_at'
+]
+
+
+class QueryCache:
+    """
+    クエリ結果のキャッシュ（リードスルー）
+    データのバージョンが変わった時点で全ての結果を破棄するため、書き込みがない間の読み取りは辞書の参照だけで済む
+    """
+    
+    def __init__(self, max_entries=QUERY_CACHE_SIZE, ttl=None):
+        """
+        初期化
+        Args:
+            max_entries: 保持する結果の最大件数（超えた場合は最も古く参照されたものから破棄）
+            ttl: 結果の有効期限（秒）。None の場合は期限なし
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, version):
+        """
+        キャッシュから結果を取得
+        Args:
+            key: クエリとパラメータから作ったキー
+            version: 現在のデータのバージョン
+        Returns:
+            tuple: (見つかったかどうか, 結果)
+        """
+        with self._lock:
+            if version != self._version:
+                # 書き込みがあった場合は全て破棄
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            self.misses += 1
+            return False, None
+    
+    def set(self, key, version, value):
+        """
+        結果をキャッシュに保存（取得中にバージョンが変わった結果は保存しない）
+        Args:
+            key: クエリとパラメータから作ったキー
+            version: クエリを実行する前のデータのバージョン
+            value: クエリの結果
+        """
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """全ての結果を破棄"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+    
+    def stats(self):
+        """ヒット数・ミス数・保持件数を取得"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+def _copy_result(value):
+    """キャッシュした結果を呼び出し元が変更しても影響しないよう、行単位でコピー"""
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def cached_query(method):
+    """
+    読み取りメソッドの結果を、メソッド名と引数をキーにしてキャッシュするデコレーター
+    データのバージョン（書き込み回数・PRAGMA data_version）が変わるまでは同じ結果を返す
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.manager.query_cache
+        if cache is None or cache.max_entries <= 0:
+            return method(self, *args, **kwargs)
+        
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        
+        version = self.manager.data_version()
+        found, result = cache.get(key, version)
+        if not found:
+            result = method(self, *args, **kwargs)
+            cache.set(key, version, result)
+        return _copy_result(result)
+    return wrapper
+
+
+def write_transaction(method):
+    """
+    書き込みメソッドの書き込みからコミット（またはロールバック）までを transaction() の中で実行するデコレーター
+    同じメソッドの中で呼び出す他の書き込みメソッドは同じトランザクションの中で実行される
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.transaction():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class BaseReportDatabase:
+    """SQLite版・MySQL版で共通の処理"""
+
+    # SQLのパラメータのプレースホルダー
+    placeholder = '?'
+    
+    def transaction(self):
+        """
+        書き込みからコミットまでの間、同じ接続を使う他のスレッドの書き込みを待たせるコンテキストマネージャー
+        （接続をスレッド間で共有しない場合は何もしない）
+        """
+        return nullcontext()
+    
+    def _parse_ratio(self, ratio_str):
+        """保有割合の文字列から数値を抽出"""
+        if ratio_str is None or ratio_str == '':
+            return None
+        try:
+            # "5.31%" -> 5.31 のように変換
+            match = _RATIO_PATTERN.search(str(ratio_str))
+            if match:
+                return float(match.group(1))
+        except (ValueError, AttributeError):
+            pass
+        return None
+    
+    def _calculate_change_percentage(self, report_info):
+        """変更割合を計算"""
+        if report_info.get('report_type') == '変更報告書':
+            before = self._parse_ratio(report_info.get('holding_ratio_before'))
+            after = self._parse_ratio(report_info.get('holding_ratio_after'))
+            if before is not None and after is not None:
+                return after - before
+        return 0.0
+    
+    def _determine_importance_level(self, report_info, change_percentage):
+        """重要度レベルを判定"""
+        abs_change = abs(change_percentage)
+        
+        # 新規報告書の場合
+        if report_info.get('report_type') == '大量保有報告書':
+            holding_ratio = self._parse_ratio(report_info.get('holding_ratio'))
+            if holding_ratio and holding_ratio >= 10:
+                return 3  # 高重要度
+            elif holding_ratio and holding_ratio >= 5:
+                return 2  # 中重要度
+            return 1  # 低重要度
+        
+        # 変更報告書の場合
+        if abs_change >= 1.5:
+            return 3  # 高重要度
+        elif abs_change >= 0.5:
+            return 2  # 中重要度
+        return 1  # 低重要度
+    
+    def _derived_columns(self, report):
+        """
+        保存済みの1行から変更割合・重要度レベルを計算
+        Args:
+            report: processed_reports の1行に相当する辞書
+        Returns:
+            tuple: (変更割合, 重要度レベル)
+        """
+        report_info = {**report, 'holding_ratio': report.get('holding_ratio_after')}
+        change_percentage = self._calculate_change_percentage(report_info)
+        return change_percentage, self._determine_importance_level(report_info, change_percentage)
+    
+    def _build_report_record(self, report_info):
+        """
+        報告書情報から processed_reports の1行分の辞書を作成
+        Args:
+            report_info: 報告書情報の辞書
+        Returns:
+            dict: REPORT_COLUMNS をキーとする辞書
+        """
+        report_id = report_info.get('report_id')
+        if not report_id:
+            # report_idがない場合は、生成ロジックに従って作成
+            security_code = report_info.get('security_code', '')
+            submission_date = report_info.get('submission_date', '')
+            report_date = report_info.get('report_date', '')
+            report_type = report_info.get('report_type', '')
+            holder_name = report_info.get('holder_name', '')
+            
+            # 和暦の日付を YYYYMMDD 形式に変換
+            submission_numbers = date_key(submission_date)
+            report_numbers = date_key(report_date)
+            
+            report_id = f"{security_code}_{submission_numbers}_{report_numbers}_{report_type}_{holder_name}"
+        
+        # 変更割合を計算
+        change_percentage = self._calculate_change_percentage(report_info)
+        
+        # 重要度レベルを判定
+        importance_level = self._determine_importance_level(report_info, change_percentage)
+        
+        # 変更後の保有割合が 0（全て処分）の場合も holding_ratio で置き換えない
+        holding_ratio_after = report_info.get('holding_ratio_after')
+        if holding_ratio_after is None:
+            holding_ratio_after = report_info.get('holding_ratio')
+        
+        return {
+            'report_id': report_id,
+            'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'target_company': report_info.get('target_company', '不明'),
+            'security_code': report_info.get('security_code', '不明'),
+            'report_type': report_info.get('report_type', '不明'),
+            'holder_name': report_info.get('holder_name', '不明'),
+            'report_date': report_info.get('report_date', '不明'),
+            'submission_date': report_info.get('submission_date', '不明'),
+            'holding_ratio_before': self._parse_ratio(report_info.get('holding_ratio_before')),
+            'holding_ratio_after': self._parse_ratio(holding_ratio_after),
+            'shares_held': report_info.get('shares_held', '不明'),
+            'purpose': report_info.get('purpose', '不明'),
+            'file_location': 'active',  # 新規データは常にactive
+            'importance_level': importance_level,
+            'change_percentage': change_percentage,
+            'report_date_iso': wareki_to_iso(report_info.get('report_date')),
+            'submission_date_iso': wareki_to_iso(report_info.get('submission_date'))
+        }
+    
+    def _current_holding_values(self, report):
+        """
+        processed_reports の1行から current_holdings の1行分の値を作成
+        Args:
+            report: processed_reports の1行に相当する辞書
+        Returns:
+            tuple: CURRENT_HOLDING_COLUMNS の順の値
+        """
+        # 変更後の保有割合が 0.0（全て処分）の場合も変更前の値で置き換えない
+        latest_ratio = report.get('holding_ratio_after')
+        if latest_ratio is None:
+            latest_ratio = report.get('holding_ratio_before')
+        return (
+            report.get('security_code'),
+            normalize_holder_name(report.get('holder_name')),
+            report.get('holder_name'),
+            report.get('target_company'),
+            latest_ratio,
+            report.get('shares_held'),
+            report.get('report_type'),
+            report.get('report_date'),
+            report.get('report_date_iso'),
+            report.get('report_id'),
+            report.get('processed_at')
+        )
+    
+    def _build_import_record(self, report):
+        """
+        インポート元の報告書から processed_reports の1行分の辞書を作成
+        （保有割合・重要度・ISO形式の日付を計算し、処理日時と保存場所は元の値を引き継ぐ）
+        Args:
+            report: インポート元の報告書の辞書（report_id を含む）
+        Returns:
+            dict: REPORT_COLUMNS をキーとする辞書
+        """
+        record = self._build_report_record(report)
+        record['processed_at'] = report.get('processed_at') or record['processed_at']
+        record['file_location'] = report.get('file_location') or 'active'
+        return record
+    
+    def mark_as_processed(self, report_info):
+        """
+        報告書を処理済みとしてマーク
+        Args:
+            report_info: 報告書情報の辞書
+        Returns:
+            bool: 処理が成功したかどうか
+        """
+        return self.mark_many_as_processed([report_info]) == 1
+    
+    @write_transaction
+    def import_from_json(self, json_file_path='processed_reports.json', batch_size=IMPORT_BATCH_SIZE, progress=None):
+        """
+        JSONファイル（従来の processed_reports.json・JSON配列・NDJSON、.gz も可）からデータをインポート
+        ファイル全体を読み込まずに少しずつ解析し、batch_size 件ごとに一括で書き込んでコミットする
+        Args:
+            json_file_path: インポート元のファイルパス
+            batch_size: 1トランザクションで書き込む件数
+            progress: コミットごとにそれまでのインポート件数を受け取る関数
+        Returns:
+            int: インポートした件数
+        """
+        if not os.path.exists(json_file_path):
+            logger.warning(f"JSONファイルが見つかりません: {json_file_path}")
+            return 0
+        
+        count = 0
+        started = time.monotonic()
+        try:
+            records = []
+            for report in iter_import_records(json_file_path):
+                records.append(self._build_import_record(report))
+                if len(records) >= batch_size:
+                    count += self._import_batch(records)
+                    records = []
+                    logger.info(f"{count}件インポート済み（{count / (time.monotonic() - started):.0f}件/秒）")
+                    if progress:
+                        progress(count)
+            if records:
+                count += self._import_batch(records)
+                if progress:
+                    progress(count)
+            
+            logger.info(f"{count}件のレコードをJSONからインポートしました（{time.monotonic() - started:.1f}秒）")
+            return count
+        
+        except Exception as e:
+            logger.error(f"JSONインポート中にエラー（{count}件はコミット済み）: {e}")
+            self.conn.rollback()
+            raise
+    
+    def _import_batch(self, records):
+        """インポートする報告書を1トランザクションで書き込み、件数を返す"""
+        self._write_reports(records)
+        self._commit()
+        return len(records)
+    
+    def _migrations(self):
+        """スキーママイグレーションのリスト（各データベースで定義）"""
+        return []
+    
+    @write_transaction
+    def migrate(self, batch_size=MIGRATION_BATCH_SIZE):
+        """
+        未適用のスキーママイグレーションを順に適用
+        既存レコードの補完は batch_size 件ずつコミットし、途中で終了しても次回は続きから再開する
+        Args:
+            batch_size: バックフィルで1トランザクションに処理する件数
+        Returns:
+            list: 適用したマイグレーション名のリスト
+        """
+        return MigrationRunner(self, self._migrations(), batch_size=batch_size).run()
+    
+    def _write_outbox(self, notifications):
+        """
+        送信待ちの通知を notification_outbox に書き込む（コミットは呼び出し元で行う）
+        Args:
+            notifications: recipient（送信先）・messages（テキストのリスト）・report_ids を持つ辞書のリスト
+                （recipients（ユーザーIDのリスト）を持つ通知はマルチキャストで送信する）
+        """
+        if not notifications:
+            return
+        now = time.time()
+        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.cursor.executemany('''
+        INSERT INTO notification_outbox
+            (recipient, recipients, messages, report_ids, retry_key, status, attempts, next_attempt_at, created_at)
+        VALUES ({p}, {p}, {p}, {p}, {p}, 'pending', 0, {p}, {p})
+        '''.format(p=self.placeholder), [
+            (
+                notification['recipient'],
+                json.dumps(notification['recipients']) if notification.get('recipients') else None,
+                json.dumps(notification['messages'], ensure_ascii=False),
+                json.dumps(notification.get('report_ids') or [], ensure_ascii=False),
+                # LINEの再試行キー（同じキーでの再送はLINE側で重複として受け付けられない）
+                notification.get('retry_key') or str(uuid.uuid4()),
+                now,
+                created_at,
+            )
+            for notification in notifications
+        ])
+    
+    @write_transaction
+    def claim_notifications(self, limit=OUTBOX_CLAIM_SIZE, lease_seconds=OUTBOX_LEASE_SECONDS):
+        """
+        送信時刻になった通知を取り出し、lease_seconds 秒の間は他のワーカーが取り出さないようにする
+        （取り出した時点で試行回数を1増やす。送信結果は complete_notification・fail_notification で記録する）
+        Args:
+            limit: 取り出す最大件数
+            lease_seconds: 他のワーカーから隠しておく秒数
+        Returns:
+            list: outbox_id, recipient, recipients（マルチキャストの送信先のリストまたは None）, messages（リスト）,
+                  report_ids（リスト）, retry_key, attempts を持つ辞書のリスト
+        """
+        now = time.time()
+        try:
+            self.cursor.execute('''
+            SELECT outbox_id, recipient, recipients, messages, report_ids, retry_key, attempts, next_attempt_at
+            FROM notification_outbox
+            WHERE status = 'pending' AND next_attempt_at <= {p}
+            ORDER BY next_attempt_at, outbox_id
+            LIMIT {p}
+            '''.format(p=self.placeholder), (now, limit))
+            rows = [dict(row) for row in self.cursor.fetchall()]
+            
+            claimed = []
+            for row in rows:
+                # 同時に取り出そうとした他のワーカーが先に更新した行は除く
+                self.cursor.execute('''
+                UPDATE notification_outbox
+                SET attempts = attempts + 1, next_attempt_at = {p}
+                WHERE outbox_id = {p} AND status = 'pending' AND next_attempt_at = {p}
+                '''.format(p=self.placeholder), (now + lease_seconds, row['outbox_id'], row['next_attempt_at']))
+                if self.cursor.rowcount != 1:
+                    continue
+                claimed.append({
+                    'outbox_id': row['outbox_id'],
+                    'recipient': row['recipient'],
+                    'recipients': json.loads(row['recipients']) if row['recipients'] else None,
+                    'messages': json.loads(row['messages']),
+                    'report_ids': json.loads(row['report_ids'] or '[]'),
+                    'retry_key': row['retry_key'],
+                    'attempts': row['attempts'] + 1,
+                })
+            self._commit()
+            return claimed
+        except Exception as e:
+            logger.error(f"送信待ちの通知の取り出し中にエラー: {e}")
+            self.conn.rollback()
+            return []
+    
+    @write_transaction
+    def complete_notification(self, outbox_id):
+        """
+        通知を送信済みとして記録
+        Args:
+            outbox_id: 通知のID
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            self.cursor.execute('''
+            UPDATE notification_outbox SET status = 'sent', sent_at = {p}, last_error = NULL WHERE outbox_id = {p}
+            '''.format(p=self.placeholder), (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), outbox_id))
+            self._commit()
+            return True
+        except Exception as e:
+            logger.error(f"通知の送信済みの記録中にエラー: {e}")
+            self.conn.rollback()
+            return False
+    
+    @write_transaction
+    def fail_notification(self, outbox_id, error, retry_at=None):
+        """
+        通知の送信失敗を記録
+        Args:
+            outbox_id: 通知のID
+            error: エラーの内容
+            retry_at: 次に送信する時刻（UNIX時間）。None の場合は再送せず 'failed' にする
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            if retry_at is None:
+                self.cursor.execute('''
+                UPDATE notification_outbox SET status = 'failed', last_error = {p} WHERE outbox_id = {p}
+                '''.format(p=self.placeholder), (str(error)[:1000], outbox_id))
+            else:
+                self.cursor.execute('''
+                UPDATE notification_outbox SET next_attempt_at = {p}, last_error = {p} WHERE outbox_id = {p}
+                '''.format(p=self.placeholder), (retry_at, str(error)[:1000], outbox_id))
+            self._commit()
+            return True
+        except Exception as e:
+            logger.error(f"通知の送信失敗の記録中にエラー: {e}")
+            self.conn.rollback()
+            return False
+    
+    def get_outbox_counts(self):
+        """
+        送信待ちテーブルの状態ごとの件数を取得
+        Returns:
+            dict: 状態（pending・sent・failed）と件数の辞書
+        """
+        try:
+            self.cursor.execute('SELECT status, COUNT(*) AS count FROM notification_outbox GROUP BY status')
+            return {row['status']: row['count'] for row in self.cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"送信待ちテーブルの集計中にエラー: {e}")
+            return {}
+    
+    def get_importance_level(self, report_info):
+        """
+        報告書情報から重要度レベル（1〜3）を判定
+        Args:
+            report_info: 報告書情報の辞書
+        Returns:
+            int: 重要度レベル
+        """
+        return self._determine_importance_level(report_info, self._calculate_change_percentage(report_info))
+    
+    def _build_subscriber(self, row):
+        """subscribers の1行を、ウォッチリストをリストに戻した辞書にする"""
+        subscriber = dict(row)
+        subscriber['security_codes'] = json.loads(subscriber.get('security_codes') or '[]')
+        subscriber['holder_keywords'] = json.loads(subscriber.get('holder_keywords') or '[]')
+        subscriber['active'] = bool(subscriber.get('active'))
+        return subscriber
+    
+    @write_transaction
+    def upsert_subscriber(self, user_id, display_name=None, security_codes=None, holder_keywords=None, min_importance=None):
+        """
+        通知の購読者を登録（登録済みの場合は指定した項目だけを更新し、購読を再開する）
+        ウォッチリストが空の購読者には全ての報告書を通知する
+        Args:
+            user_id: LINEのユーザーID
+            display_name: 表示名
+            security_codes: 通知する証券コードのリスト（None の場合は変更しない。空のリストで解除）
+            holder_keywords: 通知する保有者名（部分一致）のリスト（None の場合は変更しない。空のリストで解除）
+            min_importance: 通知する最低の重要度レベル（1〜3。None の場合は変更しない）
+        Returns:
+            bool: 成功したかどうか
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        codes = None if security_codes is None else json.dumps([str(code) for code in security_codes])
+        keywords = None if holder_keywords is None else json.dumps(list(holder_keywords), ensure_ascii=False)
+        try:
+            self.cursor.execute(
+                'SELECT user_id FROM subscribers WHERE user_id = {p}'.format(p=self.placeholder), (user_id,)
+            )
+            if self.cursor.fetchone() is None:
+                self.cursor.execute('''
+                INSERT INTO subscribers
+                    (user_id, display_name, security_codes, holder_keywords, min_importance, active, created_at, updated_at)
+                VALUES ({p}, {p}, {p}, {p}, {p}, 1, {p}, {p})
+                '''.format(p=self.placeholder),
+                    (user_id, display_name, codes or '[]', keywords or '[]', min_importance or 1, now, now))
+            else:
+                self.cursor.execute('''
+                UPDATE subscribers
+                SET display_name = COALESCE({p}, display_name),
+                    security_codes = COALESCE({p}, security_codes),
+                    holder_keywords = COALESCE({p}, holder_keywords),
+                    min_importance = COALESCE({p}, min_importance),
+                    active = 1, updated_at = {p}
+                WHERE user_id = {p}
+                '''.format(p=self.placeholder), (display_name, codes, keywords, min_importance, now, user_id))
+            self._commit()
+            return True
+        except Exception as e:
+            logger.error(f"購読者の登録中にエラー: {e}")
+            self.conn.rollback()
+            return False
+    
+    @write_transaction
+    def remove_subscriber(self, user_id):
+        """
+        通知の購読を停止（ウォッチリストは残し、再登録時に使う）
+        Args:
+            user_id: LINEのユーザーID
+        Returns:
+            bool: 購読中の購読者を停止したかどうか
+        """
+        try:
+            self.cursor.execute('''
+            UPDATE subscribers SET active = 0, updated_at = {p} WHERE user_id = {p} AND active = 1
+            '''.format(p=self.placeholder), (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), user_id))
+            removed = self.cursor.rowcount > 0
+            self._commit()
+            return removed
+        except Exception as e:
+            logger.error(f"購読の停止中にエラー: {e}")
+            self.conn.rollback()
+            return False
+    
+    def get_subscribers(self, active_only=True):
+        """
+        通知の購読者を取得
+        Args:
+            active_only: 購読中の購読者のみを取得するかどうか
+        Returns:
+            list: user_id, display_name, security_codes（リスト）, holder_keywords（リスト）,
+                  min_importance, active を持つ辞書のリスト
+        """
+        query = '''
+        SELECT user_id, display_name, security_codes, holder_keywords, min_importance, active, created_at, updated_at
+        FROM subscribers
+        '''
+        if active_only:
+            query += ' WHERE active = 1'
+        query += ' ORDER BY created_at, user_id'
+        try:
+            self.cursor.execute(query)
+            return [self._build_subscriber(row) for row in self.cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"購読者の取得中にエラー: {e}")
+            return []
+    
+    def _commit(self):
+        """コミットし、クエリ結果キャッシュを無効にするためデータのバージョンを進める"""
+        self.conn.commit()
+        self.manager.bump_write_version()
+    
+    def maintain_storage(self, max_pages=INCREMENTAL_VACUUM_MAX_PAGES, full_vacuum=False):
+        """
+        一括の更新・削除の後にデータベースファイルを整理する
+        空きページを上限まで解放し（full_vacuum の場合はテーブル全体を作り直す）、統計情報を更新する
+        （書き込みのロックは各処理の中で取るため、処理の合間に他のスレッドが書き込める）
+        Args:
+            max_pages: incremental_vacuum で解放するページ数の上限
+            full_vacuum: vacuum() でテーブル全体を作り直すかどうか
+        Returns:
+            dict: before, after（get_storage_stats の結果）, released_pages, vacuumed
+        """
+        before = self.get_storage_stats()
+        vacuumed = False
+        released = 0
+        if full_vacuum:
+            vacuumed = self.vacuum()
+        else:
+            released = self.incremental_vacuum(max_pages)
+        self.optimize(analyze=True)
+        after = self.get_storage_stats()
+        
+        if vacuumed and before and after:
+            released = before['page_count'] - after['page_count']
+        return {
+            'before': before,
+            'after': after,
+            'released_pages': released,
+            'vacuumed': vacuumed,
+        }
+    
+    def _build_current_holding_result(self, row):
+        """最新保有状況テーブルの行から最新保有情報の辞書を作成"""
+        return {
+            'latest_ratio': row['holding_ratio'],
+            'shares_held': row['shares_held'],
+            'report_type': row['report_type'],
+            'report_date': row['report_date'],
+            'report_date_iso': row['report_date_iso'],
+            'processed_at': row['processed_at']
+        }
+    
+    def export_to_json(self, json_file_path='processed_reports_export.json'):
+        """
+        データベースからJSONファイルにエクスポート
+        Args:
+            json_file_path: エクスポート先のJSONファイルパス（.gz で終わる場合はgzip圧縮）
+        Returns:
+            bool: エクスポートが成功したかどうか
+        """
+        return self.export_reports(json_file_path, fmt='json')
+    
+    def export_reports(self, file_path, fmt=None, compress=None, batch_size=1000):
+        """
+        処理済み報告書をストリーミングでファイルにエクスポート
+        Args:
+            file_path: エクスポート先のファイルパス
+            fmt: 'ndjson'・'csv'・'json' のいずれか（省略時は拡張子から判定）
+            compress: gzip圧縮するかどうか（省略時は拡張子が .gz かどうかで判定）
+            batch_size: 1回のクエリで取得する件数
+        Returns:
+            bool: エクスポートが成功したかどうか
+        """
+        try:
+            count = export_rows(self.iter_processed_reports(batch_size), file_path, fmt, compress)
+            logger.info(f"{count}件のレコードをエクスポートしました: {file_path}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"エクスポート中にエラー: {e}")
+            return False
+    
+    def export_parquet(self, output_dir, batch_size=1000):
+        """
+        処理済み報告書を年・報告書種類で分割した型付きのParquetデータセットに書き出す
+        （分析用のスナップショット。読み込みは src.utils.columnar.load_parquet を使用）
+        Args:
+            output_dir: 出力先ディレクトリ
+            batch_size: 1回のクエリで取得する件数
+        Returns:
+            bool: エクスポートが成功したかどうか
+        """
+        try:
+            export_parquet(self.iter_processed_reports(batch_size), output_dir)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Parquetエクスポート中にエラー: {e}")
+            return False
+
+
+class ReportDatabase(BaseReportDatabase):
+    def __init__(self, db_path=None, read_only=False):
         """
         データベース接続の初期化
+        接続はプロセス内で共有され、書き込み用はプロセスごとに1つ、読み取り専用はプールから取得する
         Args:
             db_path: SQLiteデータベースファイルのパス
+            read_only: 読み取り専用の接続を使用するかどうか（書き込み中もブロックされない）
         """
         if db_path is None:
             # プロジェクトルートからの相対パスを絶対パスに変換
             project_root = Path(__file__).parent.parent.parent
             db_path = project_root / 'data' / 'database' / 'edinet_reports.db'
         self.db_path = str(db_path)
+        self.read_only = read_only
+        self.manager = SQLiteConnectionManager.for_path(self.db_path)
+        if self.manager.query_cache is None:
+            self.manager.query_cache = QueryCache()
         self.conn = None
         self.cursor = None
+        
+        # テーブルの作成はプロセス内で最初の1回だけ書き込み用の接続で行う
+        self.manager.ensure_schema(self._create_schema)
+        
         self.connect()
+    
+    def _create_schema(self):
+        """書き込み用の接続でテーブルを作成（SQLiteConnectionManager.ensure_schema から呼ばれる）"""
+        self.conn = self.manager.get_writer()
+        self.cursor = self.conn.cursor()
         self.create_tables()
     
+    def transaction(self):
+        """
+        書き込みからコミットまでの間、他のスレッドの書き込みを待たせるコンテキストマネージャー
+        書き込み用の接続はプロセス内の全てのスレッドで共有するため、他のスレッドのコミット・ロールバックに
+        途中の書き込みが巻き込まれないようにする
+        """
+        return self.manager.transaction()
+    
     def connect(self):
-        """データベースへの接続を確立"""
+        """データベースへの接続を確立（プロセス内で共有している接続を取得）"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row  # 行を辞書形式で取得
+            if self.read_only:
+                self.conn = self.manager.acquire_reader()
+            else:
+                self.conn = self.manager.get_writer()
             self.cursor = self.conn.cursor()
-            logger.info(f"データベースに接続しました: {self.db_path}")
+            logger.info(f"データベースに接続しました: {self.db_path}{'（読み取り専用）' if self.read_only else ''}")
         except sqlite3.Error as e:
             logger.error(f"データベース接続エラー: {e}")
             raise
     
     def close(self):
-        """データベース接続を閉じる"""
-        if self.conn:
-            self.conn.close()
-            logger.info("データベース接続を閉じました")
+        """
+        データベース接続を解放
+        読み取り専用の接続はプールに返却する。書き込み用の接続はプロセス内で共有しているため、
+        プロセス終了時（または SQLiteConnectionManager.close_all_instances 呼び出し時）に閉じる
+        """
+        if not self.conn:
+            return
+        if self.read_only:
+            self.manager.release_reader(self.conn)
+            self.conn = None
+            self.cursor = None
+        logger.info("データベース接続を解放しました")
     
+    @write_transaction
     def create_tables(self):
-        """必要なテーブルを作成"""
+        """
+        必要なテーブルを作成
+        報告書は対象企業（companies）・保有者（holders）・報告書（filings）に正規化して保存し、
+        従来の processed_reports はビューとして参照・更新できるようにする
+        """
         try:
-            # 報告書テーブルの作成
+            self._create_normalized_tables()
+            
+            # 銘柄・保有者ごとの最新保有状況テーブルの作成
             self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS processed_reports (
-                report_id TEXT PRIMARY KEY,
-                processed_at TEXT,
+            CREATE TABLE IF NOT EXISTS current_holdings (
+                security_code TEXT NOT NULL,
+                holder_key TEXT NOT NULL,
+                holder_name TEXT,
                 target_company TEXT,
-                security_code TEXT,
+                holding_ratio REAL,
+                shares_held TEXT,
                 report_type TEXT,
-                holder_name TEXT,
                 report_date TEXT,
-                submission_date TEXT,
-                holding_ratio_before REAL,
-                holding_ratio_after REAL,
-                shares_held TEXT,
-                purpose TEXT,
-                file_location TEXT DEFAULT 'active',
-                importance_level INTEGER DEFAULT 1,
-                change_percentage REAL
-            )
+                report_date_iso TEXT,
+                report_id TEXT,
+                processed_at TEXT,
+                PRIMARY KEY (security_code, holder_key)
+            ) WITHOUT ROWID
             ''')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_current_holdings_holder ON current_holdings (holder_key)')
             
-            # インデックスの作成
-            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_security_code ON processed_reports (security_code)')
-            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_holder_name ON processed_reports (holder_name)')
-            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_report_type ON processed_reports (report_type)')
+            self._commit()
             
-            self.conn.commit()
+            # 旧形式のテーブルの移行・既存レコードの補完などを未適用のものだけ順に行う
+            if self.migrate():
+                self.optimize(analyze=True)
+            self._create_report_views()
             logger.info("テーブルの作成が完了しました")
+            
+            # 全文検索インデックスの作成
+            search_index_created = self._create_search_index()
+            
+            # 最新保有状況テーブルが空の場合（新たに作成した・移行が途中で終了した場合）は履歴から構築する
+            self.cursor.execute(
+                'SELECT EXISTS (SELECT 1 FROM filings) AND NOT EXISTS (SELECT 1 FROM current_holdings) AS needs_rebuild'
+            )
+            if self.cursor.fetchone()['needs_rebuild']:
+                self.rebuild_current_holdings()
+            
+            # 全文検索インデックスを新たに作成した場合は既存レコードを登録する
+            if search_index_created:
+                self.rebuild_search_index()
         except sqlite3.Error as e:
             logger.error(f"テーブル作成エラー: {e}")
             raise
     
-    def import_from_json(self, json_file_path='processed_reports.json'):
+    def _create_normalized_tables(self):
+        """対象企業・保有者・報告書のテーブルとインデックスを作成"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS companies (
+            company_id INTEGER PRIMARY KEY,
+            security_code TEXT NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE (security_code, name)
+        )
+        ''')
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS holders (
+            holder_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        ''')
+        # report_key は report_id のハッシュ（64ビット整数）。重複判定は長い文字列ではなくこのキーで行う
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS filings (
+            filing_id INTEGER PRIMARY KEY,
+            report_key INTEGER NOT NULL UNIQUE,
+            report_id TEXT NOT NULL,
+            company_id INTEGER NOT NULL REFERENCES companies (company_id),
+            holder_id INTEGER NOT NULL REFERENCES holders (holder_id),
+            processed_at TEXT,
+            report_type TEXT,
+            report_date TEXT,
+            submission_date TEXT,
+            holding_ratio_before REAL,
+            holding_ratio_after REAL,
+            shares_held TEXT,
+            purpose TEXT,
+            file_location TEXT DEFAULT 'active',
+            importance_level INTEGER DEFAULT 1,
+            change_percentage REAL,
+            report_date_iso TEXT,
+            submission_date_iso TEXT
+        )
+        ''')
+        
+        # インデックスの作成
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_filings_company_holder_processed ON filings (company_id, holder_id, processed_at)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_filings_holder ON filings (holder_id)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_filings_report_type ON filings (report_type)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_filings_report_date_iso ON filings (report_date_iso)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_filings_submission_date_iso ON filings (submission_date_iso)')
+    
+    def _create_report_views(self):
+        """
+        filings に対象企業・保有者を結合したビューと、従来の processed_reports と同じ形のビューを作成
+        processed_reports への INSERT（OR REPLACE）・UPDATE・DELETE はトリガーで filings などに反映する
+        """
+        company_id = '''(SELECT company_id FROM companies
+                WHERE security_code = COALESCE(new.security_code, '') AND name = COALESCE(new.target_company, ''))'''
+
+        holder_id = "(SELECT holder_id FROM holders WHERE name = COALESCE(new.holder_name, ''))"
+        # トリガー内の OR IGNORE などは外側の INSERT OR REPLACE に置き換えられるため、衝突しない形で書く
+        insert_names = f"""
+            INSERT INTO companies (security_code, name)
+            SELECT COALESCE(new.security_code, ''), COALESCE(new.target_company, '')
+            WHERE NOT EXISTS {company_id};
+            INSERT INTO holders (name)
+            SELECT COALESCE(new.holder_name, '')
+            WHERE NOT EXISTS {holder_id};
         """
-        既存のJSONファイルからデータをインポート
+        # ビューへの INSERT では省略したカラムのデフォルト値が使われないため補う
+        new_values = {column: f'new.{column}' for column in FILING_COLUMNS}
+        new_values.update({
+            'report_key': 'report_key(new.report_id)',
+            'company_id': company_id,
+            'holder_id': holder_id,
+            'file_location': "COALESCE(new.file_location, 'active')",
+            'importance_level': 'COALESCE(new.importance_level, 1)',
+        })
+        columns = ['report_key', 'report_id', 'company_id', 'holder_id'] + FILING_COLUMNS[1:]
+        
+        self.cursor.executescript(f'''
+        CREATE VIEW IF NOT EXISTS report_rows AS
+        SELECT f.filing_id, f.report_id, f.processed_at, c.name AS target_company, c.security_code,
+            f.report_type, h.name AS holder_name, {', '.join('f.' + column for column in FILING_COLUMNS[3:])}
+        FROM filings f
+        JOIN companies c ON c.company_id = f.company_id
+        JOIN holders h ON h.holder_id = f.holder_id;
+        
+        CREATE VIEW IF NOT EXISTS processed_reports AS
+        SELECT {', '.join(REPORT_COLUMNS)} FROM report_rows;
+        
+        CREATE TRIGGER IF NOT EXISTS processed_reports_insert INSTEAD OF INSERT ON processed_reports BEGIN
+            {insert_names}
+            UPDATE filings SET
+                {', '.join(f'{column} = {new_values[column]}' for column in columns[1:])}
+            WHERE report_key = report_key(new.report_id);
+            INSERT INTO filings ({', '.join(columns)})
+            SELECT {', '.join(new_values[column] for column in columns)}
+            WHERE NOT EXISTS (SELECT 1 FROM filings WHERE report_key = report_key(new.report_id));
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS processed_reports_update INSTEAD OF UPDATE ON processed_reports BEGIN
+            {insert_names}
+            UPDATE filings SET
+                {', '.join(f'{column} = {new_values[column]}' for column in columns)}
+            WHERE report_key = report_key(old.report_id);
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS processed_reports_delete INSTEAD OF DELETE ON processed_reports BEGIN
+            DELETE FROM filings WHERE report_key = report_key(old.report_id);
+        END;
+        ''')
+    
+    def _migrations(self):
+        """SQLite版のスキーママイグレーション（適用順）"""
+        return [
+            Migration(1, 'normalize_processed_reports', self._migrate_legacy_reports),
+            Migration(2, 'backfill_iso_dates', self._backfill_iso_dates),
+            Migration(3, 'backfill_derived_columns', self._backfill_derived_columns),
+            Migration(4, 'create_notification_outbox', self._create_notification_outbox),
+            Migration(5, 'create_subscribers', self._create_subscribers),
+        ]
+    
+    def _create_subscribers(self, runner):
+        """通知の購読者（ウォッチリスト付き）のテーブルを作成し、送信待ちテーブルにマルチキャストの送信先を追加"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subscribers (
+            user_id TEXT PRIMARY KEY,
+            display_name TEXT,
+            security_codes TEXT NOT NULL DEFAULT '[]',
+            holder_keywords TEXT NOT NULL DEFAULT '[]',
+            min_importance INTEGER NOT NULL DEFAULT 1,
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT,
+            updated_at TEXT
+        )
+        ''')
+        self._add_missing_columns({'recipients': 'TEXT'}, table='notification_outbox')
+    
+    def _create_notification_outbox(self, runner):
+        """通知の送信待ちテーブル（報告書と同じトランザクションで書き込み、ワーカーが送信する）を作成"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            outbox_id INTEGER PRIMARY KEY,
+            recipient TEXT NOT NULL,
+            messages TEXT NOT NULL,
+            report_ids TEXT,
+            retry_key TEXT NOT NULL UNIQUE,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at TEXT,
+            sent_at TEXT
+        )
+        ''')
+        self.cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox (status, next_attempt_at)'
+        )
+    
+    def _migrate_legacy_reports(self, runner):
+        """
+        旧形式の processed_reports テーブルの内容を rowid 順に少しずつ companies・holders・filings に移し、
+        最後に旧テーブルを削除する（旧形式のテーブルがない場合は何もしない）
         Args:
-            json_file_path: インポート元のJSONファイルパス
+            runner: MigrationRunner
+        """
+        self.cursor.execute("SELECT type FROM sqlite_master WHERE name = 'processed_reports'")
+        row = self.cursor.fetchone()
+        if row is None or row['type'] != 'table':
+            return
+        
+        # 古いバージョンで作成されたテーブルに不足しているカラムを補ってから移す
+        self._add_missing_columns({
+            'holding_ratio_before': 'REAL',
+            'holding_ratio_after': 'REAL',
+            'shares_held': 'TEXT',
+            'purpose': 'TEXT',
+            'file_location': "TEXT DEFAULT 'active'",
+            'importance_level': 'INTEGER DEFAULT 1',
+            'change_percentage': 'REAL',
+            'report_date_iso': 'TEXT',
+            'submission_date_iso': 'TEXT'
+        })
+        self._commit()
+        
+        def copy_batch(last_rowid, batch_size):
+            self.cursor.execute('''
+            SELECT MAX(rowid) AS last_rowid, COUNT(*) AS count FROM (
+                SELECT rowid FROM processed_reports WHERE rowid > ? ORDER BY rowid LIMIT ?
+            )
+            ''', (last_rowid or 0, batch_size))
+            batch = self.cursor.fetchone()
+            if not batch['count']:
+                return last_rowid, 0
+            
+            bounds = (last_rowid or 0, batch['last_rowid'])
+            self.cursor.execute('''
+            INSERT OR IGNORE INTO companies (security_code, name)
+            SELECT DISTINCT COALESCE(security_code, ''), COALESCE(target_company, '') FROM processed_reports
+            WHERE rowid > ? AND rowid <= ?
+            ''', bounds)
+            self.cursor.execute('''
+            INSERT OR IGNORE INTO holders (name)
+            SELECT DISTINCT COALESCE(holder_name, '') FROM processed_reports
+            WHERE rowid > ? AND rowid <= ?
+            ''', bounds)
+            self.cursor.execute(f'''
+            INSERT OR REPLACE INTO filings (report_key, report_id, company_id, holder_id, {', '.join(FILING_COLUMNS[1:])})
+            SELECT report_key(p.report_id), p.report_id, c.company_id, h.holder_id,
+                {', '.join('p.' + column for column in FILING_COLUMNS[1:])}
+            FROM processed_reports p
+            JOIN companies c ON c.security_code = COALESCE(p.security_code, '') AND c.name = COALESCE(p.target_company, '')
+            JOIN holders h ON h.name = COALESCE(p.holder_name, '')
+            WHERE p.rowid > ? AND p.rowid <= ?
+            ORDER BY p.rowid
+            ''', bounds)
+            return batch['last_rowid'], batch['count']
+        
+        count = runner.run_batches('normalize_processed_reports', copy_batch)
+        
+        # 旧テーブルを参照する全文検索インデックスは作り直す
+        self.cursor.execute('DROP TABLE IF EXISTS processed_reports_fts')
+        self.cursor.execute('DROP TABLE processed_reports')
+        logger.info(f"{count}件の報告書を正規化したテーブルに移行しました（空いた領域は run_archive_cleanup.py --full-vacuum で解放できます）")
+    
+    def _create_search_index(self):
+        """
+        対象企業名・保有者名・保有目的の全文検索インデックス（FTS5, trigram）とトリガーを作成
         Returns:
-            int: インポートした件数
+            bool: インデックスを新たに作成したかどうか
         """
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'processed_reports_fts'")
+        if self.cursor.fetchone():
+            # 一括インポートの途中で終了してトリガーが外れたままの場合は作り直し、インデックスも再構築させる
+            self.cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'processed_reports_fts_%'"
+            )
+            if self.cursor.fetchone()[0] == len(SEARCH_INDEX_TRIGGERS):
+                return False
+            self._create_search_index_triggers()
+            logger.warning("全文検索インデックスのトリガーを作り直しました")
+            return True
+        
         try:
-            if not os.path.exists(json_file_path):
-                logger.warning(f"JSONファイルが見つかりません: {json_file_path}")
-                return 0
+            # 日本語の部分一致に対応するため trigram トークナイザーを使用
+            self.cursor.execute('''
+            CREATE VIRTUAL TABLE processed_reports_fts USING fts5(
+                target_company, holder_name, purpose,
+                content='report_rows', content_rowid='filing_id', tokenize='trigram'
+            )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"全文検索インデックスを作成できません（LIKE検索を使用します）: {e}")
+            return False
+        
+        self._create_search_index_triggers()
+        logger.info("全文検索インデックスを作成しました")
+        return True
+    
+    def _create_search_index_triggers(self):
+        """
+        filings の変更に合わせて全文検索インデックスを更新するトリガーを作成
+        """
+        self.cursor.executescript(''.join(SEARCH_INDEX_TRIGGERS.values()))
+    
+    def _drop_search_index_triggers(self):
+        """全文検索インデックスを更新するトリガーを削除（一括インポート中のみ）"""
+        self.cursor.executescript(''.join(f'DROP TRIGGER IF EXISTS {name};' for name in SEARCH_INDEX_TRIGGERS))
+    
+    def _add_missing_columns(self, columns, table='processed_reports'):
+        """
+        テーブルに存在しないカラムを追加
+        Args:
+            columns: カラム名と型の辞書
+            table: テーブル名
+        Returns:
+            list: 追加したカラム名のリスト
+        """
+        self.cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row['name'] for row in self.cursor.fetchall()}
+        
+        added = []
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+                added.append(name)
+                logger.info(f"カラムを追加しました: {name}")
+        return added
+    
+    @write_transaction
+    def backfill_iso_dates(self, batch_size=1000):
+        """
+        既存レコードの和暦日付からISO日付カラムを一括で埋める
+        Args:
+            batch_size: 1トランザクションで更新する件数
+        Returns:
+            int: 更新した件数
+        """
+        try:
+            updated = self._backfill_iso_dates(MigrationRunner(self, batch_size=batch_size))
+            if updated:
+                logger.info(f"{updated}件のレコードのISO日付を補完しました")
+            return updated
+        
+        except sqlite3.Error as e:
+            logger.error(f"ISO日付の補完中にエラー: {e}")
+            self.conn.rollback()
+            return 0
+    
+    def _backfill_iso_dates(self, runner):
+        """
+        ISO日付カラムが空のレコードを filing_id 順に少しずつ埋める
+        Args:
+            runner: MigrationRunner
+        Returns:
+            int: 更新した件数
+        """
+        def fill_batch(last_filing_id, batch_size):
+            # 変換できない行があっても先に進めるよう filing_id で区切る
+            self.cursor.execute('''
+            SELECT filing_id, report_date, submission_date FROM filings
+            WHERE filing_id > ?
+            AND (report_date_iso IS NULL OR submission_date_iso IS NULL)
+            ORDER BY filing_id
+            LIMIT ?
+            ''', (last_filing_id or 0, batch_size))
+            rows = self.cursor.fetchall()
+            if not rows:
+                return last_filing_id, 0
             
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                reports = json.load(f)
+            self.cursor.executemany('''
+            UPDATE filings
+            SET report_date_iso = COALESCE(report_date_iso, ?),
+                submission_date_iso = COALESCE(submission_date_iso, ?)
+            WHERE filing_id = ?
+            ''', [
+                (wareki_to_iso(row['report_date']), wareki_to_iso(row['submission_date']), row['filing_id'])
+                for row in rows
+            ])
+            return rows[-1]['filing_id'], len(rows)
+        
+        return runner.run_batches('backfill_iso_dates', fill_batch)
+    
+    def _backfill_derived_columns(self, runner):
+        """
+        変更割合が空のレコード（変更割合・重要度レベルのカラムを追加する前の古いレコード）を
+        filing_id 順に少しずつ計算し直す
+        Args:
+            runner: MigrationRunner
+        Returns:
+            int: 更新した件数
+        """
+        def fill_batch(last_filing_id, batch_size):
+            self.cursor.execute('''
+            SELECT filing_id, report_type, holding_ratio_before, holding_ratio_after FROM filings
+            WHERE filing_id > ? AND change_percentage IS NULL
+            ORDER BY filing_id
+            LIMIT ?
+            ''', (last_filing_id or 0, batch_size))
+            rows = self.cursor.fetchall()
+            if not rows:
+                return last_filing_id, 0
             
+            self.cursor.executemany(
+                'UPDATE filings SET change_percentage = ?, importance_level = ? WHERE filing_id = ?',
+                [(*self._derived_columns(dict(row)), row['filing_id']) for row in rows]
+            )
+            return rows[-1]['filing_id'], len(rows)
+        
+        return runner.run_batches('backfill_derived_columns', fill_batch)
+    
+    def _upsert_current_holding(self, report):
+        """
+        最新保有状況テーブルを1件更新（報告義務発生日が既存以降の場合のみ上書き）
+        呼び出し元のトランザクション内で実行し、コミットは呼び出し元で行う
+        Args:
+            report: processed_reports の1行に相当する辞書
+        """
+        self._upsert_current_holdings([report])
+    
+    def _upsert_current_holdings(self, reports):
+        """
+        最新保有状況テーブルを executemany でまとめて更新（報告義務発生日が既存以降の場合のみ上書き）
+        呼び出し元のトランザクション内で実行し、コミットは呼び出し元で行う
+        Args:
+            reports: processed_reports の1行に相当する辞書のリスト（後のものほど優先）
+        """
+        self.cursor.executemany('''
+        INSERT INTO current_holdings
+        (security_code, holder_key, holder_name, target_company, holding_ratio, shares_held,
+        report_type, report_date, report_date_iso, report_id, processed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (security_code, holder_key) DO UPDATE SET
+            holder_name = excluded.holder_name,
+            target_company = excluded.target_company,
+            holding_ratio = excluded.holding_ratio,
+            shares_held = excluded.shares_held,
+            report_type = excluded.report_type,
+            report_date = excluded.report_date,
+            report_date_iso = excluded.report_date_iso,
+            report_id = excluded.report_id,
+            processed_at = excluded.processed_at
+        WHERE COALESCE(excluded.report_date_iso, '') >= COALESCE(current_holdings.report_date_iso, '')
+        ''', [self._current_holding_values(report) for report in reports])
+    
+    @write_transaction
+    def rebuild_current_holdings(self, batch_size=1000):
+        """
+        処理済み報告書の履歴から最新保有状況テーブルを作り直す
+        Args:
+            batch_size: 1回に読み込む件数
+        Returns:
+            int: 反映した報告書の件数
+        """
+        try:
+            self.cursor.execute('DELETE FROM current_holdings')
+            
+            # 報告義務発生日・処理日時の古い順に反映し、最後に反映したものが残るようにする
+            read_cursor = self.conn.cursor()
+            read_cursor.execute('''
+            SELECT * FROM processed_reports
+            ORDER BY COALESCE(report_date_iso, ''), processed_at
+            ''')
             count = 0
-            for report_id, report_data in reports.items():
-                # データを挿入
-                try:
-                    self.cursor.execute('''
-                    INSERT OR REPLACE INTO processed_reports 
-                    (report_id, processed_at, target_company, security_code, 
-                    report_type, holder_name, report_date, submission_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        report_id,
-                        report_data.get('processed_at'),
-                        report_data.get('target_company'),
-                        report_data.get('security_code'),
-                        report_data.get('report_type'),
-                        report_data.get('holder_name'),
-                        report_data.get('report_date'),
-                        report_data.get('submission_date')
-                    ))
-                    count += 1
-                except sqlite3.Error as e:
-                    logger.error(f"レコード {report_id} のインポート中にエラー: {e}")
-            
-            self.conn.commit()
-            logger.info(f"{count}件のレコードをJSONからインポートしました")
+            while True:
+                rows = read_cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    self._upsert_current_holding(dict(row))
+                count += len(rows)
+            
+            self._commit()
+            if count:
+                logger.info(f"{count}件の報告書から最新保有状況を構築しました")
             return count
+        except sqlite3.Error as e:
+            logger.error(f"最新保有状況の構築中にエラー: {e}")
+            self.conn.rollback()
+            return 0
+    
+    @write_transaction
+    def import_from_json(self, json_file_path='processed_reports.json', batch_size=IMPORT_BATCH_SIZE, progress=None):
+        """
+        JSONファイル（従来の processed_reports.json・JSON配列・NDJSON、.gz も可）からデータをインポート
+        取り込み中は全文検索インデックスのトリガーを外し、最後にインデックスをまとめて作り直す
+        （1行ごとにインデックスを更新するより大幅に速い）
+        Args:
+            json_file_path: インポート元のファイルパス
+            batch_size: 1トランザクションで書き込む件数
+            progress: コミットごとにそれまでのインポート件数を受け取る関数
+        Returns:
+            int: インポートした件数
+        """
+        if not (os.path.exists(json_file_path) and self._has_search_index()):
+            return super().import_from_json(json_file_path, batch_size, progress)
         
-        except Exception as e:
-            logger.error(f"JSONインポート中にエラー: {e}")
-            self.conn.rollback()
-            raise
+        self._drop_search_index_triggers()
+        try:
+            return super().import_from_json(json_file_path, batch_size, progress)
+        finally:
+            self._create_search_index_triggers()
+            self.rebuild_search_index()
+            # 件数が大きく変わったため、クエリプランナーの統計情報を更新する
+            self.optimize(analyze=True)
     
     def is_already_processed(self, report_id):
         """
@@ -153,83 +1443,78 @@ class ReportDatabase:
             bool: 処理済みかどうか
         """
         try:
-            self.cursor.execute('SELECT 1 FROM processed_reports WHERE report_id = ?', (report_id,))
+            self.cursor.execute(
+                'SELECT 1 FROM filings WHERE report_key = ? AND report_id = ?', (report_key(report_id), report_id)
+            )
             result = self.cursor.fetchone()
             return result is not None
         except sqlite3.Error as e:
             logger.error(f"報告書チェック中にエラー: {e}")
             return False
     
-    def mark_as_processed(self, report_info):
+    @write_transaction
+    def mark_many_as_processed(self, report_infos, notifications=None):
         """
-        報告書を処理済みとしてマーク
+        複数の報告書を1トランザクションで処理済みとしてマーク
         Args:
-            report_info: 報告書情報の辞書
+            report_infos: 報告書情報の辞書のリスト
+            notifications: 同じトランザクションで送信待ちテーブルに書き込む通知のリスト（_write_outbox を参照）
         Returns:
-            bool: 処理が成功したかどうか
+            int: 記録した件数（失敗した場合は0）
         """
+        records = [self._build_report_record(report_info) for report_info in report_infos]
+        if not records:
+            return 0
+        
         try:
-            report_id = report_info.get('report_id')
-            if not report_id:
-                # report_idがない場合は、生成ロジックに従って作成
-                security_code = report_info.get('security_code', '')
-                submission_date = report_info.get('submission_date', '')
-                report_date = report_info.get('report_date', '')
-                report_type = report_info.get('report_type', '')
-                holder_name = report_info.get('holder_name', '')
-                
-                # 日本語の日付から数字のみを抽出
-                submission_numbers = ''.join(filter(str.isdigit, submission_date))
-                report_numbers = ''.join(filter(str.isdigit, report_date))
-                
-                report_id = f"{security_code}_{submission_numbers}_{report_numbers}_{report_type}_{holder_name}"
-            
-            # 処理日時
-            processed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            # 変更割合を計算
-            change_percentage = self._calculate_change_percentage(report_info)
-            
-            # 重要度レベルを判定
-            importance_level = self._determine_importance_level(report_info, change_percentage)
-            
-            self.cursor.execute('''
-            INSERT OR REPLACE INTO processed_reports 
-            (report_id, processed_at, target_company, security_code, 
-            report_type, holder_name, report_date, submission_date,
-            holding_ratio_before, holding_ratio_after, shares_held, purpose,
-            file_location, importance_level, change_percentage)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                report_id,
-                processed_at,
-                report_info.get('target_company', '不明'),
-                report_info.get('security_code', '不明'),
-                report_info.get('report_type', '不明'),
-                report_info.get('holder_name', '不明'),
-                report_info.get('report_date', '不明'),
-                report_info.get('submission_date', '不明'),
-                self._parse_ratio(report_info.get('holding_ratio_before')),
-                self._parse_ratio(report_info.get('holding_ratio_after') or report_info.get('holding_ratio')),
-                report_info.get('shares_held', '不明'),
-                report_info.get('purpose', '不明'),
-                'active',  # 新規データは常にactive
-                importance_level,
-                change_percentage
-            ))
-            
-            self.conn.commit()
-            logger.info(f"報告書 {report_id} を処理済みとして記録しました")
-            return True
+            self._write_reports(records)
+            self._write_outbox(notifications)
+            self._commit()
+            for record in records:
+                logger.info(f"報告書 {record['report_id']} を処理済みとして記録しました")
+            return len(records)
         
         except sqlite3.Error as e:
             logger.error(f"報告書マーク中にエラー: {e}")
             self.conn.rollback()
-            return False
+            return 0
+    
+    def _write_reports(self, records):
+        """
+        報告書を executemany でまとめて記録し、同じトランザクションで最新保有状況を更新
+        （コミットは呼び出し元で行う）
+        Args:
+            records: REPORT_COLUMNS をキーとする辞書のリスト
+        """
+        # 対象企業・保有者を先に登録し、報告書からは整数IDで参照する
+        self.cursor.executemany(
+            'INSERT OR IGNORE INTO companies (security_code, name) VALUES (?, ?)',
+            {(record['security_code'] or '', record['target_company'] or '') for record in records}
+        )
+        self.cursor.executemany(
+            'INSERT OR IGNORE INTO holders (name) VALUES (?)',
+            {(record['holder_name'] or '',) for record in records}
+        )
+        
+        columns = ['report_key', 'company_id', 'holder_id'] + FILING_COLUMNS
+        values = [f':{column}' for column in ['report_key'] + FILING_COLUMNS]
+        values[1:1] = [
+            "(SELECT company_id FROM companies WHERE security_code = COALESCE(:security_code, '') "
+            "AND name = COALESCE(:target_company, ''))",
+            "(SELECT holder_id FROM holders WHERE name = COALESCE(:holder_name, ''))"
+        ]
+        self.cursor.executemany(f'''
+        INSERT INTO filings ({', '.join(columns)})
+        VALUES ({', '.join(values)})
+        ON CONFLICT (report_key) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in columns[1:])}
+        ''', [{**record, 'report_key': report_key(record['report_id'])} for record in records])
+        self._upsert_current_holdings(records)
     
     def get_all_processed_reports(self):
         """
         すべての処理済み報告書を取得
+        （件数が多い場合は iter_processed_reports を使用すること）
         Returns:
             list: 処理済み報告書のリスト
         """
@@ -241,71 +1526,100 @@ class ReportDatabase:
             logger.error(f"処理済み報告書取得中にエラー: {e}")
             return []
     
-    def export_to_json(self, json_file_path='processed_reports_export.json'):
+    def iter_processed_reports(self, batch_size=1000):
         """
-        データベースからJSONファイルにエクスポート
+        処理済み報告書を filing_id のキーセットページングで少しずつ取得するイテレーター
+        （テーブル全体をメモリに載せないため、件数によらずメモリ使用量は一定）
         Args:
-            json_file_path: エクスポート先のJSONファイルパス
-        Returns:
-            bool: エクスポートが成功したかどうか
+            batch_size: 1回のクエリで取得する件数
+        Yields:
+            dict: 処理済み報告書
         """
+        # ページングの途中で self.cursor が他のクエリに使われても影響しないよう専用のカーソルを使う
+        cursor = self.conn.cursor()
+        last_filing_id = 0
         try:
-            reports = self.get_all_processed_reports()
-            
-            # 辞書形式に変換
-            report_dict = {}
-            for report in reports:
-                report_id = report.pop('report_id')
-                report_dict[report_id] = report
-            
-            with open(json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(report_dict, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"{len(reports)}件のレコードをJSONにエクスポートしました: {json_file_path}")
-            return True
-        
-        except Exception as e:
-            logger.error(f"JSONエクスポート中にエラー: {e}")
-            return False
+            while True:
+                cursor.execute(
+                    'SELECT * FROM report_rows WHERE filing_id > ? ORDER BY filing_id LIMIT ?',
+                    (last_filing_id, batch_size)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                
+                last_filing_id = rows[-1]['filing_id']
+                for row in rows:
+                    report = dict(row)
+                    del report['filing_id']
+                    yield report
+        except sqlite3.Error as e:
+            logger.error(f"処理済み報告書のページング取得中にエラー: {e}")
+            raise
+        finally:
+            cursor.close()
     
+    @cached_query
     def search_reports(self, 
                        security_code=None, 
                        holder_name=None, 
                        report_type=None,
                        target_company=None,
-                       limit=100):
+                       limit=100,
+                       keyword=None):
         """
         条件に一致する報告書を検索
+        保有者名・対象企業名・キーワードは全文検索インデックス（trigram）で部分一致検索し、関連度順に返す
         Args:
             security_code: 証券コード
-            holder_name: 保有者名
+            holder_name: 保有者名（部分一致）
             report_type: 報告書種類
-            target_company: 対象企業名
+            target_company: 対象企業名（部分一致）
             limit: 取得する最大件数
+            keyword: 対象企業名・保有者名・保有目的のいずれかに含まれる文字列
         Returns:
             list: 一致する報告書のリスト
         """
         try:
-            query = 'SELECT * FROM processed_reports WHERE 1=1'
+            # trigramは3文字以上の語のみ検索できるため、短い語はLIKEで絞り込む
+            text_filters = [
+                (column, value)
+                for column, value in (('holder_name', holder_name), ('target_company', target_company), (None, keyword))
+                if value
+            ]
+            fts_filters = [(column, value) for column, value in text_filters if len(value) >= 3]
+            like_filters = [(column, value) for column, value in text_filters if len(value) < 3]
+            use_fts = bool(fts_filters) and self._has_search_index()
+            if not use_fts:
+                like_filters = text_filters
+            
             params = []
+            if use_fts:
+                query = f'''
+                SELECT {', '.join('p.' + column for column in REPORT_COLUMNS)} FROM processed_reports_fts f
+                JOIN report_rows p ON p.filing_id = f.rowid
+                WHERE processed_reports_fts MATCH ?
+                '''
+                params.append(' AND '.join(
+                    self._fts_phrase(value, column) for column, value in fts_filters
+                ))
+            else:
+                query = 'SELECT p.* FROM processed_reports p WHERE 1=1'
             
             if security_code:
-                query += ' AND security_code = ?'
+                query += ' AND p.security_code = ?'
                 params.append(security_code)
             
-            if holder_name:
-                query += ' AND holder_name LIKE ?'
-                params.append(f'%{holder_name}%')
-            
             if report_type:
-                query += ' AND report_type = ?'
+                query += ' AND p.report_type = ?'
                 params.append(report_type)
             
-            if target_company:
-                query += ' AND target_company LIKE ?'
-                params.append(f'%{target_company}%')
+            for column, value in like_filters:
+                columns = [column] if column else ['target_company', 'holder_name', 'purpose']
+                query += ' AND (' + ' OR '.join(f'p.{name} LIKE ?' for name in columns) + ')'
+                params.extend([f'%{value}%'] * len(columns))
             
-            query += ' ORDER BY processed_at DESC LIMIT ?'
+            query += ' ORDER BY f.rank, p.processed_at DESC LIMIT ?' if use_fts else ' ORDER BY p.processed_at DESC LIMIT ?'
             params.append(limit)
             
             self.cursor.execute(query, params)
@@ -316,6 +1630,137 @@ class ReportDatabase:
             logger.error(f"報告書検索中にエラー: {e}")
             return []
     
+    def _fts_phrase(self, value, column=None):
+        """全文検索用のフレーズ条件を作成（列の指定がない場合は全ての列が対象）"""
+        phrase = '"' + value.replace('"', '""') + '"'
+        return f'{column} : {phrase}' if column else phrase
+    
+    def _has_search_index(self):
+        """全文検索インデックスが利用可能かどうか"""
+        if not hasattr(self, '_search_index_available'):
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'processed_reports_fts'")
+            self._search_index_available = self.cursor.fetchone() is not None
+        return self._search_index_available
+    
+    @write_transaction
+    def rebuild_search_index(self):
+        """
+        全文検索インデックスを processed_reports から作り直す
+        （一括インポートでトリガーを外した後や、インデックスが壊れた場合などに使用）
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            self.cursor.execute("INSERT INTO processed_reports_fts(processed_reports_fts) VALUES ('rebuild')")
+            self._commit()
+            logger.info("全文検索インデックスを再構築しました")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"全文検索インデックスの再構築中にエラー: {e}")
+            self.conn.rollback()
+            return False
+    
+    def get_storage_stats(self):
+        """
+        データベースファイルのページ数・空きページ数などを取得
+        Returns:
+            dict: page_size, page_count, freelist_count, auto_vacuum（'none'・'full'・'incremental'）, size_mb, free_mb
+        """
+        try:
+            stats = {
+                name: self.cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('page_size', 'page_count', 'freelist_count', 'auto_vacuum')
+            }
+        except sqlite3.Error as e:
+            logger.error(f"ストレージ情報の取得中にエラー: {e}")
+            return {}
+        stats['auto_vacuum'] = {0: 'none', 1: 'full', 2: 'incremental'}.get(stats['auto_vacuum'], str(stats['auto_vacuum']))
+        stats['size_mb'] = stats['page_count'] * stats['page_size'] / (1024 * 1024)
+        stats['free_mb'] = stats['freelist_count'] * stats['page_size'] / (1024 * 1024)
+        return stats
+    
+    @write_transaction
+    def optimize(self, analyze=False):
+        """
+        クエリプランナーの統計情報を更新
+        Args:
+            analyze: True の場合は全てのテーブルを ANALYZE する（一括での追加・更新の後に使用）。
+                     False の場合は PRAGMA optimize で必要なテーブルだけを更新する
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            if analyze:
+                self.cursor.execute(f'PRAGMA analysis_limit = {SQLITE_ANALYSIS_LIMIT}')
+                self.cursor.execute('ANALYZE')
+            else:
+                self.cursor.execute('PRAGMA optimize')
+            self._commit()
+            logger.info("クエリプランナーの統計情報を更新しました")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"統計情報の更新中にエラー: {e}")
+            self.conn.rollback()
+            return False
+    
+    def incremental_vacuum(self, max_pages=INCREMENTAL_VACUUM_MAX_PAGES, step_pages=INCREMENTAL_VACUUM_STEP_PAGES):
+        """
+        空きページを step_pages ページずつ、合計 max_pages ページまでファイルから解放する
+        （1回ごとに transaction() に入ってコミットし、その都度書き込みのロックを手放すため、
+        他のスレッドの書き込みを長時間止めない。auto_vacuum=INCREMENTAL の場合のみ有効）
+        Args:
+            max_pages: 解放するページ数の上限
+            step_pages: 1トランザクションで解放するページ数
+        Returns:
+            int: 解放したページ数
+        """
+        released = 0
+        try:
+            if self.cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                logger.warning("auto_vacuum が INCREMENTAL ではないため、空きページを解放できません（vacuum() で切り替えられます）")
+                return 0
+            
+            while released < max_pages:
+                with self.transaction():
+                    free_pages = self.cursor.execute('PRAGMA freelist_count').fetchone()[0]
+                    if not free_pages:
+                        break
+                    pages = min(step_pages, max_pages - released, free_pages)
+                    try:
+                        # 結果を読み切るまで解放が進まないため fetchall() する
+                        self.cursor.execute(f'PRAGMA incremental_vacuum({pages})').fetchall()
+                        self._commit()
+                    except sqlite3.Error:
+                        self.conn.rollback()
+                        raise
+                    released += free_pages - self.cursor.execute('PRAGMA freelist_count').fetchone()[0]
+            
+            logger.info(f"{released}ページの空き領域を解放しました")
+            return released
+        except sqlite3.Error as e:
+            logger.error(f"空き領域の解放中にエラー: {e}")
+            return released
+    
+    @write_transaction
+    def vacuum(self):
+        """
+        データベースファイル全体を作り直して断片化を解消し、auto_vacuum を INCREMENTAL に切り替える
+        （ファイル全体を書き直すため、auto_vacuum が NONE の既存データベースを切り替える場合などに限って使用）
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            self._commit()
+            self.cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            self.cursor.execute('VACUUM')
+            self.manager.bump_write_version()
+            logger.info("データベースを VACUUM しました")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"VACUUM 中にエラー: {e}")
+            return False
+    
+    @cached_query
     def get_report_counts_by_type(self):
         """
         報告書種類ごとの件数を取得
@@ -330,6 +1775,7 @@ class ReportDatabase:
             logger.error(f"集計中にエラー: {e}")
             return {}
     
+    @cached_query
     def get_latest_date_reports(self):
         """
         最新の日付に提出された報告書のみを取得
@@ -337,8 +1783,8 @@ class ReportDatabase:
             list: 最新日付の報告書のリスト
         """
         try:
-            # まず最新の日付を取得
-            self.cursor.execute('SELECT MAX(submission_date) as latest_date FROM processed_reports')
+            # まず最新の日付を取得（ISO日付のインデックスを使用）
+            self.cursor.execute('SELECT MAX(submission_date_iso) as latest_date FROM processed_reports')
             result = self.cursor.fetchone()
             latest_date = result['latest_date']
             
@@ -347,7 +1793,7 @@ class ReportDatabase:
                 return []
             
             # 最新の日付にマッチする報告書を全て取得
-            self.cursor.execute('SELECT * FROM processed_reports WHERE submission_date = ? ORDER BY processed_at DESC', (latest_date,))
+            self.cursor.execute('SELECT * FROM processed_reports WHERE submission_date_iso = ? ORDER BY processed_at DESC', (latest_date,))
             rows = self.cursor.fetchall()
             latest_reports = [dict(row) for row in rows]
             
@@ -357,6 +1803,137 @@ class ReportDatabase:
             logger.error(f"最新日付報告書取得中にエラー: {e}")
             return []
     
+    @cached_query
+    def get_reports_by_date_range(self, start_date=None, end_date=None, date_field='submission_date'):
+        """
+        指定期間に含まれる報告書を取得
+        Args:
+            start_date: 開始日（YYYY-MM-DD または和暦）。未指定の場合は制限なし
+            end_date: 終了日（YYYY-MM-DD または和暦）。未指定の場合は制限なし
+            date_field: 'submission_date' または 'report_date'
+        Returns:
+            list: 期間内の報告書のリスト（日付の新しい順）
+        """
+        if date_field not in ('submission_date', 'report_date'):
+            raise ValueError(f"未対応の日付カラムです: {date_field}")
+        column = f"{date_field}_iso"
+        
+        try:
+            query = f'SELECT * FROM processed_reports WHERE {column} IS NOT NULL'
+            params = []
+            
+            if start_date:
+                query += f' AND {column} >= ?'
+                params.append(wareki_to_iso(start_date) or start_date)
+            
+            if end_date:
+                query += f' AND {column} <= ?'
+                params.append(wareki_to_iso(end_date) or end_date)
+            
+            query += f' ORDER BY {column} DESC, processed_at DESC'
+            
+            self.cursor.execute(query, params)
+            rows = self.cursor.fetchall()
+            return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"期間指定の報告書取得中にエラー: {e}")
+            return []
+    
+    def get_latest_holding_by_company_and_holder(self, security_code, holder_name):
+        """同じ銘柄・保有者の最新保有割合を取得（最新保有状況テーブルを主キーで参照）"""
+        try:
+            self.cursor.execute('''
+            SELECT * FROM current_holdings
+            WHERE security_code = ? AND holder_key = ?
+            ''', (security_code, normalize_holder_name(holder_name)))
+            
+            result = self.cursor.fetchone()
+            if result:
+                return self._build_current_holding_result(result)
+            return None
+        except sqlite3.Error as e:
+            logger.error(f"最新保有割合取得中にエラー: {e}")
+            return None
+    
+    def get_latest_holdings(self, pairs):
+        """
+        複数の銘柄・保有者の最新保有割合をまとめて取得
+        Args:
+            pairs: (証券コード, 保有者名) のタプルのリスト
+        Returns:
+            dict: (証券コード, 保有者名) をキーとした最新保有情報の辞書（履歴がない組は含まない）
+        """
+        # 正規化した保有者名で検索し、呼び出し元が渡した組に結果を対応付ける
+        requested = {}
+        for security_code, holder_name in pairs:
+            requested.setdefault((security_code, normalize_holder_name(holder_name)), []).append(
+                (security_code, holder_name)
+            )
+        keys = list(requested)
+        
+        holdings = {}
+        try:
+            for i in range(0, len(keys), HOLDING_LOOKUP_CHUNK_SIZE):
+                chunk = keys[i:i + HOLDING_LOOKUP_CHUNK_SIZE]
+                targets = ' UNION ALL '.join(['SELECT ? AS security_code, ? AS holder_key'] * len(chunk))
+                self.cursor.execute(f'''
+                SELECT h.* FROM ({targets}) targets
+                JOIN current_holdings h
+                ON h.security_code = targets.security_code AND h.holder_key = targets.holder_key
+                ''', [value for key in chunk for value in key])
+                for row in self.cursor.fetchall():
+                    result = self._build_current_holding_result(row)
+                    for pair in requested[(row['security_code'], row['holder_key'])]:
+                        holdings[pair] = result
+            return holdings
+        except sqlite3.Error as e:
+            logger.error(f"最新保有割合の一括取得中にエラー: {e}")
+            return holdings
+    
+    @cached_query
+    def get_latest_companies(self, limit=5):
+        """
+        直近に報告書が提出された対象企業名を新しい順に取得
+        Args:
+            limit: 取得する企業数
+        Returns:
+            list: 対象企業名のリスト
+        """
+        try:
+            self.cursor.execute('''
+            SELECT target_company, MAX(submission_date_iso) AS latest_date, MAX(processed_at) AS latest_processed_at
+            FROM processed_reports
+            WHERE target_company IS NOT NULL AND target_company != '不明'
+            GROUP BY target_company
+            ORDER BY latest_date DESC, latest_processed_at DESC
+            LIMIT ?
+            ''', (limit,))
+            return [row['target_company'] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"最新の対象企業一覧の取得中にエラー: {e}")
+            return []
+    
+    @cached_query
+    def get_holder_portfolio(self, holder_name):
+        """
+        保有者の現在の保有銘柄一覧を取得
+        Args:
+            holder_name: 保有者名
+        Returns:
+            list: 銘柄ごとの最新保有状況のリスト（保有割合の高い順）
+        """
+        try:
+            self.cursor.execute('''
+            SELECT * FROM current_holdings
+            WHERE holder_key = ?
+            ORDER BY holding_ratio DESC
+            ''', (normalize_holder_name(holder_name),))
+            return [dict(row) for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"保有銘柄一覧の取得中にエラー: {e}")
+            return []
+    
+    @write_transaction
     def archive_old_files(self, retention_days=90):
         """古いファイルをアーカイブ対象としてマーク"""
         try:
@@ -364,7 +1941,7 @@ class ReportDatabase:
             
             # 重要度レベルに応じて保持期間を調整
             self.cursor.execute('''
-            UPDATE processed_reports 
+            UPDATE filings 
             SET file_location = 'archived'
             WHERE processed_at < ? 
             AND file_location = 'active'
@@ -374,14 +1951,14 @@ class ReportDatabase:
             # 高重要度データはより長く保持
             high_importance_cutoff = (datetime.now() - timedelta(days=retention_days * 2)).strftime('%Y-%m-%d %H:%M:%S')
             self.cursor.execute('''
-            UPDATE processed_reports 
+            UPDATE filings 
             SET file_location = 'archived'
             WHERE processed_at < ? 
             AND file_location = 'active'
             AND importance_level >= 2
             ''', (high_importance_cutoff,))
             
-            self.conn.commit()
+            self._commit()
             
             # アーカイブ対象の件数を取得
             self.cursor.execute("SELECT COUNT(*) FROM processed_reports WHERE file_location = 'archived'")
@@ -397,76 +1974,403 @@ class ReportDatabase:
 
 
 # MySQL版のReportDatabaseクラス
-class MySQLReportDatabase:
-    def __init__(self, config=None):
+class MySQLReportDatabase(BaseReportDatabase):
+    placeholder = '%s'
+    
+    def __init__(self, config=None, pool_size=None):
+        """
+        MySQL データベース接続の初期化
+        接続はプロセス内で共有する接続プールから取得し、close() でプールに返却する
+        Args:
+            config: MySQLの接続設定辞書。未指定の場合は環境変数から取得
+            pool_size: 接続プールの大きさ（省略時は環境変数 MYSQL_POOL_SIZE）
+        """
+        if not MYSQL_AVAILABLE:
+            raise ImportError("mysql-connector-python パッケージがインストールされていません")
+        
+        # デフォルト設定（環境変数から取得）
+        self.config = config or {
+            'host': os.environ.get('MYSQLHOST', 'interchange.proxy.rlwy.net'),
+            'port': int(os.environ.get('MYSQLPORT', 3306)),
+            'user': os.environ.get('MYSQLUSER', 'root'),
+            'password': os.environ.get('MYSQLPASSWORD', 'TxoQDfJztZKuSREAmupOuZTCijlZFxFQ'),
+            'database': os.environ.get('MYSQLDATABASE', 'railway'),
+            'connection_timeout': 30,
+            'buffered': True
+        }
+        self.manager = MySQLPoolManager.for_config(self.config, pool_size)
+        if self.manager.query_cache is None:
+            self.manager.query_cache = QueryCache(ttl=MYSQL_QUERY_CACHE_TTL)
+        
+        self.conn = None
+        self.cursor = None
+        self.connect()
+        
+        # テーブル作成はプロセスごとに1回だけ行う
+        self.manager.ensure_schema(self.create_tables)
+    
+    def connect(self):
+        """接続プールから接続を取得"""
+        if self.conn is not None:
+            return
+        try:
+            self.conn = self.manager.get_connection()
+            self.cursor = self.conn.cursor(dictionary=True)
+        except mysql.connector.Error as e:
+            logger.error(f"MySQLデータベース接続エラー: {e}")
+            raise
+    
+    def close(self):
+        """接続をプールに返却"""
+        if self.conn is not None:
+            self.cursor.close()
+            self.conn.close()
+            self.conn = None
+            self.cursor = None
+            logger.info("MySQLデータベース接続をプールに返却しました")
+    
+    def _fetchall(self, query, params=()):
+        """クエリを実行し、SQLite版と同じ型に揃えた辞書のリストを返す"""
+        self.cursor.execute(query, params)
+        return [_normalize_mysql_row(row) for row in self.cursor.fetchall()]
+    
+    def _fetchone(self, query, params=()):
+        """クエリを実行し、SQLite版と同じ型に揃えた辞書を1件返す（該当なしは None）"""
+        self.cursor.execute(query, params)
+        row = self.cursor.fetchone()
+        return _normalize_mysql_row(row) if row else None
+    
+    def create_tables(self):
+        """必要なテーブルを作成（SQLite版と同じカラム・インデックス構成）"""
+        try:
+            # 報告書テーブルの作成
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS processed_reports (
+                report_id VARCHAR(255) PRIMARY KEY,
+                processed_at VARCHAR(255),
+                target_company VARCHAR(255),
+                security_code VARCHAR(50),
+                report_type VARCHAR(255),
+                holder_name VARCHAR(255),
+                report_date VARCHAR(255),
+                submission_date VARCHAR(255),
+                holding_ratio_before DOUBLE,
+                holding_ratio_after DOUBLE,
+                shares_held VARCHAR(255),
+                purpose TEXT,
+                file_location VARCHAR(20) DEFAULT 'active',
+                importance_level INT DEFAULT 1,
+                change_percentage DOUBLE,
+                report_date_iso DATE,
+                submission_date_iso DATE,
+                INDEX idx_security_code (security_code),
+                INDEX idx_holder_name (holder_name),
+                INDEX idx_report_type (report_type),
+                INDEX idx_report_date_iso (report_date_iso),
+                INDEX idx_submission_date_iso (submission_date_iso),
+                INDEX idx_company_holder_processed (security_code, holder_name, processed_at)
+            ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+            ''')
+            
+            # 銘柄・保有者ごとの最新保有状況テーブルの作成
+            # （正規化した保有者名をそのまま照合するため、キーはバイナリ照合順序にする）
+            self.cursor.execute('''
+            SELECT 1 FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'current_holdings'
+            ''')
+            current_holdings_exists = self.cursor.fetchone() is not None
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS current_holdings (
+                security_code VARCHAR(50) NOT NULL,
+                holder_key VARCHAR(255) NOT NULL,
+                holder_name VARCHAR(255),
+                target_company VARCHAR(255),
+                holding_ratio DOUBLE,
+                shares_held VARCHAR(255),
+                report_type VARCHAR(255),
+                report_date VARCHAR(255),
+                report_date_iso DATE,
+                report_id VARCHAR(255),
+                processed_at VARCHAR(255),
+                PRIMARY KEY (security_code, holder_key),
+                INDEX idx_current_holdings_holder (holder_key)
+            ) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin
+            ''')
+            
+            self._commit()
+            
+            # 既存のデータベースへのカラムの追加・既存レコードの補完などを未適用のものだけ順に行う
+            self.migrate()
+            logger.info("MySQLテーブルの作成が完了しました")
+            
+            # 最新保有状況テーブルを新たに作成した場合は履歴から構築する
+            if not current_holdings_exists:
+                self.rebuild_current_holdings()
+        except mysql.connector.Error as e:
+            logger.error(f"MySQLテーブル作成エラー: {e}")
+            self.conn.rollback()
+            raise
+    
+    def _migrations(self):
+        """MySQL版のスキーママイグレーション（適用順）"""
+        return [
+            Migration(1, 'add_report_columns', self._add_report_columns),
+            Migration(2, 'backfill_iso_dates', self._backfill_iso_dates),
+            Migration(3, 'backfill_derived_columns', self._backfill_derived_columns),
+            Migration(4, 'create_notification_outbox', self._create_notification_outbox),
+            Migration(5, 'create_subscribers', self._create_subscribers),
+        ]
+    
+    def _create_subscribers(self, runner):
+        """通知の購読者（ウォッチリスト付き）のテーブルを作成し、送信待ちテーブルにマルチキャストの送信先を追加"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subscribers (
+            user_id VARCHAR(64) PRIMARY KEY,
+            display_name VARCHAR(255),
+            security_codes TEXT NOT NULL,
+            holder_keywords TEXT NOT NULL,
+            min_importance INT NOT NULL DEFAULT 1,
+            active TINYINT NOT NULL DEFAULT 1,
+            created_at VARCHAR(32),
+            updated_at VARCHAR(32)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+        ''')
+        self._add_missing_columns('notification_outbox', {'recipients': 'MEDIUMTEXT'})
+    
+    def _create_notification_outbox(self, runner):
+        """通知の送信待ちテーブル（報告書と同じトランザクションで書き込み、ワーカーが送信する）を作成"""
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            outbox_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            recipient VARCHAR(64) NOT NULL,
+            messages MEDIUMTEXT NOT NULL,
+            report_ids TEXT,
+            retry_key CHAR(36) NOT NULL UNIQUE,
+            status VARCHAR(16) NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            next_attempt_at DOUBLE NOT NULL,
+            last_error TEXT,
+            created_at VARCHAR(32),
+            sent_at VARCHAR(32),
+            INDEX idx_notification_outbox_due (status, next_attempt_at)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+        ''')
+    
+    def _add_report_columns(self, runner):
+        """
+        古いバージョンで作成された processed_reports に不足しているカラム・インデックスを追加
+        （MySQL 8.0 ではカラムの追加はテーブルをコピーせずに行われる）
+        Args:
+            runner: MigrationRunner
+        """
+        self._add_missing_columns('processed_reports', {
+            'holding_ratio_before': 'DOUBLE',
+            'holding_ratio_after': 'DOUBLE',
+            'shares_held': 'VARCHAR(255)',
+            'purpose': 'TEXT',
+            'file_location': "VARCHAR(20) DEFAULT 'active'",
+            'importance_level': 'INT DEFAULT 1',
+            'change_percentage': 'DOUBLE',
+            'report_date_iso': 'DATE',
+            'submission_date_iso': 'DATE'
+        })
+        self._add_missing_indexes('processed_reports', {
+            'idx_report_date_iso': '(report_date_iso)',
+            'idx_submission_date_iso': '(submission_date_iso)',
+            'idx_company_holder_processed': '(security_code, holder_name, processed_at)'
+        })
+    
+    def _add_missing_columns(self, table, columns):
+        """
+        テーブルに存在しないカラムを追加
+        Args:
+            table: テーブル名
+            columns: カラム名と型の辞書
+        Returns:
+            list: 追加したカラム名のリスト
+        """
+        self.cursor.execute('''
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ''', (table,))
+        existing = {row['COLUMN_NAME'] for row in self.cursor.fetchall()}
+        
+        added = []
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+                added.append(name)
+                logger.info(f"MySQLテーブル {table} にカラム {name} を追加しました")
+        return added
+    
+    def _add_missing_indexes(self, table, indexes):
+        """
+        テーブルに存在しないインデックスを追加
+        Args:
+            table: テーブル名
+            indexes: インデックス名と対象カラムの辞書
+        """
+        self.cursor.execute('''
+        SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ''', (table,))
+        existing = {row['INDEX_NAME'] for row in self.cursor.fetchall()}
+        
+        for name, columns in indexes.items():
+            if name not in existing:
+                self.cursor.execute(f'CREATE INDEX {name} ON {table} {columns}')
+                logger.info(f"MySQLテーブル {table} にインデックス {name} を追加しました")
+    
+    def backfill_iso_dates(self, batch_size=1000):
+        """
+        既存レコードの和暦日付からISO日付カラムを一括で埋める
+        Args:
+            batch_size: 1トランザクションで更新する件数
+        Returns:
+            int: 更新した件数
+        """
+        try:
+            updated = self._backfill_iso_dates(MigrationRunner(self, batch_size=batch_size))
+            if updated:
+                logger.info(f"MySQL {updated}件のレコードのISO日付を補完しました")
+            return updated
+        
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL ISO日付の補完中にエラー: {e}")
+            self.conn.rollback()
+            return 0
+    
+    def _backfill_iso_dates(self, runner):
         """
-        MySQL データベース接続の初期化
+        ISO日付カラムが空のレコードを主キー順に少しずつ埋める
         Args:
-            config: MySQLの接続設定辞書。未指定の場合は環境変数から取得
+            runner: MigrationRunner
+        Returns:
+            int: 更新した件数
         """
-        if not MYSQL_AVAILABLE:
-            raise ImportError("mysql-connector-python パッケージがインストールされていません")
+        def fill_batch(last_report_id, batch_size):
+            # 変換できない行があっても先に進めるよう主キーで区切る
+            rows = self._fetchall('''
+            SELECT report_id, report_date, submission_date FROM processed_reports
+            WHERE report_id > %s
+            AND (report_date_iso IS NULL OR submission_date_iso IS NULL)
+            ORDER BY report_id
+            LIMIT %s
+            ''', (last_report_id or '', batch_size))
+            if not rows:
+                return last_report_id, 0
+            
+            self.cursor.executemany('''
+            UPDATE processed_reports
+            SET report_date_iso = COALESCE(report_date_iso, %s),
+                submission_date_iso = COALESCE(submission_date_iso, %s)
+            WHERE report_id = %s
+            ''', [
+                (wareki_to_iso(row['report_date']), wareki_to_iso(row['submission_date']), row['report_id'])
+                for row in rows
+            ])
+            return rows[-1]['report_id'], len(rows)
         
-        # デフォルト設定（環境変数から取得）
-        self.config = config or {
-            'host': os.environ.get('MYSQLHOST', 'interchange.proxy.rlwy.net'),
-            'port': int(os.environ.get('MYSQLPORT', 3306)),
-            'user': os.environ.get('MYSQLUSER', 'root'),
-            'password': os.environ.get('MYSQLPASSWORD', 'TxoQDfJztZKuSREAmupOuZTCijlZFxFQ'),
-            'database': os.environ.get('MYSQLDATABASE', 'railway'),
-            'connection_timeout': 30,
-            'buffered': True
-        }
+        return runner.run_batches('backfill_iso_dates', fill_batch)
+    
+    def _backfill_derived_columns(self, runner):
+        """
+        変更割合が空のレコード（変更割合・重要度レベルのカラムを追加する前の古いレコード）を
+        主キー順に少しずつ計算し直す
+        Args:
+            runner: MigrationRunner
+        Returns:
+            int: 更新した件数
+        """
+        def fill_batch(last_report_id, batch_size):
+            rows = self._fetchall('''
+            SELECT report_id, report_type, holding_ratio_before, holding_ratio_after FROM processed_reports
+            WHERE report_id > %s AND change_percentage IS NULL
+            ORDER BY report_id
+            LIMIT %s
+            ''', (last_report_id or '', batch_size))
+            if not rows:
+                return last_report_id, 0
+            
+            self.cursor.executemany(
+                'UPDATE processed_reports SET change_percentage = %s, importance_level = %s WHERE report_id = %s',
+                [(*self._derived_columns(row), row['report_id']) for row in rows]
+            )
+            return rows[-1]['report_id'], len(rows)
         
-        self.conn = None
-        self.cursor = None
-        self.connect()
-        self.create_tables()
+        return runner.run_batches('backfill_derived_columns', fill_batch)
     
-    def connect(self):
-        """データベースへの接続を確立"""
-        try:
-            self.conn = mysql.connector.connect(**self.config)
-            logger.info(f"MySQLデータベースに接続しました: {self.config['host']}:{self.config['port']}/{self.config['database']}")
-        except mysql.connector.Error as e:
-            logger.error(f"MySQLデータベース接続エラー: {e}")
-            raise
+    def _upsert_reports(self, records):
+        """
+        processed_reports に複数行の INSERT ... ON DUPLICATE KEY UPDATE で書き込む
+        呼び出し元のトランザクション内で実行し、コミットは呼び出し元で行う
+        Args:
+            records: REPORT_COLUMNS をキーとする辞書のリスト
+        """
+        row_placeholder = '(' + ', '.join(['%s'] * len(REPORT_COLUMNS)) + ')'
+        updates = ', '.join(f'{column} = VALUES({column})' for column in REPORT_COLUMNS[1:])
+        
+        for i in range(0, len(records), MYSQL_UPSERT_BATCH_SIZE):
+            chunk = records[i:i + MYSQL_UPSERT_BATCH_SIZE]
+            self.cursor.execute(f'''
+            INSERT INTO processed_reports ({', '.join(REPORT_COLUMNS)})
+            VALUES {', '.join([row_placeholder] * len(chunk))}
+            ON DUPLICATE KEY UPDATE {updates}
+            ''', [record.get(column) for record in chunk for column in REPORT_COLUMNS])
     
-    def close(self):
-        """データベース接続を閉じる"""
-        if self.conn:
-            self.conn.close()
-            logger.info("MySQLデータベース接続を閉じました")
+    def _upsert_current_holdings(self, reports):
+        """
+        最新保有状況テーブルを複数行まとめて更新（報告義務発生日が既存以降の場合のみ上書き）
+        呼び出し元のトランザクション内で実行し、コミットは呼び出し元で行う
+        Args:
+            reports: processed_reports の1行に相当する辞書のリスト
+        """
+        # 判定に使う report_date_iso は最後に更新する（それより前の代入は更新前の値を参照する）
+        is_newer = '(report_date_iso IS NULL OR VALUES(report_date_iso) >= report_date_iso)'
+        updates = ', '.join(
+            f'{column} = IF({is_newer}, VALUES({column}), {column})'
+            for column in CURRENT_HOLDING_COLUMNS[2:] if column != 'report_date_iso'
+        )
+        updates += f', report_date_iso = IF({is_newer}, VALUES(report_date_iso), report_date_iso)'
+        row_placeholder = '(' + ', '.join(['%s'] * len(CURRENT_HOLDING_COLUMNS)) + ')'
+        
+        for i in range(0, len(reports), MYSQL_UPSERT_BATCH_SIZE):
+            chunk = reports[i:i + MYSQL_UPSERT_BATCH_SIZE]
+            self.cursor.execute(f'''
+            INSERT INTO current_holdings ({', '.join(CURRENT_HOLDING_COLUMNS)})
+            VALUES {', '.join([row_placeholder] * len(chunk))}
+            ON DUPLICATE KEY UPDATE {updates}
+            ''', [value for report in chunk for value in self._current_holding_values(report)])
     
-    def create_tables(self):
-        """必要なテーブルを作成"""
+    def rebuild_current_holdings(self, batch_size=1000):
+        """
+        処理済み報告書の履歴から最新保有状況テーブルを作り直す
+        Args:
+            batch_size: 1回に読み込む件数
+        Returns:
+            int: 反映した報告書の件数
+        """
         try:
-            cursor = self.conn.cursor()
-            
-            # 報告書テーブルの作成
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS processed_reports (
-                report_id VARCHAR(255) PRIMARY KEY,
-                processed_at VARCHAR(255),
-                target_company VARCHAR(255),
-                security_code VARCHAR(50),
-                report_type VARCHAR(255),
-                holder_name VARCHAR(255),
-                report_date VARCHAR(255),
-                submission_date VARCHAR(255),
-                INDEX idx_security_code (security_code),
-                INDEX idx_holder_name (holder_name),
-                INDEX idx_report_type (report_type)
-            ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
-            ''')
+            # 銘柄・保有者ごとに報告義務発生日・処理日時の最も新しい報告書を選ぶ
+            latest = {}
+            count = 0
+            for report in self.iter_processed_reports(batch_size):
+                key = (report.get('security_code'), normalize_holder_name(report.get('holder_name')))
+                order = (report.get('report_date_iso') or '', report.get('processed_at') or '')
+                if key not in latest or order >= latest[key][0]:
+                    latest[key] = (order, report)
+                count += 1
             
-            self.conn.commit()
-            cursor.close()
-            logger.info("MySQLテーブルの作成が完了しました")
+            self.cursor.execute('DELETE FROM current_holdings')
+            self._upsert_current_holdings([report for _, report in latest.values()])
+            self._commit()
+            if count:
+                logger.info(f"MySQL {count}件の報告書から最新保有状況を構築しました")
+            return count
         except mysql.connector.Error as e:
-            logger.error(f"MySQLテーブル作成エラー: {e}")
+            logger.error(f"MySQL最新保有状況の構築中にエラー: {e}")
             self.conn.rollback()
-            raise
+            return 0
     
     def is_already_processed(self, report_id):
         """
@@ -477,107 +2381,107 @@ class MySQLReportDatabase:
             bool: 処理済みかどうか
         """
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute('SELECT 1 FROM processed_reports WHERE report_id = %s', (report_id,))
-            result = cursor.fetchone()
-            cursor.close()
-            return result is not None
+            return self._fetchone('SELECT 1 AS found FROM processed_reports WHERE report_id = %s', (report_id,)) is not None
         except mysql.connector.Error as e:
             logger.error(f"MySQL報告書チェック中にエラー: {e}")
             return False
     
-    def mark_as_processed(self, report_info):
+    def mark_many_as_processed(self, report_infos, notifications=None):
         """
-        報告書を処理済みとしてマーク
+        複数の報告書を複数行の INSERT ... ON DUPLICATE KEY UPDATE で1トランザクションに記録
         Args:
-            report_info: 報告書情報の辞書
+            report_infos: 報告書情報の辞書のリスト
+            notifications: 同じトランザクションで送信待ちテーブルに書き込む通知のリスト（_write_outbox を参照）
         Returns:
-            bool: 処理が成功したかどうか
+            int: 記録した件数（失敗した場合は0）
         """
+        records = [self._build_report_record(report_info) for report_info in report_infos]
+        if not records:
+            return 0
+        
         try:
-            report_id = report_info.get('report_id')
-            if not report_id:
-                # report_idがない場合は、生成ロジックに従って作成
-                security_code = report_info.get('security_code', '')
-                submission_date = report_info.get('submission_date', '')
-                report_date = report_info.get('report_date', '')
-                report_type = report_info.get('report_type', '')
-                holder_name = report_info.get('holder_name', '')
-                
-                # 日本語の日付から数字のみを抽出
-                submission_numbers = ''.join(filter(str.isdigit, submission_date))
-                report_numbers = ''.join(filter(str.isdigit, report_date))
-                
-                report_id = f"{security_code}_{submission_numbers}_{report_numbers}_{report_type}_{holder_name}"
-            
-            # 処理日時
-            processed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            cursor = self.conn.cursor()
-            cursor.execute('''
-            INSERT INTO processed_reports 
-            (report_id, processed_at, target_company, security_code, 
-            report_type, holder_name, report_date, submission_date)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-            processed_at = VALUES(processed_at),
-            target_company = VALUES(target_company),
-            security_code = VALUES(security_code),
-            report_type = VALUES(report_type),
-            holder_name = VALUES(holder_name),
-            report_date = VALUES(report_date),
-            submission_date = VALUES(submission_date)
-            ''', (
-                report_id,
-                processed_at,
-                report_info.get('target_company', '不明'),
-                report_info.get('security_code', '不明'),
-                report_info.get('report_type', '不明'),
-                report_info.get('holder_name', '不明'),
-                report_info.get('report_date', '不明'),
-                report_info.get('submission_date', '不明')
-            ))
-            
-            self.conn.commit()
-            cursor.close()
-            logger.info(f"MySQL報告書 {report_id} を処理済みとして記録しました")
-            return True
+            self._write_reports(records)
+            self._write_outbox(notifications)
+            self._commit()
+            for record in records:
+                logger.info(f"MySQL報告書 {record['report_id']} を処理済みとして記録しました")
+            return len(records)
         
         except mysql.connector.Error as e:
             logger.error(f"MySQL報告書マーク中にエラー: {e}")
             self.conn.rollback()
-            return False
+            return 0
+    
+    def _write_reports(self, records):
+        """
+        報告書を複数行の INSERT ... ON DUPLICATE KEY UPDATE で記録し、同じトランザクションで最新保有状況を更新
+        （コミットは呼び出し元で行う）
+        Args:
+            records: REPORT_COLUMNS をキーとする辞書のリスト
+        """
+        self._upsert_reports(records)
+        self._upsert_current_holdings(records)
     
     def get_all_processed_reports(self):
         """
         すべての処理済み報告書を取得
+        （件数が多い場合は iter_processed_reports を使用すること）
         Returns:
             list: 処理済み報告書のリスト
         """
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute('SELECT * FROM processed_reports ORDER BY processed_at DESC')
-            rows = cursor.fetchall()
-            cursor.close()
-            return rows
+            return self._fetchall('SELECT * FROM processed_reports ORDER BY processed_at DESC')
         except mysql.connector.Error as e:
             logger.error(f"MySQL処理済み報告書取得中にエラー: {e}")
             return []
     
+    def iter_processed_reports(self, batch_size=1000):
+        """
+        処理済み報告書を主キーのキーセットページングで少しずつ取得するイテレーター
+        Args:
+            batch_size: 1回のクエリで取得する件数
+        Yields:
+            dict: 処理済み報告書
+        """
+        # ページングの途中で self.cursor が他のクエリに使われても影響しないよう専用のカーソルを使う
+        cursor = self.conn.cursor(dictionary=True)
+        last_report_id = ''
+        try:
+            while True:
+                cursor.execute(
+                    'SELECT * FROM processed_reports WHERE report_id > %s ORDER BY report_id LIMIT %s',
+                    (last_report_id, batch_size)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                
+                last_report_id = rows[-1]['report_id']
+                for row in rows:
+                    yield _normalize_mysql_row(row)
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL処理済み報告書のページング取得中にエラー: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    @cached_query
     def search_reports(self, 
                        security_code=None, 
                        holder_name=None, 
                        report_type=None,
                        target_company=None,
-                       limit=100):
+                       limit=100,
+                       keyword=None):
         """
         条件に一致する報告書を検索
         Args:
             security_code: 証券コード
-            holder_name: 保有者名
+            holder_name: 保有者名（部分一致）
             report_type: 報告書種類
-            target_company: 対象企業名
+            target_company: 対象企業名（部分一致）
             limit: 取得する最大件数
+            keyword: 対象企業名・保有者名・保有目的のいずれかに含まれる文字列
         Returns:
             list: 一致する報告書のリスト
         """
@@ -601,19 +2505,96 @@ class MySQLReportDatabase:
                 query += ' AND target_company LIKE %s'
                 params.append(f'%{target_company}%')
             
+            if keyword:
+                query += ' AND (target_company LIKE %s OR holder_name LIKE %s OR purpose LIKE %s)'
+                params.extend([f'%{keyword}%'] * 3)
+            
             query += ' ORDER BY processed_at DESC LIMIT %s'
             params.append(limit)
             
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            cursor.close()
-            return rows
+            return self._fetchall(query, params)
         
         except mysql.connector.Error as e:
             logger.error(f"MySQL報告書検索中にエラー: {e}")
             return []
     
+    def rebuild_search_index(self):
+        """
+        全文検索インデックスを作り直す（MySQL版はLIKE検索のため何もしない）
+        Returns:
+            bool: 成功したかどうか
+        """
+        return True
+    
+    def get_storage_stats(self):
+        """
+        テーブルとインデックスの使用量を取得（SQLite版と同じキーで、ページは InnoDB のページ）
+        Returns:
+            dict: page_size, page_count, freelist_count, auto_vacuum（MySQL版は常に 'none'）, size_mb, free_mb
+        """
+        try:
+            page_size = self._fetchone('SELECT @@innodb_page_size AS page_size')['page_size']
+            row = self._fetchone('''
+            SELECT COALESCE(SUM(DATA_LENGTH + INDEX_LENGTH), 0) AS used, COALESCE(SUM(DATA_FREE), 0) AS free
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('processed_reports', 'current_holdings')
+            ''')
+        except mysql.connector.Error as e:
+            logger.error(f"MySQLストレージ情報の取得中にエラー: {e}")
+            return {}
+        page_size = int(page_size)
+        return {
+            'page_size': page_size,
+            'page_count': int(row['used']) // page_size,
+            'freelist_count': int(row['free']) // page_size,
+            'auto_vacuum': 'none',
+            'size_mb': int(row['used']) / (1024 * 1024),
+            'free_mb': int(row['free']) / (1024 * 1024),
+        }
+    
+    def optimize(self, analyze=False):
+        """
+        クエリプランナーの統計情報を更新（MySQL版は analyze によらず ANALYZE TABLE）
+        Args:
+            analyze: SQLite版との互換のための引数
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            self._fetchall('ANALYZE TABLE processed_reports, current_holdings')
+            logger.info("MySQL クエリプランナーの統計情報を更新しました")
+            return True
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL統計情報の更新中にエラー: {e}")
+            return False
+    
+    def incremental_vacuum(self, max_pages=INCREMENTAL_VACUUM_MAX_PAGES, step_pages=INCREMENTAL_VACUUM_STEP_PAGES):
+        """
+        空きページを少しずつ解放する（InnoDB では空き領域はテーブル内で再利用されるため何もしない）
+        Args:
+            max_pages: SQLite版との互換のための引数
+            step_pages: SQLite版との互換のための引数
+        Returns:
+            int: 解放したページ数（常に0）
+        """
+        return 0
+    
+    def vacuum(self):
+        """
+        OPTIMIZE TABLE でテーブルを作り直して断片化を解消する
+        Returns:
+            bool: 成功したかどうか
+        """
+        try:
+            self._fetchall('OPTIMIZE TABLE processed_reports, current_holdings')
+            self.manager.bump_write_version()
+            logger.info("MySQL テーブルを OPTIMIZE しました")
+            return True
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL OPTIMIZE TABLE 中にエラー: {e}")
+            return False
+    
+    @cached_query
     def get_report_counts_by_type(self):
         """
         報告書種類ごとの件数を取得
@@ -621,15 +2602,13 @@ class MySQLReportDatabase:
             dict: 報告書種類と件数の辞書
         """
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            cursor.execute('SELECT report_type, COUNT(*) as count FROM processed_reports GROUP BY report_type')
-            rows = cursor.fetchall()
-            cursor.close()
+            rows = self._fetchall('SELECT report_type, COUNT(*) as count FROM processed_reports GROUP BY report_type')
             return {row['report_type']: row['count'] for row in rows}
         except mysql.connector.Error as e:
             logger.error(f"MySQL集計中にエラー: {e}")
             return {}
     
+    @cached_query
     def get_latest_date_reports(self):
         """
         最新の日付に提出された報告書のみを取得
@@ -637,22 +2616,19 @@ class MySQLReportDatabase:
             list: 最新日付の報告書のリスト
         """
         try:
-            cursor = self.conn.cursor(dictionary=True)
-            
-            # まず最新の日付を取得
-            cursor.execute('SELECT MAX(submission_date) as latest_date FROM processed_reports')
-            result = cursor.fetchone()
+            # まず最新の日付を取得（ISO日付のインデックスを使用）
+            result = self._fetchone('SELECT MAX(submission_date_iso) as latest_date FROM processed_reports')
             latest_date = result['latest_date']
             
             if not latest_date:
                 logger.warning("データベースに報告書がありません")
-                cursor.close()
                 return []
             
             # 最新の日付にマッチする報告書を全て取得
-            cursor.execute('SELECT * FROM processed_reports WHERE submission_date = %s ORDER BY processed_at DESC', (latest_date,))
-            latest_reports = cursor.fetchall()
-            cursor.close()
+            latest_reports = self._fetchall(
+                'SELECT * FROM processed_reports WHERE submission_date_iso = %s ORDER BY processed_at DESC',
+                (latest_date,)
+            )
             
             logger.info(f"最新日付 {latest_date} の報告書が {len(latest_reports)} 件見つかりました")
             return latest_reports
@@ -660,80 +2636,177 @@ class MySQLReportDatabase:
             logger.error(f"MySQL最新日付報告書取得中にエラー: {e}")
             return []
     
-    def _parse_ratio(self, ratio_str):
-        """保有割合の文字列から数値を抽出"""
-        if not ratio_str:
-            return None
+    @cached_query
+    def get_reports_by_date_range(self, start_date=None, end_date=None, date_field='submission_date'):
+        """
+        指定期間に含まれる報告書を取得
+        Args:
+            start_date: 開始日（YYYY-MM-DD または和暦）。未指定の場合は制限なし
+            end_date: 終了日（YYYY-MM-DD または和暦）。未指定の場合は制限なし
+            date_field: 'submission_date' または 'report_date'
+        Returns:
+            list: 期間内の報告書のリスト（日付の新しい順）
+        """
+        if date_field not in ('submission_date', 'report_date'):
+            raise ValueError(f"未対応の日付カラムです: {date_field}")
+        column = f"{date_field}_iso"
+        
         try:
-            # "5.31%" -> 5.31 のように変換
-            import re
-            match = re.search(r'(\d+\.\d+|\d+)', str(ratio_str))
-            if match:
-                return float(match.group(1))
-        except (ValueError, AttributeError):
-            pass
-        return None
+            query = f'SELECT * FROM processed_reports WHERE {column} IS NOT NULL'
+            params = []
+            
+            if start_date:
+                query += f' AND {column} >= %s'
+                params.append(wareki_to_iso(start_date) or start_date)
+            
+            if end_date:
+                query += f' AND {column} <= %s'
+                params.append(wareki_to_iso(end_date) or end_date)
+            
+            query += f' ORDER BY {column} DESC, processed_at DESC'
+            
+            return self._fetchall(query, params)
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL期間指定の報告書取得中にエラー: {e}")
+            return []
     
-    def _calculate_change_percentage(self, report_info):
-        """変更割合を計算"""
-        if report_info.get('report_type') == '変更報告書':
-            before = self._parse_ratio(report_info.get('holding_ratio_before'))
-            after = self._parse_ratio(report_info.get('holding_ratio_after'))
-            if before is not None and after is not None:
-                return after - before
-        return 0.0
+    def get_latest_holding_by_company_and_holder(self, security_code, holder_name):
+        """同じ銘柄・保有者の最新保有割合を取得（最新保有状況テーブルを主キーで参照）"""
+        try:
+            result = self._fetchone('''
+            SELECT * FROM current_holdings
+            WHERE security_code = %s AND holder_key = %s
+            ''', (security_code, normalize_holder_name(holder_name)))
+            if result:
+                return self._build_current_holding_result(result)
+            return None
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL最新保有割合取得中にエラー: {e}")
+            return None
     
-    def _determine_importance_level(self, report_info, change_percentage):
-        """重要度レベルを判定"""
-        abs_change = abs(change_percentage)
-        
-        # 新規報告書の場合
-        if report_info.get('report_type') == '大量保有報告書':
-            holding_ratio = self._parse_ratio(report_info.get('holding_ratio'))
-            if holding_ratio and holding_ratio >= 10:
-                return 3  # 高重要度
-            elif holding_ratio and holding_ratio >= 5:
-                return 2  # 中重要度
-            return 1  # 低重要度
+    def get_latest_holdings(self, pairs):
+        """
+        複数の銘柄・保有者の最新保有割合をまとめて取得
+        Args:
+            pairs: (証券コード, 保有者名) のタプルのリスト
+        Returns:
+            dict: (証券コード, 保有者名) をキーとした最新保有情報の辞書（履歴がない組は含まない）
+        """
+        # 正規化した保有者名で検索し、呼び出し元が渡した組に結果を対応付ける
+        requested = {}
+        for security_code, holder_name in pairs:
+            requested.setdefault((security_code, normalize_holder_name(holder_name)), []).append(
+                (security_code, holder_name)
+            )
+        keys = list(requested)
         
-        # 変更報告書の場合
-        if abs_change >= 1.5:
-            return 3  # 高重要度
-        elif abs_change >= 0.5:
-            return 2  # 中重要度
-        return 1  # 低重要度
+        holdings = {}
+        try:
+            for i in range(0, len(keys), HOLDING_LOOKUP_CHUNK_SIZE):
+                chunk = keys[i:i + HOLDING_LOOKUP_CHUNK_SIZE]
+                targets = ' UNION ALL '.join(['SELECT %s AS security_code, %s AS holder_key'] * len(chunk))
+                rows = self._fetchall(f'''
+                SELECT h.* FROM ({targets}) targets
+                JOIN current_holdings h
+                ON h.security_code = targets.security_code AND h.holder_key = targets.holder_key
+                ''', [value for key in chunk for value in key])
+                for row in rows:
+                    result = self._build_current_holding_result(row)
+                    for pair in requested.get((row['security_code'], row['holder_key']), []):
+                        holdings[pair] = result
+            return holdings
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL最新保有割合の一括取得中にエラー: {e}")
+            return holdings
     
-    def get_latest_holding_by_company_and_holder(self, security_code, holder_name):
-        """同じ銘柄・保有者の最新保有割合を取得"""
+    @cached_query
+    def get_latest_companies(self, limit=5):
+        """
+        直近に報告書が提出された対象企業名を新しい順に取得
+        Args:
+            limit: 取得する企業数
+        Returns:
+            list: 対象企業名のリスト
+        """
+        try:
+            rows = self._fetchall('''
+            SELECT target_company, MAX(submission_date_iso) AS latest_date, MAX(processed_at) AS latest_processed_at
+            FROM processed_reports
+            WHERE target_company IS NOT NULL AND target_company != '不明'
+            GROUP BY target_company
+            ORDER BY latest_date DESC, latest_processed_at DESC
+            LIMIT %s
+            ''', (limit,))
+            return [row['target_company'] for row in rows]
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL最新の対象企業一覧の取得中にエラー: {e}")
+            return []
+    
+    @cached_query
+    def get_holder_portfolio(self, holder_name):
+        """
+        保有者の現在の保有銘柄一覧を取得
+        Args:
+            holder_name: 保有者名
+        Returns:
+            list: 銘柄ごとの最新保有状況のリスト（保有割合の高い順）
+        """
+        try:
+            return self._fetchall('''
+            SELECT * FROM current_holdings
+            WHERE holder_key = %s
+            ORDER BY holding_ratio DESC
+            ''', (normalize_holder_name(holder_name),))
+        except mysql.connector.Error as e:
+            logger.error(f"MySQL保有銘柄一覧の取得中にエラー: {e}")
+            return []
+    
+    def archive_old_files(self, retention_days=90):
+        """古いファイルをアーカイブ対象としてマーク"""
         try:
+            cutoff_date = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+            
+            # 重要度レベルに応じて保持期間を調整
+            self.cursor.execute('''
+            UPDATE processed_reports 
+            SET file_location = 'archived'
+            WHERE processed_at < %s 
+            AND file_location = 'active'
+            AND importance_level = 1
+            ''', (cutoff_date,))
+            
+            # 高重要度データはより長く保持
+            high_importance_cutoff = (datetime.now() - timedelta(days=retention_days * 2)).strftime('%Y-%m-%d %H:%M:%S')
             self.cursor.execute('''
-            SELECT holding_ratio_after, holding_ratio_before, report_type, processed_at
-            FROM processed_reports 
-            WHERE security_code = ? AND holder_name = ?
-            ORDER BY processed_at DESC 
-            LIMIT 1
-            ''', (security_code, holder_name))
+            UPDATE processed_reports 
+            SET file_location = 'archived'
+            WHERE processed_at < %s 
+            AND file_location = 'active'
+            AND importance_level >= 2
+            ''', (high_importance_cutoff,))
             
-            result = self.cursor.fetchone()
-            if result:
-                row_dict = dict(result)
-                # 最新の保有割合を返す（変更報告書なら変更後、新規なら変更後または変更前）
-                latest_ratio = row_dict['holding_ratio_after'] or row_dict['holding_ratio_before']
-                return {
-                    'latest_ratio': latest_ratio,
-                    'report_type': row_dict['report_type'],
-                    'processed_at': row_dict['processed_at']
-                }
-            return None
-        except sqlite3.Error as e:
-            logger.error(f"最新保有割合取得中にエラー: {e}")
-            return None
+            self._commit()
+            
+            # アーカイブ対象の件数を取得
+            archived_count = self._fetchone(
+                "SELECT COUNT(*) AS count FROM processed_reports WHERE file_location = 'archived'"
+            )['count']
+            
+            logger.info(f"MySQL {archived_count}件のレコードをアーカイブ対象としてマークしました")
+            return archived_count
+            
+        except mysql.connector.Error as e:
+            logger.error(f"MySQLアーカイブマーク中にエラー: {e}")
+            self.conn.rollback()
+            return 0
 
 
 # 環境変数に基づいてデータベース選択
-def get_database():
+def get_database(read_only=False):
     """
     環境に応じた適切なデータベースインスタンスを返す
+    Args:
+        read_only: 読み取り専用の接続を使用するかどうか（SQLite版のみ）
     Returns:
         ReportDatabase または MySQLReportDatabase: データベースインスタンス
     """
@@ -745,7 +2818,22 @@ def get_database():
         except Exception as e:
             logger.error(f"MySQLデータベース初期化エラー: {e}、SQLiteにフォールバックします")
     
-    return ReportDatabase()
+    return ReportDatabase(read_only=read_only)
+
+
+def get_latest_companies_by_date(limit=5):
+    """
+    直近に報告書が提出された対象企業名を新しい順に取得（Webhook用）
+    Args:
+        limit: 取得する企業数
+    Returns:
+        list: 対象企業名のリスト
+    """
+    db = get_database(read_only=True)
+    try:
+        return db.get_latest_companies(limit)
+    finally:
+        db.close()
 
 
 # 使用例
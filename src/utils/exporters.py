@@ -0,0 +1,158 @@
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import chain
+
+# 拡張子とエクスポート形式の対応表
+EXPORT_FORMATS = {
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv',
+    '.json': 'json',
+}
+
+# まとめて書き込む行数
+WRITE_CHUNK_SIZE = 1000
+
+
+def detect_format(file_path, compress=None):
+    """
+    ファイルパスの拡張子からエクスポート形式と圧縮の有無を判定
+    Args:
+        file_path: エクスポート先のファイルパス
+        compress: gzip圧縮するかどうか（None の場合は拡張子が .gz かどうかで判定）
+    Returns:
+        tuple: (エクスポート形式, gzip圧縮するかどうか)
+    """
+    name = os.fspath(file_path)
+    is_gzip = name.endswith('.gz')
+    if is_gzip:
+        name = name[:-3]
+    fmt = EXPORT_FORMATS.get(os.path.splitext(name)[1].lower(), 'ndjson')
+    return fmt, is_gzip if compress is None else compress
+
+
+def open_export_file(file_path, compress=False):
+    """
+    エクスポート先のファイルをテキストモードで開く
+    Args:
+        file_path: エクスポート先のファイルパス
+        compress: gzip圧縮するかどうか
+    Returns:
+        file: 書き込み用のファイルオブジェクト
+    """
+    if compress:
+        return gzip.open(file_path, 'wt', encoding='utf-8', newline='')
+    return open(file_path, 'w', encoding='utf-8', newline='')
+
+
+def _write_chunked(f, lines):
+    """文字列のイテレーターを一定行数ずつまとめて書き込み、書き込んだ行数を返す"""
+    count = 0
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= WRITE_CHUNK_SIZE:
+            f.write(''.join(chunk))
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        f.write(''.join(chunk))
+        count += len(chunk)
+    return count
+
+
+def write_ndjson(rows, f):
+    """
+    1行に1件のJSONを書き出す（NDJSON形式）
+    Args:
+        rows: 報告書の辞書のイテレーター
+        f: 書き込み用のファイルオブジェクト
+    Returns:
+        int: 書き込んだ件数
+    """
+    return _write_chunked(f, (json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+
+
+def write_csv(rows, f):
+    """
+    CSV形式で書き出す（列は最初の1件のキーの順）
+    Args:
+        rows: 報告書の辞書のイテレーター
+        f: 書き込み用のファイルオブジェクト
+    Returns:
+        int: 書き込んだ件数
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(first), extrasaction='ignore')
+    writer.writeheader()
+    f.write(buffer.getvalue())
+
+    def lines():
+        for row in chain([first], rows):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
+
+    return _write_chunked(f, lines())
+
+
+def write_json(rows, f, key='report_id'):
+    """
+    報告書IDをキーとする整形済みJSONオブジェクトを1件ずつ書き出す
+    （json.dump(..., indent=2) で全体を書き出した場合と同じ内容になる）
+    Args:
+        rows: 報告書の辞書のイテレーター
+        f: 書き込み用のファイルオブジェクト
+        key: オブジェクトのキーにする列名
+    Returns:
+        int: 書き込んだ件数
+    """
+    def lines():
+        separator = '{\n  '
+        for row in rows:
+            row = dict(row)
+            report_id = row.pop(key)
+            # 入れ子になる分だけインデントを深くする（文字列中の改行はエスケープ済み）
+            body = json.dumps(row, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            yield f"{separator}{json.dumps(report_id, ensure_ascii=False)}: {body}"
+            separator = ',\n  '
+
+    count = _write_chunked(f, lines())
+    f.write('\n}' if count else '{}')
+    return count
+
+
+WRITERS = {
+    'ndjson': write_ndjson,
+    'csv': write_csv,
+    'json': write_json,
+}
+
+
+def export_rows(rows, file_path, fmt=None, compress=None):
+    """
+    報告書のイテレーターをストリーミングでファイルに書き出す
+    Args:
+        rows: 報告書の辞書のイテレーター
+        file_path: エクスポート先のファイルパス
+        fmt: 'ndjson'・'csv'・'json' のいずれか（省略時は拡張子から判定）
+        compress: gzip圧縮するかどうか（省略時は拡張子が .gz かどうかで判定）
+    Returns:
+        int: 書き込んだ件数
+    """
+    detected_fmt, compress = detect_format(file_path, compress)
+    fmt = fmt or detected_fmt
+    if fmt not in WRITERS:
+        raise ValueError(f"未対応のエクスポート形式です: {fmt}")
+
+    with open_export_file(file_path, compress) as f:
+        return WRITERS[fmt](rows, f)
@@ -0,0 +1,149 @@
+import gzip
+import json
+
+from .exporters import detect_format
+
+# 1回に読み込む文字数
+READ_CHUNK_SIZE = 1 << 20
+
+# 読み込み済みのバッファをこの文字数を超えたら切り詰める
+_BUFFER_TRIM_SIZE = 1 << 22
+
+_WHITESPACE = ' \t\r\n'
+
+
+def open_import_file(file_path, compress=False):
+    """
+    インポート元のファイルをテキストモードで開く
+    Args:
+        file_path: インポート元のファイルパス
+        compress: gzip圧縮されているかどうか
+    Returns:
+        file: 読み込み用のファイルオブジェクト
+    """
+    if compress:
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    return open(file_path, 'r', encoding='utf-8')
+
+
+def iter_ndjson(f):
+    """
+    1行に1件のJSON（NDJSON形式）を順に読み込む
+    Args:
+        f: 読み込み用のファイルオブジェクト
+    Yields:
+        dict: 報告書（report_id を含む）
+    """
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{line_number}行目のJSONを解析できません: {e}") from e
+
+
+class _StreamingJSONReader:
+    """ファイルを少しずつ読みながら、JSONの値を先頭から1つずつ解析する"""
+
+    def __init__(self, f, read_size=READ_CHUNK_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """続きを読み込む（読み込めなかった場合は False）"""
+        if self.eof:
+            return False
+        if self.pos > _BUFFER_TRIM_SIZE:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """空白を読み飛ばして次の1文字を返す（ファイルの終わりでは空文字）"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        """次の1文字が chars のいずれかであることを確認して読み進め、その文字を返す"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"JSONの形式が正しくありません: {chars!r} が必要な位置に {char!r} があります")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """次のJSONの値を1つ解析して返す"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # 値がバッファの途中で切れている場合は続きを読んでやり直す
+                if self._fill():
+                    continue
+                raise
+            # 数値などバッファの末尾で終わった値は、続きがある可能性があるため読み足して確かめる
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json(f, read_size=READ_CHUNK_SIZE):
+    """
+    報告書IDをキーとするJSONオブジェクト（従来の processed_reports.json）または
+    報告書の配列を、ファイル全体を読み込まずに1件ずつ読み込む
+    Args:
+        f: 読み込み用のファイルオブジェクト
+        read_size: 1回に読み込む文字数
+    Yields:
+        dict: 報告書（report_id を含む）
+    """
+    reader = _StreamingJSONReader(f, read_size)
+    opening = reader.expect('{[')
+    closing = '}' if opening == '{' else ']'
+
+    if reader.peek() == closing:
+        return
+    while True:
+        if opening == '{':
+            report_id = reader.value()
+            reader.expect(':')
+            yield {**reader.value(), 'report_id': report_id}
+        else:
+            yield reader.value()
+        if reader.expect(',' + closing) == closing:
+            return
+
+
+def iter_import_records(file_path, fmt=None, compress=None):
+    """
+    インポート元のファイルから報告書を1件ずつ読み込む
+    Args:
+        file_path: インポート元のファイルパス（末尾が .gz の場合はgzip圧縮として読む）
+        fmt: 'json' または 'ndjson'（None の場合は拡張子から判定）
+        compress: gzip圧縮されているかどうか（None の場合は拡張子から判定）
+    Yields:
+        dict: 報告書（report_id を含む）
+    """
+    detected_fmt, compress = detect_format(file_path, compress)
+    fmt = fmt or detected_fmt
+    readers = {'json': iter_json, 'ndjson': iter_ndjson}
+    if fmt not in readers:
+        raise ValueError(f"インポートできない形式です: {fmt}")
+
+    with open_import_file(file_path, compress) as f:
+        yield from readers[fmt](f)
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger('edinet_parser')
+
+# ジャーナルの行数がこの件数に達したらスナップショットに統合する
+JOURNAL_COMPACT_EVERY = int(os.getenv('PROCESSED_JOURNAL_COMPACT_EVERY', 1000))
+
+
+class ProcessedReportJournal:
+    """
+    データベースを使えない場合に処理済み報告書を記録する追記専用のジャーナル
+    記録は processed_reports.jsonl に1件1行で追記し（1件あたり O(1)）、一定件数ごとに
+    従来形式の processed_reports.json（スナップショット）へ統合する
+    """
+
+    def __init__(self, snapshot_path, compact_every=JOURNAL_COMPACT_EVERY, fsync=True):
+        """
+        初期化
+        Args:
+            snapshot_path: スナップショット（従来の processed_reports.json）のパス
+            compact_every: スナップショットに統合するジャーナルの行数
+            fsync: 追記のたびにディスクへの書き込みを待つかどうか
+        """
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix('.jsonl')
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.records = {}
+        self._journal_lines = 0
+        self._journal_file = None
+
+    def load(self):
+        """
+        スナップショットを読み込み、ジャーナルの記録を順に適用する
+        （書き込み途中で終了した最後の行などの壊れた行は読み飛ばす）
+        Returns:
+            dict: 報告書IDと処理済み情報の辞書
+        """
+        self.records = {}
+        if self.snapshot_path.exists():
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    self.records = json.load(f)
+            except json.JSONDecodeError:
+                logger.error(f"処理済み報告書ファイルの読み込みエラー: {self.snapshot_path}")
+        else:
+            logger.info(f"処理済み報告書ファイルが見つかりません。新規作成します: {self.snapshot_path}")
+
+        self._journal_lines = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        report_id = entry.pop('report_id')
+                    except (json.JSONDecodeError, KeyError, AttributeError):
+                        logger.warning(f"ジャーナルの壊れた行を読み飛ばします: {self.journal_path}:{line_number}")
+                        continue
+                    self.records[report_id] = entry
+                    self._journal_lines += 1
+
+        return self.records
+
+    def __contains__(self, report_id):
+        return report_id in self.records
+
+    def append(self, report_id, record):
+        """
+        処理済み報告書を1件ジャーナルに追記
+        Args:
+            report_id: 報告書ID
+            record: 処理済み情報の辞書
+        """
+        if self._journal_file is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+            # 書き込み途中で終了した行に続けて書かないよう、改行で終わっていなければ改行を補う
+            if self._journal_file.tell() > 0:
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        self._journal_file.write('\n')
+
+        self._journal_file.write(json.dumps({'report_id': report_id, **record}, ensure_ascii=False) + '\n')
+        self._journal_file.flush()
+        if self.fsync:
+            os.fsync(self._journal_file.fileno())
+
+        self.records[report_id] = record
+        self._journal_lines += 1
+        if self._journal_lines >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        メモリ上の記録をスナップショットに書き出し、ジャーナルを空にする
+        （一時ファイルに書いてから置き換えるため、途中で終了してもスナップショットは壊れない）
+        """
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # 置き換え後に終了した場合も、残ったジャーナルは次回の読み込み時に同じ内容として適用される
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        open(self.journal_path, 'w', encoding='utf-8').close()
+        self._journal_lines = 0
+        logger.info(f"処理済み報告書情報を保存しました: {self.snapshot_path}")
+
+    def close(self):
+        """未統合のジャーナルがあればスナップショットに統合して閉じる"""
+        if self._journal_lines:
+            self.compact()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
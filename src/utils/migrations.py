@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+logger = logging.getLogger('edinet_db')
+
+# バックフィルで1トランザクションに処理する件数
+MIGRATION_BATCH_SIZE = int(os.getenv('MIGRATION_BATCH_SIZE', 1000))
+
+# バックフィルのバッチ間で待つ秒数（稼働中のデータベースで他の書き込みに順番を譲るため）
+MIGRATION_BATCH_PAUSE = float(os.getenv('MIGRATION_BATCH_PAUSE', 0))
+
+# version: 適用順の番号, name: 名前, apply: MigrationRunner を受け取って変更を行う関数
+Migration = namedtuple('Migration', ['version', 'name', 'apply'])
+
+
+class MigrationRunner:
+    """
+    バージョン付きのスキーママイグレーションを順に適用する（SQLite版・MySQL版で共通）
+    適用済みのバージョンは schema_migrations に、バックフィルの進捗は migration_checkpoints に記録し、
+    途中で終了しても次回は続きから再開する
+    """
+
+    def __init__(self, db, migrations=(), batch_size=MIGRATION_BATCH_SIZE, pause=MIGRATION_BATCH_PAUSE):
+        """
+        初期化
+        Args:
+            db: ReportDatabase または MySQLReportDatabase
+            migrations: Migration のリスト
+            batch_size: バックフィルで1トランザクションに処理する件数
+            pause: バックフィルのバッチ間で待つ秒数
+        """
+        self.db = db
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.batch_size = batch_size
+        self.pause = pause
+        self.placeholder = db.placeholder
+
+    def _execute(self, sql, params=()):
+        self.db.cursor.execute(sql.format(p=self.placeholder), params)
+        return self.db.cursor
+
+    def ensure_tables(self):
+        """マイグレーションの管理テーブルを作成"""
+        self._execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at VARCHAR(32)
+        )
+        ''')
+        self._execute('''
+        CREATE TABLE IF NOT EXISTS migration_checkpoints (
+            name VARCHAR(191) PRIMARY KEY,
+            last_key TEXT,
+            processed INTEGER NOT NULL DEFAULT 0,
+            updated_at VARCHAR(32)
+        )
+        ''')
+
+    def applied_versions(self):
+        """
+        適用済みのバージョンを取得
+        Returns:
+            set: バージョン番号の集合
+        """
+        return {row['version'] for row in self._execute('SELECT version FROM schema_migrations').fetchall()}
+
+    def pending(self):
+        """
+        未適用のマイグレーションを取得
+        Returns:
+            list: 適用順の Migration のリスト
+        """
+        applied = self.applied_versions()
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def run(self):
+        """
+        未適用のマイグレーションを順に適用（1つ適用するごとにバージョンを記録してコミット）
+        Returns:
+            list: 適用したマイグレーション名のリスト
+        """
+        self.ensure_tables()
+        self.db._commit()
+
+        applied = []
+        for migration in self.pending():
+            started = time.monotonic()
+            logger.info(f"マイグレーション {migration.version}: {migration.name} を適用します")
+            try:
+                migration.apply(self)
+                self._execute(
+                    'INSERT INTO schema_migrations (version, name, applied_at) VALUES ({p}, {p}, {p})',
+                    (migration.version, migration.name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                )
+                self.db._commit()
+            except Exception as e:
+                logger.error(f"マイグレーション {migration.version}: {migration.name} の適用中にエラー: {e}")
+                self.db.conn.rollback()
+                raise
+            applied.append(migration.name)
+            logger.info(
+                f"マイグレーション {migration.version}: {migration.name} を適用しました"
+                f"（{time.monotonic() - started:.1f}秒）"
+            )
+        return applied
+
+    def load_checkpoint(self, name):
+        """
+        バックフィルの進捗を取得
+        Args:
+            name: バックフィルの名前
+        Returns:
+            tuple: (最後に処理したキー, 処理済み件数)。記録がない場合は (None, 0)
+        """
+        row = self._execute(
+            'SELECT last_key, processed FROM migration_checkpoints WHERE name = {p}', (name,)
+        ).fetchone()
+        if row is None:
+            return None, 0
+        return json.loads(row['last_key']), row['processed']
+
+    def save_checkpoint(self, name, last_key, processed):
+        """バックフィルの進捗を記録（コミットは呼び出し元で行う）"""
+        self._execute(
+            'REPLACE INTO migration_checkpoints (name, last_key, processed, updated_at) VALUES ({p}, {p}, {p}, {p})',
+            (name, json.dumps(last_key, ensure_ascii=False), processed, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        )
+
+    def run_batches(self, name, step):
+        """
+        キーの順に少しずつ処理するバックフィルを、1バッチ1トランザクションで最後まで実行
+        バッチごとに進捗を同じトランザクションで記録するため、途中で終了しても続きから再開できる
+        Args:
+            name: バックフィルの名前（進捗の記録に使用）
+            step: (前回の最後のキー, 件数) を受け取り、1バッチ分を処理して (最後のキー, 処理件数) を返す関数
+                  （最初の呼び出しではキーは None。処理件数が0になったら終了）
+        Returns:
+            int: 処理した件数（再開前の分を含む）
+        """
+        self.ensure_tables()
+        last_key, processed = self.load_checkpoint(name)
+        if processed:
+            logger.info(f"{name}: 前回の続き（{processed}件処理済み）から再開します")
+
+        started = time.monotonic()
+        while True:
+            next_key, count = step(last_key, self.batch_size)
+            if not count:
+                break
+            last_key = next_key
+            processed += count
+            self.save_checkpoint(name, last_key, processed)
+            self.db._commit()
+            logger.info(f"{name}: {processed}件処理済み（{time.monotonic() - started:.1f}秒）")
+            if self.pause:
+                time.sleep(self.pause)
+
+        self._execute('DELETE FROM migration_checkpoints WHERE name = {p}', (name,))
+        self.db._commit()
+        return processed
@@ -0,0 +1,124 @@
+import logging
+import os
+import threading
+import time
+
+# MySQL接続用のインポート（オプション）
+try:
+    import mysql.connector
+    from mysql.connector import pooling
+    MYSQL_AVAILABLE = True
+except ImportError:
+    MYSQL_AVAILABLE = False
+
+logger = logging.getLogger('edinet_db')
+
+# 接続プールの大きさ（mysql-connector の上限は32）
+MYSQL_POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', 8))
+
+# プールが空の場合に接続の返却を待つ最大秒数
+MYSQL_POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', 10))
+
+
+class MySQLPoolManager:
+    """
+    MySQLの接続プールをプロセス内で共有する管理クラス
+    接続先（ホスト・ポート・データベース・ユーザー）ごとにプールを1つだけ作成する
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_config(cls, config, pool_size=None):
+        """
+        接続設定ごとの管理インスタンスを取得
+        Args:
+            config: MySQLの接続設定辞書
+            pool_size: プールの大きさ（省略時は MYSQL_POOL_SIZE）
+        Returns:
+            MySQLPoolManager: 管理インスタンス
+        """
+        key = (config.get('host'), config.get('port'), config.get('database'), config.get('user'))
+        with cls._instances_lock:
+            manager = cls._instances.get(key)
+            # fork後の子プロセスでは親のプールを引き継がずに作り直す
+            if manager is None or manager.pid != os.getpid():
+                manager = cls(config, pool_size or MYSQL_POOL_SIZE)
+                cls._instances[key] = manager
+            return manager
+
+    def __init__(self, config, pool_size=MYSQL_POOL_SIZE):
+        """
+        初期化
+        Args:
+            config: MySQLの接続設定辞書
+            pool_size: プールの大きさ
+        """
+        if not MYSQL_AVAILABLE:
+            raise ImportError("mysql-connector-python パッケージがインストールされていません")
+
+        self.config = config
+        self.pid = os.getpid()
+        self.schema_ready = False
+        self.query_cache = None
+        self.write_version = 0
+        self._version_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self.pool = pooling.MySQLConnectionPool(
+            pool_name=f"edinet_{self.pid}_{id(self)}",
+            pool_size=min(pool_size, pooling.CNX_POOL_MAXSIZE),
+            pool_reset_session=True,
+            **config
+        )
+        logger.info(
+            f"MySQLの接続プールを作成しました: {config.get('host')}:{config.get('port')}/{config.get('database')} "
+            f"(pool_size={self.pool.pool_size})"
+        )
+
+    def ensure_schema(self, create_tables):
+        """
+        テーブルの作成をプロセス内で最初の1回だけ行う
+        複数のスレッドが同時に呼び出した場合は、最初のスレッドが作成し終えるまで他のスレッドを待たせる
+        Args:
+            create_tables: テーブルを作成する関数
+        """
+        if self.schema_ready:
+            return
+        with self._schema_lock:
+            if not self.schema_ready:
+                create_tables()
+                self.schema_ready = True
+
+    def bump_write_version(self):
+        """このプロセスからの書き込みをコミットしたときにデータのバージョンを進める"""
+        with self._version_lock:
+            self.write_version += 1
+
+    def data_version(self):
+        """
+        データが変更されたかどうかを判定するためのバージョンを取得
+        （MySQLには PRAGMA data_version に相当するものがないため、このプロセスの書き込み回数のみ）
+        Returns:
+            tuple: (書き込み回数,)
+        """
+        return (self.write_version,)
+
+    def get_connection(self, timeout=MYSQL_POOL_TIMEOUT):
+        """
+        プールから接続を取得（全て使用中の場合は返却されるまで待つ）
+        取得した接続の close() を呼ぶとプールに返却される
+        Args:
+            timeout: 接続の返却を待つ最大秒数
+        Returns:
+            PooledMySQLConnection: プールされた接続
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.01
+        while True:
+            try:
+                return self.pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 0.2)
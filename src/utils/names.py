@@ -0,0 +1,17 @@
+import re
+import unicodedata
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_holder_name(holder_name):
+    """
+    保有者名を照合用に正規化（全角・半角の統一と空白の除去）
+    Args:
+        holder_name: 保有者名
+    Returns:
+        str: 正規化した保有者名
+    """
+    if not holder_name:
+        return ''
+    return _WHITESPACE_PATTERN.sub('', unicodedata.normalize('NFKC', holder_name))
@@ -0,0 +1,226 @@
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+logger = logging.getLogger('edinet_db')
+
+# 全ての接続に適用するPRAGMA（環境変数で上書き可能）
+SQLITE_PRAGMAS = {
+    'auto_vacuum': 'INCREMENTAL',  # 空きページを incremental_vacuum で少しずつ解放できるようにする（作成時のみ有効）
+    'journal_mode': 'WAL',         # 読み取りが書き込みにブロックされないようにする
+    'synchronous': 'NORMAL',       # WALではNORMALでもクラッシュ時の整合性は保たれる
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -64 * 1024)),  # 負の値はKiB単位（64MB）
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'recursive_triggers': 'ON',    # INSERT OR REPLACE による削除でもトリガーを動かす
+}
+
+# データベースファイルに記録されるため書き込み用の接続でのみ設定するPRAGMA
+_WRITER_ONLY_PRAGMAS = ('auto_vacuum', 'journal_mode')
+
+# プールしておく読み取り専用接続の最大数
+READER_POOL_SIZE = int(os.getenv('SQLITE_READER_POOL_SIZE', 4))
+
+
+def report_key(report_id):
+    """
+    報告書IDから重複判定用の64ビット整数キーを作成（BLAKE2b の先頭8バイト）
+    SQLの関数 report_key() としても全ての接続に登録する
+    Args:
+        report_id: 報告書ID
+    Returns:
+        int: 符号付き64ビット整数（report_id が None の場合は None）
+    """
+    if report_id is None:
+        return None
+    digest = hashlib.blake2b(str(report_id).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class SQLiteConnectionManager:
+    """
+    SQLiteの接続をプロセス内で共有する管理クラス
+    書き込み用の接続はプロセスごとに1つだけ作成し、読み取り専用の接続はプールして再利用する
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, db_path):
+        """
+        データベースファイルごとの管理インスタンスを取得
+        Args:
+            db_path: SQLiteデータベースファイルのパス
+        Returns:
+            SQLiteConnectionManager: 管理インスタンス
+        """
+        path = os.path.abspath(str(db_path))
+        with cls._instances_lock:
+            manager = cls._instances.get(path)
+            # fork後の子プロセスでは親の接続を引き継がずに作り直す
+            if manager is None or manager.pid != os.getpid():
+                manager = cls(path)
+                cls._instances[path] = manager
+            return manager
+
+    @classmethod
+    def close_all_instances(cls):
+        """全ての管理インスタンスの接続を閉じる"""
+        with cls._instances_lock:
+            for manager in cls._instances.values():
+                manager.close_all()
+            cls._instances.clear()
+
+    def __init__(self, db_path, pool_size=READER_POOL_SIZE, pragmas=None):
+        """
+        初期化
+        Args:
+            db_path: SQLiteデータベースファイルのパス
+            pool_size: プールしておく読み取り専用接続の最大数
+            pragmas: 既定のPRAGMAを上書きする辞書
+        """
+        self.db_path = db_path
+        self.pragmas = {**SQLITE_PRAGMAS, **(pragmas or {})}
+        self.pid = os.getpid()
+        self.schema_ready = False
+        self.query_cache = None
+        self.write_version = 0
+        self._writer = None
+        # 書き込み用の接続の作成・テーブルの作成・書き込みのトランザクションを直列にする（同じスレッドからは再入できる）
+        self._writer_lock = threading.RLock()
+        self._readers = queue.LifoQueue(maxsize=pool_size)
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+
+    def _connect(self, read_only=False):
+        """PRAGMAを適用した新しい接続を作成"""
+        timeout = self.pragmas['busy_timeout'] / 1000
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{quote(self.db_path)}?mode=ro",
+                uri=True, timeout=timeout, check_same_thread=False
+            )
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 行を辞書形式で取得
+        # processed_reports ビューへの書き込みトリガーで使用する
+        conn.create_function('report_key', 1, report_key, deterministic=True)
+
+        for name, value in self.pragmas.items():
+            if read_only and name in _WRITER_ONLY_PRAGMAS:
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def get_writer(self):
+        """
+        プロセス内で共有する書き込み用の接続を取得
+        Returns:
+            sqlite3.Connection: 書き込み用の接続
+        """
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+                mode = self._writer.execute('PRAGMA journal_mode').fetchone()[0]
+                logger.info(f"書き込み用のデータベース接続を作成しました: {self.db_path} (journal_mode={mode})")
+            return self._writer
+
+    @contextmanager
+    def transaction(self):
+        """
+        書き込みからコミット（またはロールバック）までの間、他のスレッドの書き込みを待たせるコンテキストマネージャー
+        書き込み用の接続は全てのスレッドで共有するため、他のスレッドのコミット・ロールバックに途中の書き込みが
+        巻き込まれないようにする
+        """
+        with self._writer_lock:
+            yield
+
+    def ensure_schema(self, create_tables):
+        """
+        テーブルの作成をプロセス内で最初の1回だけ行う
+        複数のスレッドが同時に呼び出した場合は、最初のスレッドが作成し終えるまで他のスレッドを待たせる
+        Args:
+            create_tables: 書き込み用の接続でテーブルを作成する関数
+        """
+        if self.schema_ready:
+            return
+        with self._writer_lock:
+            if not self.schema_ready:
+                create_tables()
+                self.schema_ready = True
+
+    def bump_write_version(self):
+        """このプロセスからの書き込みをコミットしたときにデータのバージョンを進める"""
+        with self._version_lock:
+            self.write_version += 1
+
+    def data_version(self):
+        """
+        データが変更されたかどうかを判定するためのバージョンを取得
+        このプロセスの書き込み回数と、他の接続・プロセスのコミットで変わる PRAGMA data_version を組み合わせる
+        （PRAGMA data_version は接続ごとの値のため、判定専用の接続で取得する）
+        Returns:
+            tuple: (書き込み回数, PRAGMA data_version の値)
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = self._connect(read_only=True)
+            pragma_version = self._version_conn.execute('PRAGMA data_version').fetchone()[0]
+            return (self.write_version, pragma_version)
+
+    def acquire_reader(self):
+        """
+        プールから読み取り専用の接続を取得（空の場合は新規作成）
+        Returns:
+            sqlite3.Connection: 読み取り専用の接続
+        """
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            return self._connect(read_only=True)
+
+    def release_reader(self, conn):
+        """読み取り専用の接続をプールに返却（プールが満杯の場合は閉じる）"""
+        try:
+            self._readers.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def reader(self):
+        """読み取り専用の接続を一時的に借りるコンテキストマネージャー"""
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.release_reader(conn)
+
+    def close_all(self):
+        """書き込み用・読み取り専用の全ての接続を閉じる"""
+        with self._writer_lock:
+            if self._writer is not None:
+                # 閉じる前に、統計情報が古くなったテーブルだけを ANALYZE する
+                try:
+                    self._writer.execute('PRAGMA optimize')
+                except sqlite3.Error as e:
+                    logger.warning(f"PRAGMA optimize の実行中にエラー: {e}")
+                self._writer.close()
+                self._writer = None
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+atexit.register(SQLiteConnectionManager.close_all_instances)
@@ -0,0 +1,167 @@
+# Webhook/asgi_server.py
+
+import asyncio
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
+
+# utils ディレクトリを import 可能にする
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# イベントの処理（返信・データベースの参照）は Flask 版と同じハンドラーを使う
+from src.webhook.webhook_server import handler
+
+logger = logging.getLogger('edinet_webhook')
+
+# イベントを処理するワーカー数（同時に実行する返信・データベースの参照の上限）
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', 8))
+
+# 処理待ちにできるWebhookの件数。超えた場合は503を返し、LINEの再送に任せる
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000))
+
+# 終了時に処理待ちのイベントを処理し終えるまで待つ最大秒数
+WEBHOOK_SHUTDOWN_TIMEOUT = float(os.getenv('WEBHOOK_SHUTDOWN_TIMEOUT', 10))
+
+
+def _source_key(body):
+    """
+    Webhookの送信元（最初のイベントのユーザー・グループ・トークルームのID）を取得
+    Returns:
+        str: 送信元のID（取得できない場合は None）
+    """
+    try:
+        events = json.loads(body).get('events') or []
+    except (ValueError, AttributeError):
+        return None
+    for event in events:
+        source = event.get('source') or {}
+        key = source.get('userId') or source.get('groupId') or source.get('roomId')
+        if key:
+            return key
+    return None
+
+
+class EventWorkerPool:
+    """
+    署名を確認したWebhookを処理待ちのキューに入れ、一定数のワーカーで順に処理する
+    ハンドラーは同期処理（返信・データベースの参照）のため、ワーカー数と同じ大きさのスレッドプールで実行する
+    ワーカーごとにキューを持ち、同じ送信元のWebhookは同じワーカーに届いた順に処理させる
+    （友だち追加の直後のブロックが先に処理され、ブロックしたユーザーが購読者に残らないようにする）
+    """
+
+    def __init__(self, workers=WEBHOOK_WORKERS, queue_size=WEBHOOK_QUEUE_SIZE):
+        """
+        初期化
+        Args:
+            workers: イベントを処理するワーカー数
+            queue_size: 処理待ちにできるWebhookの件数
+        """
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.stats = {'accepted': 0, 'processed': 0, 'failed': 0, 'rejected': 0}
+        self._queues = []
+        self._tasks = []
+        self._executor = None
+
+    @property
+    def pending(self):
+        """処理待ちのWebhookの件数"""
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def start(self):
+        """ワーカーを開始"""
+        self._queues = [asyncio.Queue() for _ in range(self.workers)]
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='webhook-worker')
+        self._tasks = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+        logger.info(f"Webhookのイベント処理を開始します（ワーカー {self.workers}, キュー {self.queue_size}件）")
+
+    def submit(self, body, signature):
+        """
+        Webhookを処理待ちに追加
+        Args:
+            body: Webhookの本文
+            signature: X-Line-Signature ヘッダーの値
+        Returns:
+            bool: 追加できたかどうか（処理待ちがいっぱいの場合は False）
+        """
+        if self.pending >= self.queue_size:
+            self.stats['rejected'] += 1
+            return False
+        key = _source_key(body)
+        if key is None:
+            # 送信元のないWebhookは処理待ちの最も少ないワーカーに渡す
+            queue = min(self._queues, key=lambda queue: queue.qsize())
+        else:
+            queue = self._queues[hash(key) % self.workers]
+        queue.put_nowait((body, signature))
+        self.stats['accepted'] += 1
+        return True
+
+    async def _worker(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            body, signature = await queue.get()
+            try:
+                await loop.run_in_executor(self._executor, handler.handle, body, signature)
+                self.stats['processed'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"❌ Webhookのイベント処理中にエラーが発生しました: {e}")
+            finally:
+                queue.task_done()
+
+    async def stop(self, timeout=WEBHOOK_SHUTDOWN_TIMEOUT):
+        """処理待ちのイベントを処理し終えるまで（最大 timeout 秒）待ってからワーカーを終了"""
+        if not self._queues:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*[queue.join() for queue in self._queues]), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"処理待ちのWebhook {self.pending}件を処理せずに終了します")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        logger.info(f"Webhookのイベント処理を終了します: {self.stats}")
+
+
+pool = EventWorkerPool()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await pool.start()
+    try:
+        yield
+    finally:
+        await pool.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/")
+async def health_check():
+    return {"status": "✅ Webhook server is running.", "pending": pool.pending, **pool.stats}
+
+
+@app.post("/callback")
+async def callback(request: Request):
+    signature = request.headers.get("X-Line-Signature", "")
+    body = (await request.body()).decode('utf-8')
+
+    # 署名だけを確認してすぐに応答し、イベントの処理（返信など）はワーカーで行う
+    if not handler.parser.signature_validator.validate(body, signature):
+        logger.error("❌ Webhookの署名が一致しません")
+        return Response(content="Invalid signature", status_code=400)
+
+    if not pool.submit(body, signature):
+        logger.error(f"❌ 処理待ちのWebhookが上限（{pool.queue_size}件）に達しました")
+        return Response(content="Busy", status_code=503)
+
+    return Response(content="OK")
@@ -3,7 +3,7 @@
 from flask import Flask, request, abort
 from linebot.v3 import WebhookHandler
 from linebot.v3.messaging import Configuration, ApiClient, MessagingApi
-from linebot.v3.webhooks import MessageEvent, TextMessageContent, PostbackEvent
+from linebot.v3.webhooks import MessageEvent, TextMessageContent, PostbackEvent, FollowEvent, UnfollowEvent
 from linebot.v3.messaging import TextMessage, QuickReply, QuickReplyItem, MessageAction
 import os
 import logging
@@ -19,7 +19,7 @@ load_dotenv()
 # utils ディレクトリを import 可能にする
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 try:
-    from src.utils.db import get_latest_companies_by_date
+    from src.utils.db import get_latest_companies_by_date, get_database
 except ImportError:
     logging.error("❌ src/utils/db.py が見つかりません")
     # エラーでも続行する（他の機能は使える）
@@ -74,6 +74,7 @@ app = Flask(__name__)
 # 環境変数からLINEトークンとシークレットを取得
 LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
 LINE_CHANNEL_SECRET = os.getenv("LINE_CHANNEL_SECRET")
+LINE_API_ENDPOINT = os.getenv("LINE_API_ENDPOINT")  # 送信先を切り替える場合に指定（例: benchmarks/line_mock.py のURL）
 
 # 環境変数チェック
 if not LINE_CHANNEL_ACCESS_TOKEN or not LINE_CHANNEL_SECRET:
@@ -81,7 +82,7 @@ if not LINE_CHANNEL_ACCESS_TOKEN or not LINE_CHANNEL_SECRET:
     sys.exit(1)
 
 # V3 SDKの設定
-configuration = Configuration(access_token=LINE_CHANNEL_ACCESS_TOKEN)
+configuration = Configuration(access_token=LINE_CHANNEL_ACCESS_TOKEN, host=LINE_API_ENDPOINT)
 handler = WebhookHandler(LINE_CHANNEL_SECRET)
 
 # ログ設定
@@ -292,6 +293,45 @@ def handle_postback(event):
             }
         )
 
+# 友だち追加で通知の購読者に登録（ブロック解除時は以前のウォッチリストで再開）
+@handler.add(FollowEvent)
+def handle_follow(event):
+    user_id = event.source.user_id
+    app.logger.info(f"友だち追加: user_id={user_id}")
+    try:
+        db = get_database()
+        try:
+            db.upsert_subscriber(user_id)
+        finally:
+            db.close()
+        reply = "📊 大量保有報告書の通知を開始します。"
+    except Exception as e:
+        logging.error(f"❌ 購読者の登録中にエラーが発生しました: {e}")
+        reply = "🤖 すみません、通知の登録中にエラーが発生しました。"
+
+    with ApiClient(configuration) as api_client:
+        line_bot_api = MessagingApi(api_client)
+        line_bot_api.reply_message(
+            reply_message_request={
+                "replyToken": event.reply_token,
+                "messages": [TextMessage(text=reply)]
+            }
+        )
+
+# ブロックされたら通知を停止
+@handler.add(UnfollowEvent)
+def handle_unfollow(event):
+    user_id = event.source.user_id
+    app.logger.info(f"ブロック: user_id={user_id}")
+    try:
+        db = get_database()
+        try:
+            db.remove_subscriber(user_id)
+        finally:
+            db.close()
+    except Exception as e:
+        logging.error(f"❌ 購読の停止中にエラーが発生しました: {e}")
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
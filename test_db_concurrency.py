@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+SQLiteの共有接続を複数のスレッドから使う場合のテスト
+
+書き込み用の接続はプロセス内の全てのスレッドで共有するため、テーブルの作成と
+書き込みのトランザクションが他のスレッドと混ざらないことを確認します。
+
+    poetry run pytest test_db_concurrency.py
+"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from src.utils.db import ReportDatabase
+
+
+def _open_concurrently(db_path, threads=8, read_only=True):
+    """新しいデータベースを複数のスレッドから同時に開き、開いたインスタンスを返す"""
+    barrier = threading.Barrier(threads)
+
+    def open_db(_):
+        barrier.wait()
+        return ReportDatabase(db_path=str(db_path), read_only=read_only)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(open_db, range(threads)))
+
+
+def test_concurrent_first_open_creates_schema_once(tmp_path):
+    for run in range(5):
+        databases = _open_concurrently(tmp_path / f"edinet_reports_{run}.db")
+        try:
+            db = databases[0]
+            db.cursor.execute('SELECT version FROM schema_migrations ORDER BY version')
+            versions = [row['version'] for row in db.cursor.fetchall()]
+            assert versions == sorted(set(versions))
+            assert db.manager.schema_ready
+        finally:
+            for db in databases:
+                db.close()
+
+
+def test_transaction_keeps_other_threads_commit_out(tmp_path):
+    db_path = str(tmp_path / 'edinet_reports.db')
+    first = ReportDatabase(db_path=db_path)
+    second = ReportDatabase(db_path=db_path)
+    started = threading.Event()
+
+    def write_then_rollback():
+        with first.transaction():
+            first.cursor.execute('''
+            INSERT INTO subscribers (user_id, security_codes, holder_keywords, min_importance, active)
+            VALUES ('U-rolled-back', '[]', '[]', 1, 1)
+            ''')
+            started.set()
+            # 他のスレッドのコミットはこのトランザクションが終わるまで待たされる
+            threading.Event().wait(0.2)
+            first.conn.rollback()
+
+    thread = threading.Thread(target=write_then_rollback)
+    thread.start()
+    started.wait()
+    assert second.upsert_subscriber('U-committed')
+    thread.join()
+
+    assert [subscriber['user_id'] for subscriber in second.get_subscribers()] == ['U-committed']
+
+
+
+def test_incremental_vacuum_lets_other_writes_in_between_steps(tmp_path):
+    db_path = str(tmp_path / 'edinet_reports.db')
+    db = ReportDatabase(db_path=db_path)
+    db.cursor.execute('CREATE TABLE padding (data BLOB)')
+    db.cursor.executemany('INSERT INTO padding VALUES (zeroblob(4096))', [()] * 200)
+    db.cursor.execute('DROP TABLE padding')
+    db.conn.commit()
+
+    commit = db._commit
+    first_step = threading.Event()
+
+    def slow_commit():
+        commit()
+        first_step.set()
+        time.sleep(0.005)
+
+    db._commit = slow_commit
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        vacuum = executor.submit(db.incremental_vacuum, step_pages=1)
+        first_step.wait()
+        # 空きページを1ページずつ解放している間に、他のスレッドの書き込みが途中で割り込める
+        assert ReportDatabase(db_path=db_path).upsert_subscriber('U-between-steps')
+        assert not vacuum.done()
+        assert vacuum.result() >= 200
+
+    assert [subscriber['user_id'] for subscriber in db.get_subscribers()] == ['U-between-steps']
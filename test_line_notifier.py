@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+LINE通知（LineNotifier・送信待ちテーブル・OutboxWorker）のテスト
+
+benchmarks/line_mock.py の LINE Messaging API のモックに送信するため、本物のLINEには送信しません。
+
+    poetry run pytest test_line_notifier.py
+"""
+
+import sys
+import os
+
+import pytest
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from benchmarks.line_mock import MockLineServer
+from src.core.notifier import LineNotifier
+from src.core.outbox import OutboxWorker, build_notifications, fan_out
+from src.utils.db import ReportDatabase
+
+
+def _report(security_code='8085', holder_name='光通信株式会社', report_date='令和5年7月20日', **kwargs):
+    """テスト用の報告書情報を作成"""
+    report = {
+        'report_type': '変更報告書',
+        'target_company': 'ナラサキ産業株式会社',
+        'security_code': security_code,
+        'holder_name': holder_name,
+        'report_date': report_date,
+        'submission_date': report_date,
+        'holding_ratio_before': '5.10',
+        'holding_ratio_after': '6.20',
+        'shares_held': '1,234,500',
+        'purpose': '純投資'
+    }
+    report.update(kwargs)
+    return report
+
+
+@pytest.fixture
+def line_api():
+    """LINE Messaging API のモックを起動して返す"""
+    with MockLineServer(seed=0) as mock:
+        yield mock
+
+
+@pytest.fixture
+def notifier(line_api):
+    """モックに送信する LineNotifier"""
+    with LineNotifier(user_id='U-owner', api_configuration=line_api.configuration()) as notifier:
+        yield notifier
+
+
+@pytest.fixture
+def db(tmp_path):
+    """一時ディレクトリのSQLiteデータベース"""
+    database = ReportDatabase(db_path=str(tmp_path / 'edinet_reports.db'))
+    yield database
+    database.close()
+
+
+def test_notifier_batches_messages_into_pushes(line_api, notifier):
+    for index in range(12):
+        notifier.add(f"メッセージ{index}")
+    notifier.flush()
+
+    pushes = line_api.calls('push')
+    assert [len(call['body']['messages']) for call in pushes] == [5, 5, 2]
+    assert {call['body']['to'] for call in pushes} == {'U-owner'}
+    assert notifier.stats()['failed_batches'] == 0
+
+
+def test_outbox_retries_rate_limited_push_with_same_retry_key(line_api, notifier, db):
+    notifications = build_notifications(['新規の報告書'], recipient='U-owner')
+    assert db.mark_many_as_processed([_report()], notifications=notifications) == 1
+
+    line_api.fail_next(1, status=429, retry_after=0)
+    worker = OutboxWorker(db=db, notifier=notifier, base_delay=0, max_delay=0)
+    stats = worker.drain()
+
+    assert stats == {'sent': 1, 'retried': 1, 'failed': 0}
+    assert [request['status'] for request in line_api.requests] == [429, 200]
+    assert len({request['retry_key'] for request in line_api.requests}) == 1
+    assert db.get_outbox_counts() == {'sent': 1}
+
+
+def test_outbox_treats_accepted_retry_key_as_delivered(line_api, notifier, db):
+    # 前回の送信はLINEに届いたが、応答を受け取る前にプロセスが終了した場合を再現する
+    notifier.send(['新規の報告書'], to='U-owner', retry_key='0b5d2f4e-6c55-4a8e-9d3a-0f3d1b7c9a10')
+    db.mark_many_as_processed([_report()], notifications=[{
+        'recipient': 'U-owner',
+        'messages': ['新規の報告書'],
+        'retry_key': '0b5d2f4e-6c55-4a8e-9d3a-0f3d1b7c9a10',
+    }])
+
+    stats = OutboxWorker(db=db, notifier=notifier).drain()
+
+    assert stats['sent'] == 1
+    assert [request['status'] for request in line_api.requests] == [200, 409]
+    assert len(line_api.calls('push')) == 1
+
+
+def test_outbox_gives_up_on_client_errors(line_api, notifier, db):
+    db.mark_many_as_processed([_report()], notifications=build_notifications(['新規の報告書'], recipient='U-owner'))
+
+    line_api.fail_next(1, status=400)
+    stats = OutboxWorker(db=db, notifier=notifier).drain()
+
+    assert stats == {'sent': 0, 'retried': 0, 'failed': 1}
+    assert db.get_outbox_counts() == {'failed': 1}
+
+
+def test_fan_out_multicasts_in_chunks_of_500(line_api, notifier, db):
+    subscribers = [
+        {'user_id': f"U{index:04d}", 'security_codes': [], 'holder_keywords': [], 'min_importance': 1}
+        for index in range(1200)
+    ]
+    reports = [_report(security_code=str(1000 + index)) for index in range(3)]
+    notifications = fan_out(['報告書1', '報告書2', '報告書3'], reports, subscribers, [1, 1, 1])
+    db.mark_many_as_processed(reports, notifications=notifications)
+
+    stats = OutboxWorker(db=db, notifier=notifier).drain()
+
+    multicasts = line_api.calls('multicast')
+    assert stats['sent'] == 3
+    assert sorted(len(call['body']['to']) for call in multicasts) == [200, 500, 500]
+    assert all(len(call['body']['messages']) == 3 for call in multicasts)
+    assert not line_api.calls('push')
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+MySQL版データベース（MySQLReportDatabase）のテスト
+
+ローカルのMySQLコンテナに接続して実行します。接続できない場合、MySQLが必要なテストはスキップされます。
+
+    docker run --rm -d --name edinet-mysql-test -p 3307:3306 \
+        -e MYSQL_ROOT_PASSWORD=test -e MYSQL_DATABASE=edinet_test mysql:8.0
+    MYSQL_TEST_PORT=3307 poetry run pytest test_mysql_db.py
+
+接続先は環境変数 MYSQL_TEST_HOST / MYSQL_TEST_PORT / MYSQL_TEST_USER /
+MYSQL_TEST_PASSWORD / MYSQL_TEST_DATABASE で変更できます。
+"""
+
+import sys
+import os
+import inspect
+
+import pytest
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from src.utils.db import (
+    MYSQL_AVAILABLE, MYSQL_UPSERT_BATCH_SIZE, MySQLReportDatabase, ReportDatabase
+)
+
+MYSQL_TEST_CONFIG = {
+    'host': os.environ.get('MYSQL_TEST_HOST', '127.0.0.1'),
+    'port': int(os.environ.get('MYSQL_TEST_PORT', 3307)),
+    'user': os.environ.get('MYSQL_TEST_USER', 'root'),
+    'password': os.environ.get('MYSQL_TEST_PASSWORD', 'test'),
+    'database': os.environ.get('MYSQL_TEST_DATABASE', 'edinet_test'),
+    'connection_timeout': 5,
+    'buffered': True
+}
+
+
+def _report(security_code='8085', holder_name='光通信株式会社', report_date='令和5年7月20日', **kwargs):
+    """テスト用の報告書情報を作成"""
+    report = {
+        'report_type': '変更報告書',
+        'target_company': 'ナラサキ産業株式会社',
+        'security_code': security_code,
+        'holder_name': holder_name,
+        'report_date': report_date,
+        'submission_date': report_date,
+        'holding_ratio_before': '5.10',
+        'holding_ratio_after': '6.20',
+        'shares_held': '1,234,500',
+        'purpose': '純投資'
+    }
+    report.update(kwargs)
+    return report
+
+
+@pytest.fixture(scope='module')
+def mysql_db():
+    """テスト用のMySQLに接続し、テーブルを作り直したデータベースを返す"""
+    if not MYSQL_AVAILABLE:
+        pytest.skip("mysql-connector-python がインストールされていません")
+
+    import mysql.connector
+    try:
+        conn = mysql.connector.connect(**MYSQL_TEST_CONFIG)
+    except mysql.connector.Error as e:
+        pytest.skip(f"テスト用のMySQLに接続できません: {e}")
+
+    cursor = conn.cursor()
+    cursor.execute('DROP TABLE IF EXISTS processed_reports, current_holdings')
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    db = MySQLReportDatabase(config=MYSQL_TEST_CONFIG, pool_size=4)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def db(mysql_db):
+    """テストごとにテーブルを空にする"""
+    mysql_db.cursor.execute('DELETE FROM current_holdings')
+    mysql_db.cursor.execute('DELETE FROM processed_reports')
+    mysql_db.conn.commit()
+    return mysql_db
+
+
+def _columns_sqlite(db, table):
+    db.cursor.execute(f'PRAGMA table_info({table})')
+    return {row['name'] for row in db.cursor.fetchall()}
+
+
+def _columns_mysql(db, table):
+    db.cursor.execute('''
+    SELECT COLUMN_NAME FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    ''', (table,))
+    return {row['COLUMN_NAME'] for row in db.cursor.fetchall()}
+
+
+def test_public_api_matches_sqlite():
+    """ReportDatabase の公開メソッドが全て同じ引数で MySQLReportDatabase にもある"""
+    for name, method in inspect.getmembers(ReportDatabase, inspect.isfunction):
+        if name.startswith('_'):
+            continue
+        assert hasattr(MySQLReportDatabase, name), f"MySQLReportDatabase に {name} がありません"
+        if name == '__init__':
+            continue
+        sqlite_params = list(inspect.signature(method).parameters)
+        mysql_params = list(inspect.signature(getattr(MySQLReportDatabase, name)).parameters)
+        assert sqlite_params == mysql_params, name
+
+
+def test_schema_matches_sqlite(db, tmp_path):
+    sqlite_db = ReportDatabase(tmp_path / 'parity.db')
+    try:
+        for table in ('processed_reports', 'current_holdings'):
+            assert _columns_mysql(db, table) == _columns_sqlite(sqlite_db, table)
+    finally:
+        sqlite_db.close()
+
+
+def test_pool_is_shared_per_config(db):
+    other = MySQLReportDatabase(config=MYSQL_TEST_CONFIG)
+    try:
+        assert other.manager is db.manager
+        assert other.conn is not db.conn
+    finally:
+        other.close()
+    assert other.conn is None
+
+
+def test_mark_many_as_processed_batches_and_upserts(db):
+    count = MYSQL_UPSERT_BATCH_SIZE * 2 + 7
+    reports = [_report(security_code=str(1000 + i)) for i in range(count)]
+
+    assert db.mark_many_as_processed(reports) == count
+    assert db.get_report_counts_by_type() == {'変更報告書': count}
+
+    # 同じ報告書を再度記録しても件数は増えず、値が更新される
+    reports[0]['holding_ratio_after'] = '7.50'
+    assert db.mark_many_as_processed(reports) == count
+    assert db.get_report_counts_by_type() == {'変更報告書': count}
+    holding = db.get_latest_holding_by_company_and_holder('1000', '光通信株式会社')
+    assert holding['latest_ratio'] == 7.5
+
+
+def test_mark_as_processed_fills_derived_columns(db):
+    assert db.mark_as_processed(_report())
+
+    report = db.get_all_processed_reports()[0]
+    assert report['holding_ratio_before'] == 5.1
+    assert report['holding_ratio_after'] == 6.2
+    assert report['change_percentage'] == pytest.approx(1.1)
+    assert report['importance_level'] == 2
+    assert report['file_location'] == 'active'
+    # DATE 型はSQLite版と同じ YYYY-MM-DD の文字列で返る
+    assert report['report_date_iso'] == '2023-07-20'
+    assert report['submission_date_iso'] == '2023-07-20'
+
+
+def test_current_holdings_keeps_latest_report_date(db):
+    db.mark_as_processed(_report(report_date='令和5年7月20日', holding_ratio_after='8.00'))
+    db.mark_as_processed(_report(report_date='令和5年6月1日', holding_ratio_after='4.00'))
+
+    holding = db.get_latest_holding_by_company_and_holder('8085', '光通信株式会社')
+    assert holding['latest_ratio'] == 8.0
+    assert holding['report_date_iso'] == '2023-07-20'
+
+    # 履歴から作り直しても同じ結果になる
+    assert db.rebuild_current_holdings() == 2
+    assert db.get_latest_holding_by_company_and_holder('8085', '光通信株式会社')['latest_ratio'] == 8.0
+
+
+def test_current_holdings_keeps_zero_ratio_after_full_disposal(db):
+    db.mark_as_processed(_report(holding_ratio_before='5.10', holding_ratio_after='0.00'))
+
+    assert db.get_all_processed_reports()[0]['holding_ratio_after'] == 0.0
+    assert db.get_latest_holding_by_company_and_holder('8085', '光通信株式会社')['latest_ratio'] == 0.0
+    assert db.rebuild_current_holdings() == 1
+    assert db.get_latest_holding_by_company_and_holder('8085', '光通信株式会社')['latest_ratio'] == 0.0
+
+
+def test_get_latest_holdings_normalizes_holder_names(db):
+    db.mark_many_as_processed([
+        _report(security_code='8085', holder_name='株式会社UH Partners 2'),
+        _report(security_code='8051', holder_name='光通信株式会社'),
+    ])
+
+    holdings = db.get_latest_holdings([
+        ('8085', '株式会社ＵＨ　Partners　２'),
+        ('8051', '光通信株式会社'),
+        ('9999', '光通信株式会社'),
+    ])
+    assert set(holdings) == {('8085', '株式会社ＵＨ　Partners　２'), ('8051', '光通信株式会社')}
+    assert [h['security_code'] for h in db.get_holder_portfolio('光通信株式会社')] == ['8051']
+
+
+def test_queries_match_sqlite_semantics(db):
+    db.mark_many_as_processed([
+        _report(security_code='8085', report_date='令和5年7月20日'),
+        _report(security_code='8051', report_date='令和6年1月10日', purpose='経営陣への助言'),
+    ])
+
+    assert [r['security_code'] for r in db.get_latest_date_reports()] == ['8051']
+    assert [r['security_code'] for r in db.get_reports_by_date_range('2023-01-01', '2023-12-31')] == ['8085']
+    assert [r['security_code'] for r in db.search_reports(keyword='経営陣')] == ['8051']
+    assert len(db.search_reports(holder_name='光通信')) == 2
+    assert sorted(r['security_code'] for r in db.iter_processed_reports(batch_size=1)) == ['8051', '8085']
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+データベースを使えない場合に、パーサーが処理済み報告書をJSONのジャーナルに記録するテスト
+
+src.utils.db を読み込めない状態を再現し、EdinetParser が ProcessedReportJournal に切り替わることを確認します。
+
+    poetry run pytest test_parser_journal.py
+"""
+
+import sys
+import os
+import importlib
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+
+def _report(security_code='8085', holder_name='光通信株式会社', report_date='令和5年7月20日'):
+    """テスト用の報告書情報を作成"""
+    return {
+        'report_type': '変更報告書',
+        'target_company': 'ナラサキ産業株式会社',
+        'security_code': security_code,
+        'holder_name': holder_name,
+        'report_date': report_date,
+        'submission_date': report_date,
+        'holding_ratio_before': '5.10',
+        'holding_ratio_after': '6.20',
+        'shares_held': '1,234,500',
+        'purpose': '純投資'
+    }
+
+
+def test_parser_falls_back_to_journal_without_db(tmp_path, monkeypatch):
+    # src.utils.db を読み込むと ImportError になるようにして、パーサーを読み込み直す
+    monkeypatch.setitem(sys.modules, 'src.utils.db', None)
+    monkeypatch.delitem(sys.modules, 'src.core.parser', raising=False)
+    parser_module = importlib.import_module('src.core.parser')
+
+    base_dir = tmp_path / 'downloads'
+    base_dir.mkdir()
+    parser = parser_module.EdinetParser(base_dir)
+    try:
+        assert not hasattr(parser, 'db')
+        messages = parser.render_line_messages([_report()], enqueue=True)
+        assert len(messages) == 1
+        assert parser.is_already_processed(_report())
+    finally:
+        parser.close()
+
+    # 次回の実行ではジャーナルから処理済みの報告書を読み込む
+    parser = parser_module.EdinetParser(base_dir)
+    try:
+        assert parser.is_already_processed(_report())
+        assert not parser.is_already_processed(_report(security_code='8051'))
+    finally:
+        parser.close()
+    assert (tmp_path / 'processed_reports.json').exists()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+ASGI版のWebhook（src/webhook/asgi_server.py）のテスト
+
+友だち追加・ブロックのイベントをワーカーで並行に処理しても、購読者の登録・停止が
+失われないことを確認します。返信は benchmarks/line_mock.py の LINE Messaging API のモックに送信します。
+
+    poetry run pytest test_webhook_asgi.py
+"""
+
+import sys
+import os
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# プロジェクトルートをPythonパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+# Webhookサーバーは読み込み時にLINEのトークンとシークレットを確認する
+os.environ.setdefault('LINE_CHANNEL_ACCESS_TOKEN', 'test-token')
+os.environ.setdefault('LINE_CHANNEL_SECRET', 'test-channel-secret')
+
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_webhook import sign
+from benchmarks.line_mock import MockLineServer
+from src.utils.db import ReportDatabase
+from src.webhook import asgi_server, webhook_server
+
+
+def _event_body(event_type, user_id):
+    """友だち追加（follow）・ブロック（unfollow）のイベント1件を含むWebhookの本文を作成"""
+    event = {
+        'type': event_type,
+        'mode': 'active',
+        'timestamp': int(time.time() * 1000),
+        'source': {'type': 'user', 'userId': user_id},
+        'webhookEventId': uuid.uuid4().hex,
+        'deliveryContext': {'isRedelivery': False},
+    }
+    if event_type == 'follow':
+        event['replyToken'] = uuid.uuid4().hex
+        event['follow'] = {'isUnblocked': False}
+    return json.dumps({'destination': 'U-bot', 'events': [event]})
+
+
+@pytest.fixture
+def line_api(monkeypatch):
+    """返信を LINE Messaging API のモックに送る"""
+    with MockLineServer(seed=0) as mock:
+        monkeypatch.setattr(webhook_server, 'configuration', mock.configuration())
+        yield mock
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Webhookのハンドラーが使うデータベースを一時ディレクトリの新しいデータベースにする"""
+    path = str(tmp_path / 'edinet_reports.db')
+    monkeypatch.setattr(webhook_server, 'get_database', lambda read_only=False: ReportDatabase(path, read_only))
+    return path
+
+
+def _send_all(bodies):
+    """Webhookを並列に送信し、ワーカーが全て処理し終えるまで待つ（TestClient の終了時に処理待ちを処理する）"""
+    _send_sequences([[body] for body in bodies])
+
+
+def _send_sequences(sequences):
+    """
+    Webhookの列ごとに並列に送信し（同じ列のWebhookは届いた順に送る）、ワーカーが全て処理し終えるまで待つ
+    Args:
+        sequences: 順に送信するWebhookの本文のリストのリスト
+    """
+    with TestClient(asgi_server.app) as client:
+        def send(bodies):
+            return [
+                client.post('/callback', content=body.encode('utf-8'), headers={
+                    'Content-Type': 'application/json',
+                    'X-Line-Signature': sign(body, webhook_server.LINE_CHANNEL_SECRET),
+                }).status_code
+                for body in bodies
+            ]
+
+        with ThreadPoolExecutor(max_workers=len(sequences)) as executor:
+            statuses = [status for result in executor.map(send, sequences) for status in result]
+        assert set(statuses) == {200}
+
+
+def test_concurrent_follow_and_unfollow_events(line_api, db_path):
+    # 新しいデータベースに最初の友だち追加が並行して届く（テーブルの作成も同時に始まる）
+    _send_all([_event_body('follow', f"U{index:02d}") for index in range(24)])
+    _send_all(
+        [_event_body('unfollow', f"U{index:02d}") for index in range(12)]
+        + [_event_body('follow', f"U{index:02d}") for index in range(24, 36)]
+    )
+
+    assert asgi_server.pool.stats['failed'] == 0
+    assert len(line_api.calls('reply')) == 36
+
+    db = ReportDatabase(db_path)
+    try:
+        assert sorted(subscriber['user_id'] for subscriber in db.get_subscribers()) == sorted(
+            f"U{index:02d}" for index in range(12, 36)
+        )
+        assert len(db.get_subscribers(active_only=False)) == 36
+    finally:
+        db.close()
+
+
+def test_follow_then_unfollow_in_one_burst_leaves_user_unsubscribed(line_api, db_path):
+    # 友だち追加の直後のブロックが、別のワーカーで友だち追加より先に処理されないことを確認する
+    _send_sequences([
+        [_event_body('follow', f"U{index:02d}"), _event_body('unfollow', f"U{index:02d}")]
+        for index in range(32)
+    ])
+
+    assert asgi_server.pool.stats['failed'] == 0
+    db = ReportDatabase(db_path)
+    try:
+        assert db.get_subscribers() == []
+        assert len(db.get_subscribers(active_only=False)) == 32
+    finally:
+        db.close()